@@ -0,0 +1,113 @@
+"""Benchmark of the C++ bundler on a synthetic library.
+
+    python benchmarks/bundler.py --headers 500 --bundles 50
+"""
+import argparse
+import os
+import pathlib
+import random
+import statistics
+import tempfile
+import time
+
+import competitive_verifier.oj.verify.languages.cplusplus_bundle as cplusplus_bundle
+
+SYSTEM_HEADERS = ["vector", "algorithm", "cstdio", "map", "bits/stdc++.h"]
+
+
+def generate_library(root: pathlib.Path, *, headers: int, rng: random.Random) -> None:
+    lib = root / "lib"
+    lib.mkdir()
+    for i in range(headers):
+        lines: list[str] = []
+        guard = i % 3 == 0
+        if guard:
+            lines += [f"#ifndef LIB_H{i}_", f"#define LIB_H{i}_"]
+        else:
+            lines.append("#pragma once")
+        lines.append(f"#include <{rng.choice(SYSTEM_HEADERS)}>")
+        for j in sorted(set(rng.randrange(i) for _ in range(min(i, 4)))):
+            lines.append(f'#include "h{j}.hpp"')
+        lines += [
+            f"// header {i}",
+            f"struct S{i} {{",
+            "    int value;",
+            f"    int get() const {{ return value + {i}; }}",
+            "};",
+        ]
+        if guard:
+            lines.append("#endif")
+        (lib / f"h{i}.hpp").write_text("\n".join(lines) + "\n")
+
+
+def generate_tests(
+    root: pathlib.Path, *, headers: int, bundles: int, rng: random.Random
+) -> list[pathlib.Path]:
+    paths: list[pathlib.Path] = []
+    for t in range(bundles):
+        path = root / f"test{t}.test.cpp"
+        includes = sorted(set(rng.randrange(headers) for _ in range(8)))
+        path.write_text(
+            "\n".join(f'#include "lib/h{i}.hpp"' for i in includes)
+            + "\nint main() {}\n"
+        )
+        paths.append(path.relative_to(root))
+    return paths
+
+
+def measure(
+    root: pathlib.Path, paths: list[pathlib.Path], *, memoize: bool
+) -> list[float]:
+    cplusplus_bundle.clear_fragment_cache()
+    elapsed: list[float] = []
+    for path in paths:
+        if not memoize:
+            cplusplus_bundle.clear_fragment_cache()
+        begin = time.perf_counter()
+        bundler = cplusplus_bundle.Bundler(iquotes=[root])
+        bundler.update(path)
+        bundler.get()
+        elapsed.append(time.perf_counter() - begin)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headers", type=int, default=500)
+    parser.add_argument("--bundles", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        generate_library(root, headers=args.headers, rng=rng)
+        paths = generate_tests(
+            root, headers=args.headers, bundles=args.bundles, rng=rng
+        )
+        os.chdir(root)
+        try:
+            # The first run warms up the `g++ -fpreprocessed` cache for every header
+            measure(root, paths, memoize=False)
+            results = {
+                "no memoization": measure(root, paths, memoize=False),
+                "memoized": measure(root, paths, memoize=True),
+            }
+        finally:
+            os.chdir(cwd)
+
+    print(f"{args.headers} headers, {args.bundles} bundles")
+    print(f"{'mode':<16}{'first':>10}{'median':>10}{'mean':>10}{'total':>10}")
+    for name, elapsed in results.items():
+        print(
+            f"{name:<16}"
+            f"{elapsed[0] * 1000:>8.1f}ms"
+            f"{statistics.median(elapsed) * 1000:>8.1f}ms"
+            f"{statistics.mean(elapsed) * 1000:>8.1f}ms"
+            f"{sum(elapsed) * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
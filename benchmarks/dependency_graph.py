@@ -0,0 +1,184 @@
+"""Benchmark of the dependency graph engine on a synthetic graph.
+
+    python benchmarks/dependency_graph.py --nodes 20000 --degree 4
+"""
+import argparse
+import pathlib
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from competitive_verifier.models import VerificationInput
+from competitive_verifier.models._scc import CSR
+
+Edges = dict[pathlib.Path, set[pathlib.Path]]
+
+
+def recursive_scc(n: int, edges: list[tuple[int, int]]) -> list[list[int]]:
+    """The recursive Tarjan before the iterative implementation"""
+    g = CSR(n, edges)
+    now_ord = 0
+    group_num = 0
+    visited: list[int] = []
+    low = [0] * n
+    order = [-1] * n
+    ids = [0] * n
+    sys.setrecursionlimit(max(n + 1000, sys.getrecursionlimit()))
+
+    def dfs(v: int) -> None:
+        nonlocal now_ord, group_num
+        low[v] = order[v] = now_ord
+        now_ord += 1
+        visited.append(v)
+        for i in range(g.start[v], g.start[v + 1]):
+            to = g.elist[i]
+            if order[to] == -1:
+                dfs(to)
+                low[v] = min(low[v], low[to])
+            else:
+                low[v] = min(low[v], order[to])
+        if low[v] == order[v]:
+            while True:
+                u = visited.pop()
+                order[u] = n
+                ids[u] = group_num
+                if u == v:
+                    break
+            group_num += 1
+
+    for i in range(n):
+        if order[i] == -1:
+            dfs(i)
+    groups: list[list[int]] = [[] for _ in range(group_num)]
+    for i in range(n):
+        groups[group_num - 1 - ids[i]].append(i)
+    return groups
+
+
+def set_closure(input: VerificationInput) -> Edges:
+    """`transitive_depends_on` before the bitset implementation"""
+    paths = list(input.files.keys())
+    index = {v: i for i, v in enumerate(paths)}
+    edges = [
+        (index[dep], index[p])
+        for p, file in input.files.items()
+        for dep in file.dependencies
+        if dep in index
+    ]
+    d: Edges = {}
+    for group in recursive_scc(len(paths), edges):
+        result = set(paths[ix] for ix in group)
+        for ix in group:
+            for dep in input.files[paths[ix]].dependencies:
+                if dep not in result:
+                    resolved = d.get(dep)
+                    if resolved is not None:
+                        result.update(resolved)
+        for ix in group:
+            d[paths[ix]] = result
+    return d
+
+
+def bitset_closure(step: int) -> Callable[[VerificationInput], Edges]:
+    """Materializes every `step`-th set. 0 builds only the bitsets."""
+
+    def closure(input: VerificationInput) -> Edges:
+        input.__dict__.pop("_closure", None)
+        input.__dict__.pop("transitive_depends_on", None)
+        transitive_depends_on = input.transitive_depends_on
+        input._closure
+        if step == 0:
+            return {}
+        return {
+            p: transitive_depends_on[p] for p in list(transitive_depends_on)[::step]
+        }
+
+    return closure
+
+
+def generate_input(
+    *, nodes: int, degree: int, cycles: int, rng: random.Random
+) -> VerificationInput:
+    """Clusters of 100 files like directories of a library.
+
+    A file depends on files in the same cluster and in the base clusters,
+    and some dependencies form cycles.
+    """
+    cluster = 100
+    base = max(1, nodes // cluster // 20) * cluster
+    files: dict[str, dict[str, list[str]]] = {}
+    for i in range(nodes):
+        begin = i - i % cluster
+        end = min(nodes, begin + cluster)
+        deps = {rng.randrange(i + 1, end) for _ in range(degree) if i + 1 < end}
+        if i >= base:
+            deps.add(rng.randrange(base))
+        files[f"lib/{i}.py"] = {"dependencies": [f"lib/{j}.py" for j in deps]}
+    for _ in range(cycles):
+        i = rng.randrange(nodes)
+        j = rng.randrange(i - i % cluster, i + 1)
+        files[f"lib/{i}.py"]["dependencies"].append(f"lib/{j}.py")
+    return VerificationInput.model_validate({"files": files})
+
+
+def measure(
+    closure: Callable[[VerificationInput], Edges],
+    input: VerificationInput,
+    *,
+    repeat: int,
+) -> tuple[list[float], int]:
+    elapsed: list[float] = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        closure(input)
+        elapsed.append(time.perf_counter() - begin)
+
+    tracemalloc.start()
+    result = closure(input)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--degree", type=int, default=4)
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    input = generate_input(
+        nodes=args.nodes,
+        degree=args.degree,
+        cycles=args.cycles,
+        rng=random.Random(args.seed),
+    )
+    assert set_closure(input) == bitset_closure(1)(input)
+
+    results = {
+        "sets": measure(set_closure, input, repeat=args.repeat),
+        "bitsets (build)": measure(bitset_closure(0), input, repeat=args.repeat),
+        "bitsets (1%)": measure(bitset_closure(100), input, repeat=args.repeat),
+        "bitsets (all)": measure(bitset_closure(1), input, repeat=args.repeat),
+    }
+
+    edges = sum(len(f.dependencies) for f in input.files.values())
+    print(f"{args.nodes} files, {edges} dependencies")
+    print(f"{'mode':<18}{'min':>10}{'median':>10}{'peak MiB':>10}")
+    for name, (elapsed, peak) in results.items():
+        print(
+            f"{name:<18}"
+            f"{min(elapsed) * 1000:>8.1f}ms"
+            f"{statistics.median(elapsed) * 1000:>8.1f}ms"
+            f"{peak / 1024 / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
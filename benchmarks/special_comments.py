@@ -0,0 +1,120 @@
+"""Benchmark of the special comment and URL scanner on a synthetic corpus.
+
+    python benchmarks/special_comments.py --files 2000 --lines 300
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+from typing import Callable
+
+import competitive_verifier.oj.verify.languages.special_comments as special_comments
+
+SPECIAL_COMMENT_PATTERN = re.compile(
+    r"\b(?:verify-helper|verification-helper|competitive-verifier):\s*([0-9A-Za-z_]+)(?:\s(.*))?$"
+)
+EMBEDDED_URL_PATTERN = re.compile(r"""['"`]?https?://\S*""")
+
+CODE_LINES = [
+    "#include <bits/stdc++.h>",
+    "using namespace std;",
+    "template <class T> struct segment_tree {",
+    "    vector<T> data;",
+    "    int n;",
+    "    T query(int l, int r) const { return op(data[l], data[r]); }",
+    "};",
+    "// a comment without markers",
+    "int main() { int a, b; cin >> a >> b; cout << a + b << endl; }",
+    "",
+]
+MARKER_LINES = [
+    "// competitive-verifier: PROBLEM https://judge.yosupo.jp/problem/aplusb",
+    "// competitive-verifier: TITLE Segment tree",
+    "// verification-helper: IGNORE",
+    "// see https://github.com/competitive-verifier/competitive-verifier",
+    '    const char* url = "https://atcoder.jp/contests/abc001/tasks/abc001_1";',
+]
+
+
+def two_pass(content: str) -> tuple[dict[str, str], list[str]]:
+    """The scanner before the single-pass implementation"""
+    attributes: dict[str, str] = {}
+    for line in content.splitlines():
+        matched = SPECIAL_COMMENT_PATTERN.search(line)
+        if matched:
+            attributes[matched.group(1)] = (matched.group(2) or "").strip()
+    urls: list[str] = []
+    for url in EMBEDDED_URL_PATTERN.findall(content):
+        for quote in ("'", '"', "`"):
+            if url.startswith(quote):
+                end_quote_pos = url.rfind(quote)
+                url = url[1:] if end_quote_pos == 0 else url[1:end_quote_pos]
+                break
+        urls.append(url)
+    return attributes, sorted(set(urls))
+
+
+def single_pass(content: str) -> tuple[dict[str, str], list[str]]:
+    scanned = special_comments.scan_text(content)
+    return dict(scanned.special_comments), list(scanned.embedded_urls)
+
+
+def generate_corpus(*, files: int, lines: int, rng: random.Random) -> list[str]:
+    corpus: list[str] = []
+    for _ in range(files):
+        body = [rng.choice(CODE_LINES) for _ in range(lines)]
+        for _ in range(rng.randrange(4)):
+            body.insert(rng.randrange(len(body) + 1), rng.choice(MARKER_LINES))
+        corpus.append("\n".join(body) + "\n")
+    return corpus
+
+
+def measure(
+    scanner: Callable[[str], tuple[dict[str, str], list[str]]],
+    corpus: list[str],
+    *,
+    repeat: int,
+) -> list[float]:
+    elapsed: list[float] = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        for content in corpus:
+            scanner(content)
+        elapsed.append(time.perf_counter() - begin)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(
+        files=args.files, lines=args.lines, rng=random.Random(args.seed)
+    )
+    for content in corpus:
+        assert two_pass(content) == single_pass(content)
+
+    results = {
+        "two passes": measure(two_pass, corpus, repeat=args.repeat),
+        "single pass": measure(single_pass, corpus, repeat=args.repeat),
+    }
+
+    size = sum(map(len, corpus))
+    print(f"{args.files} files, {size / 1024 / 1024:.1f} MiB")
+    print(f"{'mode':<16}{'min':>10}{'median':>10}{'MiB/s':>10}")
+    for name, elapsed in results.items():
+        print(
+            f"{name:<16}"
+            f"{min(elapsed) * 1000:>8.1f}ms"
+            f"{statistics.median(elapsed) * 1000:>8.1f}ms"
+            f"{size / 1024 / 1024 / min(elapsed):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark of the columnar test case results on a synthetic result.
+
+    python benchmarks/testcase_results.py --verifications 2000 --cases 100
+"""
+import argparse
+import datetime
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from pydantic import TypeAdapter
+
+from competitive_verifier.models import JudgeStatus, TestcaseResult, VerificationResult
+
+
+class ModelVerificationResult(VerificationResult):
+    """`VerificationResult` before the columnar test case results"""
+
+    testcases: Optional[list[TestcaseResult]] = None  # type: ignore
+
+
+def generate_json(*, verifications: int, cases: int, rng: random.Random) -> bytes:
+    statuses = [s.value for s in JudgeStatus]
+    now = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc).isoformat()
+    data: list[dict[str, Any]] = []
+    for i in range(verifications):
+        testcases: list[dict[str, Any]] = []
+        for j in range(cases):
+            testcase: dict[str, Any] = {
+                "name": f"case_{i}_{j}",
+                "status": "AC" if rng.random() < 0.95 else rng.choice(statuses),
+                "elapsed": rng.random(),
+            }
+            if rng.random() < 0.9:
+                testcase["memory"] = rng.uniform(1, 256)
+            testcases.append(testcase)
+        data.append(
+            {
+                "status": "success",
+                "elapsed": sum(c["elapsed"] for c in testcases),
+                "testcases": testcases,
+                "last_execution_time": now,
+            }
+        )
+    return json.dumps(data).encode()
+
+
+def measure(func: Callable[[], Any], *, repeat: int) -> tuple[list[float], Any, int]:
+    elapsed: list[float] = []
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        begin = time.perf_counter()
+        result = func()
+        elapsed.append(time.perf_counter() - begin)
+
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, result, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verifications", type=int, default=2000)
+    parser.add_argument("--cases", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = generate_json(
+        verifications=args.verifications,
+        cases=args.cases,
+        rng=random.Random(args.seed),
+    )
+
+    rows: list[tuple[str, list[float], int]] = []
+    dumped: list[bytes] = []
+    for name, cls in [
+        ("models", ModelVerificationResult),
+        ("columns", VerificationResult),
+    ]:
+        adapter = TypeAdapter(list[cls])
+        elapsed, results, size = measure(
+            lambda: adapter.validate_json(data), repeat=args.repeat
+        )
+        rows.append((f"{name} (parse)", elapsed, size))
+        elapsed, output, size = measure(
+            lambda: adapter.dump_json(results, exclude_none=True), repeat=args.repeat
+        )
+        rows.append((f"{name} (dump)", elapsed, size))
+        dumped.append(output)
+    assert dumped[0] == dumped[1]
+
+    print(f"{args.verifications * args.cases} test cases, {len(data) / 2**20:.1f} MiB")
+    print(f"{'mode':<18}{'min':>10}{'median':>10}{'MiB':>10}")
+    for name, elapsed, size in rows:
+        print(
+            f"{name:<18}"
+            f"{min(elapsed) * 1000:>8.1f}ms"
+            f"{statistics.median(elapsed) * 1000:>8.1f}ms"
+            f"{size / 2**20:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
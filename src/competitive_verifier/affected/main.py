@@ -0,0 +1,67 @@
+import argparse
+import logging
+import pathlib
+import sys
+from logging import getLogger
+from typing import Optional
+
+from competitive_verifier import git
+from competitive_verifier.arg import (
+    add_verbose_argument,
+    add_verify_files_json_argument,
+)
+from competitive_verifier.log import configure_stderr_logging
+from competitive_verifier.models import VerificationInput
+
+logger = getLogger(__name__)
+
+
+def get_affected_verification_files(
+    input: VerificationInput, rev: str
+) -> set[pathlib.Path]:
+    """Verification files which the changes since `rev` can influence"""
+    changed = git.get_changed_files(rev)
+    logger.info("changed files since %s: %d", rev, len(changed))
+    return set(
+        p for p in input.affected_files(changed) if input.files[p].is_verification()
+    )
+
+
+def run_impl(input: VerificationInput, *, rev: str) -> list[pathlib.Path]:
+    return sorted(get_affected_verification_files(input, rev))
+
+
+def run(args: argparse.Namespace) -> bool:
+    default_level = logging.INFO
+    if args.verbose:
+        default_level = logging.DEBUG
+    configure_stderr_logging(default_level)
+
+    input = VerificationInput.parse_file_relative(args.verify_files_json)
+    for p in run_impl(input, rev=args.rev):
+        print(p.as_posix())
+    return True
+
+
+def argument(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    add_verbose_argument(parser)
+    add_verify_files_json_argument(parser)
+    parser.add_argument(
+        "rev",
+        help="The git revision to compare with the working tree",
+    )
+    return parser
+
+
+def main(args: Optional[list[str]] = None) -> None:
+    try:
+        parsed = argument(argparse.ArgumentParser()).parse_args(args)
+        if not run(parsed):
+            sys.exit(1)
+    except Exception as e:
+        sys.stderr.write(str(e))
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
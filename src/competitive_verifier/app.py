@@ -4,10 +4,15 @@ import sys
 from logging import getLogger
 from typing import Callable, Optional
 
+from competitive_verifier import self_profile
+from competitive_verifier.arg import add_profile_self_argument
+
 logger = getLogger(__name__)
 
 
 def get_parser() -> argparse.ArgumentParser:
+    import competitive_verifier.affected.main as affected
+    import competitive_verifier.bench.main as bench
     import competitive_verifier.check.main as check
     import competitive_verifier.documents.main as docs
     import competitive_verifier.download.main as download
@@ -62,6 +67,18 @@ def get_parser() -> argparse.ArgumentParser:
     )
     check.argument(subparser)
 
+    subparser = subparsers.add_parser(
+        "affected",
+        help="List verification files affected by changes since a git revision",
+    )
+    affected.argument(subparser)
+
+    subparser = subparsers.add_parser(
+        "bench",
+        help="Measure the performance of verification files",
+    )
+    bench.argument(subparser)
+
     subparser = subparsers.add_parser(
         "oj-resolve",
         help="Create verify_files json using `oj-verify`",
@@ -74,12 +91,17 @@ def get_parser() -> argparse.ArgumentParser:
     )
     migrate.argument(subparser)
 
+    for subparser in subparsers.choices.values():
+        add_profile_self_argument(subparser)
+
     return parser
 
 
 def select_runner(
     subcommand: str,
 ) -> Optional[Callable[[argparse.Namespace], bool]]:
+    import competitive_verifier.affected.main as affected
+    import competitive_verifier.bench.main as bench
     import competitive_verifier.check.main as check
     import competitive_verifier.documents.main as docs
     import competitive_verifier.download.main as download
@@ -98,8 +120,12 @@ def select_runner(
         return oj_resolve.run
     if subcommand == "check":
         return check.run
+    if subcommand == "affected":
+        return affected.run
     if subcommand == "migrate":
         return migrate.run
+    if subcommand == "bench":
+        return bench.run
 
     # Use sys.stdout for logging
     if subcommand == "download":
@@ -111,6 +137,22 @@ def select_runner(
     return None
 
 
+def run_subcommand(
+    runner: Callable[[argparse.Namespace], bool], parsed: argparse.Namespace
+) -> bool:
+    """Runs the subcommand as a phase of the self profiling if ``--profile-self``"""
+    if parsed.profile_self is None:
+        return runner(parsed)
+
+    profiler = self_profile.start(parsed.profile_self)
+    try:
+        with profiler.phase(parsed.subcommand):
+            return runner(parsed)
+    finally:
+        self_profile.stop()
+        profiler.dump()
+
+
 def main(args: Optional[list[str]] = None):
     parser = get_parser()
     parsed = parser.parse_args(args)
@@ -121,7 +163,7 @@ def main(args: Optional[list[str]] = None):
 
     runner = select_runner(parsed.subcommand)
     if runner:
-        sys.exit(0 if runner(parsed) else 1)
+        sys.exit(0 if run_subcommand(runner, parsed) else 1)
     else:
         parser.print_help()
 
@@ -70,3 +70,13 @@ def add_include_exclude_argument(
         default=[],
         type=str,
     )
+
+
+def add_profile_self_argument(parser: argparse.ArgumentParser) -> argparse.Action:
+    return parser.add_argument(
+        "--profile-self",
+        metavar="DIR",
+        type=pathlib.Path,
+        help="Write cProfile stats and tracemalloc snapshots of competitive-verifier "
+        "itself for each phase to the directory",
+    )
@@ -0,0 +1,285 @@
+import contextlib
+import math
+import os
+import pathlib
+import statistics
+import sys
+from collections.abc import Iterator
+from logging import getLogger
+from typing import Optional
+
+from onlinejudge_command.subcommand.test import JudgeStatus
+from pydantic import BaseModel, Field
+
+from competitive_verifier.error import VerifierError
+from competitive_verifier.models import (
+    ForcePosixPath,
+    ProblemVerification,
+    ShellCommand,
+)
+from competitive_verifier.oj.tools.test_command import (
+    OjTestArguments,
+    get_test_arguments,
+    match_output,
+    oj_exec_command,
+    prepare_tests,
+)
+
+logger = getLogger(__name__)
+
+
+class BenchStatistics(BaseModel):
+    mean: float = Field(
+        description="The mean of the measured values.",
+    )
+    """The mean of the measured values.
+    """
+
+    median: float = Field(
+        description="The median of the measured values.",
+    )
+    """The median of the measured values.
+    """
+
+    p95: float = Field(
+        description="The 95th percentile of the measured values.",
+    )
+    """The 95th percentile of the measured values.
+    """
+
+    @classmethod
+    def from_values(cls, values: list[float]) -> "BenchStatistics":
+        ordered = sorted(values)
+        # the nearest-rank method
+        rank = max(1, math.ceil(len(ordered) * 0.95))
+        return cls(
+            mean=statistics.fmean(ordered),
+            median=statistics.median(ordered),
+            p95=ordered[rank - 1],
+        )
+
+
+class BenchCaseResult(BaseModel):
+    name: str = Field(
+        description="The name of test case.",
+    )
+    """The name of test case.
+    """
+
+    status: JudgeStatus = Field(
+        description="The first failure in the measured runs, or AC.",
+    )
+    """The first failure in the measured runs, or AC.
+    """
+
+    wall: BenchStatistics = Field(
+        description="The wall-clock seconds of the measured runs.",
+    )
+    """The wall-clock seconds of the measured runs.
+    """
+
+    cpu: Optional[BenchStatistics] = Field(
+        default=None,
+        description="The user and system CPU seconds of the measured runs.",
+    )
+    """The user and system CPU seconds of the measured runs.
+    """
+
+    memory: Optional[float] = Field(
+        default=None,
+        description="The peak RSS of the measured runs in megabytes.",
+    )
+    """The peak RSS of the measured runs in megabytes.
+    """
+
+
+class BenchVerificationResult(BaseModel):
+    verification_name: Optional[str] = Field(
+        default=None,
+        description="The name of verification.",
+    )
+    """The name of verification.
+    """
+
+    problem: str = Field(
+        description="The URL of problem.",
+    )
+    """The URL of problem.
+    """
+
+    cases: list[BenchCaseResult] = Field(
+        default_factory=list,
+        description="The results of each test case.",
+    )
+    """The results of each test case.
+    """
+
+
+class BenchResult(BaseModel):
+    repeat: int = Field(
+        description="The number of measured runs of each test case.",
+    )
+    """The number of measured runs of each test case.
+    """
+
+    warmup: int = Field(
+        description="The number of runs of each test case before the measurement.",
+    )
+    """The number of runs of each test case before the measurement.
+    """
+
+    cpu: Optional[int] = Field(
+        default=None,
+        description="The CPU to which the programs were pinned.",
+    )
+    """The CPU to which the programs were pinned.
+    """
+
+    files: dict[ForcePosixPath, list[BenchVerificationResult]] = Field(
+        default_factory=dict,
+        description="The results of each verification of the files.",
+    )
+    """The results of each verification of the files.
+    """
+
+
+def children_cpu_time() -> Optional[float]:
+    """The CPU seconds used by the terminated child processes"""
+    if sys.platform == "win32":
+        return None
+    import resource
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@contextlib.contextmanager
+def pin_cpu(cpu: Optional[int]) -> Iterator[None]:
+    """Pins the process to the CPU. The child processes inherit it."""
+    if cpu is None:
+        yield
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        raise VerifierError("--cpu is not supported on this platform.")
+    original = os.sched_getaffinity(0)
+    try:
+        os.sched_setaffinity(0, {cpu})
+    except OSError as e:
+        raise VerifierError(f"Failed to pin to the CPU {cpu}: {e}") from e
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, original)
+
+
+def bench_case(
+    name: str,
+    test_input_path: pathlib.Path,
+    test_output_path: Optional[pathlib.Path],
+    *,
+    args: OjTestArguments,
+    repeat: int,
+    warmup: int,
+) -> BenchCaseResult:
+    """Runs the test case `warmup + repeat` times and measures the last `repeat` runs.
+
+    The output is checked only in the first measured run.
+    """
+    status = JudgeStatus.AC
+    wall: list[float] = []
+    cpu: list[float] = []
+    memory: list[float] = []
+    for i in range(warmup + repeat):
+        cpu_begin = children_cpu_time()
+        with test_input_path.open("rb") as inf:
+            info, proc = oj_exec_command(
+                args.command,
+                env=args.env,
+                stdin=inf,
+                timeout=args.tle,
+                gnu_time=args.gnu_time,
+            )
+        cpu_end = children_cpu_time()
+        if i < warmup:
+            continue
+
+        wall.append(info.elapsed)
+        if cpu_begin is not None and cpu_end is not None:
+            cpu.append(cpu_end - cpu_begin)
+        if info.memory is not None:
+            memory.append(info.memory)
+
+        if status != JudgeStatus.AC:
+            continue
+        if proc.returncode is None:
+            status = JudgeStatus.TLE
+        elif args.mle is not None and info.memory and info.memory > args.mle:
+            status = JudgeStatus.MLE
+        elif proc.returncode != 0:
+            status = JudgeStatus.RE
+        elif i == warmup and (
+            match_output(
+                info.answer or b"", test_input_path, test_output_path, args=args
+            )
+            is False
+        ):
+            status = JudgeStatus.WA
+
+    result = BenchCaseResult(
+        name=name,
+        status=status,
+        wall=BenchStatistics.from_values(wall),
+        cpu=BenchStatistics.from_values(cpu) if cpu else None,
+        memory=max(memory, default=None),
+    )
+    logger.info("%s: %s, median %f sec", name, result.status.value, result.wall.median)
+    return result
+
+
+def bench_verification(
+    verification: ProblemVerification,
+    *,
+    repeat: int,
+    warmup: int,
+    cpu: Optional[int] = None,
+    default_tle: Optional[float] = None,
+    default_mle: Optional[float] = None,
+) -> BenchVerificationResult:
+    """Compiles the verification and measures its test cases.
+
+    Only the test case runs are pinned to `cpu`, so the compile command may use all CPUs.
+    """
+    if not verification.run_compile_command():
+        raise VerifierError(f"Failed to compile: {verification.problem}")
+
+    c = ShellCommand.parse_command_like(verification.command)
+    args = get_test_arguments(
+        url=verification.problem,
+        command=c.command,
+        env=c.env,
+        tle=verification.tle or default_tle,
+        mle=verification.mle or default_mle,
+        error=verification.error,
+    )
+    args.silent = True
+    tests = prepare_tests(args)
+    if not tests:
+        logger.warning("No test cases: %s", verification.problem)
+
+    with pin_cpu(cpu):
+        cases = [
+            bench_case(
+                name,
+                paths["in"],
+                paths.get("out"),
+                args=args,
+                repeat=repeat,
+                warmup=warmup,
+            )
+            for name, paths in sorted(tests.items())
+        ]
+    return BenchVerificationResult(
+        verification_name=verification.name,
+        problem=verification.problem,
+        cases=cases,
+    )
@@ -0,0 +1,222 @@
+import argparse
+import logging
+import pathlib
+import sys
+from logging import getLogger
+from typing import Optional, TextIO
+
+from competitive_verifier.arg import (
+    add_verbose_argument,
+    add_verify_files_json_argument,
+)
+from competitive_verifier.bench.benchmark import (
+    BenchResult,
+    BenchVerificationResult,
+    bench_verification,
+)
+from competitive_verifier.download.main import run_impl as run_download
+from competitive_verifier.error import VerifierError
+from competitive_verifier.log import configure_stderr_logging
+from competitive_verifier.models import (
+    JudgeStatus,
+    ProblemVerification,
+    VerificationInput,
+)
+from competitive_verifier.resource import ulimit_stack
+from competitive_verifier.summary import TableWriter, to_human_str_mega_bytes
+from competitive_verifier.util import to_relative
+
+logger = getLogger(__name__)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms"
+
+
+def write_table(fp: TextIO, result: BenchResult) -> None:
+    tb = TableWriter(
+        fp,
+        [
+            "file",
+            "env",
+            "name",
+            "status",
+            "Wall mean",
+            "Wall median",
+            "Wall p95",
+            "CPU median",
+            "Peak RSS",
+        ],
+    )
+    tb.write_table_line(*[":---"] * 3 + [":---:"] + ["---:"] * 5)
+    for p, verifications in result.files.items():
+        for v in verifications:
+            for c in v.cases:
+                tb.write_table_line(
+                    p.as_posix(),
+                    v.verification_name or "",
+                    c.name,
+                    c.status.value,
+                    _ms(c.wall.mean),
+                    _ms(c.wall.median),
+                    _ms(c.wall.p95),
+                    "-" if c.cpu is None else _ms(c.cpu.median),
+                    "-" if c.memory is None else to_human_str_mega_bytes(c.memory),
+                )
+
+
+def run_impl(
+    input: VerificationInput,
+    files: list[pathlib.Path],
+    *,
+    repeat: int = 5,
+    warmup: int = 1,
+    cpu: Optional[int] = None,
+    download: bool = True,
+    default_tle: Optional[float] = None,
+    default_mle: Optional[float] = None,
+) -> BenchResult:
+    if repeat <= 0:
+        raise VerifierError("--repeat must be greater than 0.")
+    if warmup < 0:
+        raise VerifierError("--warmup must not be negative.")
+
+    try:
+        ulimit_stack()
+    except Exception:
+        logger.warning("failed to increase the stack size[ulimit]")
+
+    result = BenchResult(repeat=repeat, warmup=warmup, cpu=cpu)
+    for path in files:
+        path = to_relative(path) or path
+        file = input.files.get(path)
+        if file is None:
+            raise VerifierError(f"{path.as_posix()} is not in verify_files.json.")
+        verifications = [
+            v for v in file.verification_list if isinstance(v, ProblemVerification)
+        ]
+        if not verifications:
+            logger.warning("%s has no problem verification.", path.as_posix())
+            continue
+        if download:
+            run_download(file, check=True)
+
+        results: list[BenchVerificationResult] = []
+        for v in verifications:
+            logger.info("Bench: %s, %s", path.as_posix(), v.problem)
+            results.append(
+                bench_verification(
+                    v,
+                    repeat=repeat,
+                    warmup=warmup,
+                    cpu=cpu,
+                    default_tle=default_tle,
+                    default_mle=default_mle,
+                )
+            )
+        result.files[path] = results
+    return result
+
+
+def run(args: argparse.Namespace) -> bool:
+    default_level = logging.INFO
+    if args.verbose:
+        default_level = logging.DEBUG
+    configure_stderr_logging(default_level)
+
+    logger.debug("arguments=%s", vars(args))
+    input = VerificationInput.parse_file_relative(args.verify_files_json)
+    result = run_impl(
+        input,
+        args.files,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        cpu=args.cpu,
+        download=args.download,
+        default_tle=args.default_tle,
+        default_mle=args.default_mle,
+    )
+
+    write_table(sys.stdout, result)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(
+            result.model_dump_json(exclude_none=True), encoding="utf-8"
+        )
+    return all(
+        c.status == JudgeStatus.AC
+        for verifications in result.files.values()
+        for v in verifications
+        for c in v.cases
+    )
+
+
+def argument(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    add_verbose_argument(parser)
+    add_verify_files_json_argument(parser)
+    parser.add_argument(
+        "files",
+        nargs="+",
+        type=pathlib.Path,
+        help="Verification files to measure",
+    )
+    parser.add_argument(
+        "--repeat",
+        "-n",
+        type=int,
+        default=5,
+        help="The number of measured runs of each test case",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="The number of runs of each test case before the measurement",
+    )
+    parser.add_argument(
+        "--cpu",
+        type=int,
+        help="Pin the programs to the CPU by sched_setaffinity",
+    )
+    parser.add_argument(
+        "--tle",
+        dest="default_tle",
+        type=float,
+        default=None,
+        help="Threshold seconds to be TLE",
+    )
+    parser.add_argument(
+        "--mle",
+        dest="default_mle",
+        type=float,
+        default=None,
+        help="Threshold memory usage (MB) to be MLE",
+    )
+    parser.add_argument(
+        "--no-download",
+        action="store_false",
+        dest="download",
+        help="Suppress `oj download`",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=pathlib.Path,
+        required=False,
+        help="The output file for which bench saves the result json.",
+    )
+    return parser
+
+
+def main(args: Optional[list[str]] = None) -> None:
+    try:
+        parsed = argument(argparse.ArgumentParser()).parse_args(args)
+        if not run(parsed):
+            sys.exit(1)
+    except Exception as e:
+        sys.stderr.write(str(e))
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
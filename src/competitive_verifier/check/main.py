@@ -3,10 +3,10 @@ import logging
 import pathlib
 import sys
 from collections import Counter
-from functools import reduce
 from logging import getLogger
 from typing import Iterable, Optional
 
+import competitive_verifier.merge_result.main as merge_result
 from competitive_verifier.arg import add_result_json_argument, add_verbose_argument
 from competitive_verifier.log import configure_stderr_logging
 from competitive_verifier.models import ResultStatus, VerifyCommandResult
@@ -15,13 +15,13 @@ logger = getLogger(__name__)
 
 
 def merge(results: Iterable[VerifyCommandResult]) -> VerifyCommandResult:
-    return reduce(lambda a, b: a.merge(b), results)
+    return merge_result.merge(results)
 
 
 def run_impl(*result_json: pathlib.Path) -> bool:
     configure_stderr_logging()
 
-    result = merge(map(VerifyCommandResult.parse_file_relative, result_json))
+    result = merge_result.merge_json_files(*result_json)
 
     counter = Counter(
         r.status for fr in result.files.values() for r in fr.verifications
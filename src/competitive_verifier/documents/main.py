@@ -7,6 +7,7 @@ from typing import Optional
 
 import competitive_verifier.config as config
 import competitive_verifier.merge_result.main as merge_result
+from competitive_verifier import self_profile
 from competitive_verifier.arg import (
     add_ignore_error_argument,
     add_include_exclude_argument,
@@ -64,7 +65,8 @@ def run(args: argparse.Namespace) -> bool:
     logger.info("verify_files_json=%s", str(args.verify_files_json))
     logger.info("result_json=%s", [str(p) for p in args.result_json])
 
-    input = VerificationInput.parse_file_relative(args.verify_files_json)
+    with self_profile.phase("resolve"):
+        input = VerificationInput.parse_file_relative(args.verify_files_json)
     result = merge_result.run_impl(
         *args.result_json,
         write_summary=args.write_summary,
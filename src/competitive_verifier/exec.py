@@ -26,6 +26,7 @@ def exec_command(
     env: Optional[dict[str, str]] = None,
     cwd: Optional["StrOrBytesPath"] = None,
     group_log: bool = False,
+    input: Optional[Union[str, bytes]] = None,
 ) -> subprocess.CompletedProcess[bytes]:
     ...
 
@@ -40,6 +41,7 @@ def exec_command(
     env: Optional[dict[str, str]] = None,
     cwd: Optional["StrOrBytesPath"] = None,
     group_log: bool = False,
+    input: Optional[Union[str, bytes]] = None,
 ) -> subprocess.CompletedProcess[str]:
     ...
 
@@ -54,6 +56,7 @@ def exec_command(
     env: Optional[dict[str, str]] = None,
     cwd: Optional["StrOrBytesPath"] = None,
     group_log: bool = False,
+    input: Optional[Union[str, bytes]] = None,
 ) -> Union[subprocess.CompletedProcess[str], subprocess.CompletedProcess[bytes]]:
     ...
 
@@ -67,6 +70,7 @@ def exec_command(
     env: Optional[dict[str, str]] = None,
     cwd: Optional["StrOrBytesPath"] = None,
     group_log: bool = False,
+    input: Optional[Union[str, bytes]] = None,
 ) -> Union[subprocess.CompletedProcess[str], subprocess.CompletedProcess[bytes]]:
     if group_log:
         cm = log.group(f"subprocess.run: {command}")
@@ -88,4 +92,5 @@ def exec_command(
             cwd=cwd,
             capture_output=capture_output,
             encoding=encoding,
+            input=input,
         )
@@ -1,7 +1,13 @@
+import bisect
 import datetime
+import fnmatch
+import functools
+import os
 import pathlib
-from typing import TYPE_CHECKING, Iterable
+import re
+from typing import TYPE_CHECKING, AbstractSet, Iterable, Optional, Sequence
 
+from .error import VerifierError
 from .exec import exec_command
 
 if TYPE_CHECKING:
@@ -19,13 +25,142 @@ def get_commit_time(files: Iterable[pathlib.Path]) -> datetime.datetime:
     return datetime.datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S %z")
 
 
-def ls_files(*args: "StrPath") -> set[pathlib.Path]:
+def _ls_files(*args: "StrPath") -> list[str]:
     stdout = exec_command(
         ["git", "ls-files", "-z"] + list(str(p) for p in (args or [])),
         text=True,
         capture_output=True,
     ).stdout
-    return set(map(pathlib.Path, filter(lambda p: p, stdout.split("\0"))))
+    return list(filter(lambda p: p, stdout.split("\0")))
+
+
+@functools.lru_cache(maxsize=None)
+def _ls_all_files(cwd: pathlib.Path) -> tuple[tuple[str, ...], frozenset[str]]:
+    files = tuple(sorted(_ls_files()))
+    return files, frozenset(files)
+
+
+def _normalize_pathspec(spec: "StrPath", cwd: pathlib.Path) -> Optional[str]:
+    """Returns the pathspec relative to `cwd`, or None if it is not under `cwd` or uses magic signatures."""
+    spec = os.fspath(spec)
+    if not spec or spec.startswith(":"):
+        return None
+    if os.path.isabs(spec):
+        try:
+            spec = os.path.relpath(spec, cwd)
+        except ValueError:
+            return None
+    normalized = pathlib.PurePath(os.path.normpath(spec)).as_posix()
+    if normalized == ".." or normalized.startswith("../"):
+        return None
+    if normalized == ".":
+        return ""
+    if spec.replace(os.sep, "/").endswith(("/", "/.")):
+        # only directories match
+        return normalized + "/"
+    return normalized
+
+
+class _PathSpecMatcher:
+    """Matches paths relative to the working directory like pathspecs of `git ls-files`.
+
+    A pathspec matches the same path, the files under the directory and, if it contains wildcards, the paths which `fnmatch` matches. All wildcards are compiled into one regex.
+    """
+
+    literals: list[str]
+    pattern: Optional["re.Pattern[str]"]
+
+    def __init__(self, specs: Iterable[str]) -> None:
+        self.literals = []
+        patterns: list[str] = []
+        for spec in specs:
+            self.literals.append(spec)
+            if any(c in spec for c in "*?[") and not spec.endswith("/"):
+                patterns.append(fnmatch.translate(spec))
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def filter(self, files: Sequence[str], files_set: AbstractSet[str]) -> set[str]:
+        """Filters `files`, which must be sorted. `files_set` is the set of `files`."""
+        matched: set[str] = set()
+        for literal in self.literals:
+            if not literal:
+                return set(files)
+            if literal.endswith("/"):
+                literal = literal[:-1]
+            elif literal in files_set:
+                matched.add(literal)
+            # "0" is the next character of "/"
+            begin = bisect.bisect_left(files, literal + "/")
+            end = bisect.bisect_left(files, literal + "0", begin)
+            matched.update(files[begin:end])
+        if self.pattern is not None:
+            matched.update(filter(self.pattern.match, files))
+        return matched
+
+
+def ls_files(*args: "StrPath") -> set[pathlib.Path]:
+    """Lists files tracked by git like `git ls-files`.
+
+    `git ls-files` runs once per working directory and pathspecs are matched against its result.
+    Pathspecs outside the working directory or with magic signatures are passed to git as is.
+    """
+    cwd = pathlib.Path.cwd()
+    files, files_set = _ls_all_files(cwd)
+    if not args:
+        return set(map(pathlib.Path, files))
+
+    specs: list[str] = []
+    unsupported: list["StrPath"] = []
+    for arg in args:
+        spec = _normalize_pathspec(arg, cwd)
+        if spec is None:
+            unsupported.append(arg)
+        else:
+            specs.append(spec)
+
+    matched = _PathSpecMatcher(specs).filter(files, files_set)
+    if unsupported:
+        matched.update(_ls_files(*unsupported))
+    return set(map(pathlib.Path, matched))
+
+
+def clear_ls_files_cache() -> None:
+    _ls_all_files.cache_clear()
+
+
+def ls_untracked_files() -> set[pathlib.Path]:
+    """Lists files which are neither tracked nor ignored, like `git status` shows."""
+    stdout = exec_command(
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+        text=True,
+        capture_output=True,
+    ).stdout
+    return set(pathlib.Path(p) for p in stdout.split("\0") if p)
+
+
+def get_commit_hash() -> Optional[str]:
+    """The hash of HEAD, or None if it is not in a git repository"""
+    proc = exec_command(["git", "rev-parse", "HEAD"], text=True, capture_output=True)
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.strip()
+
+
+def get_changed_files(rev: str) -> set[pathlib.Path]:
+    """Lists files which differ between `rev` and the working tree, and untracked files.
+
+    Paths are relative to the current directory. Files outside it are excluded.
+    """
+    diff = exec_command(
+        ["git", "diff", "--name-only", "--no-renames", "--relative", "-z", rev, "--"],
+        text=True,
+        capture_output=True,
+    )
+    if diff.returncode != 0:
+        raise VerifierError(f"Failed to get changed files since {rev}: {diff.stderr}")
+    return set(pathlib.Path(p) for p in diff.stdout.split("\0") if p).union(
+        ls_untracked_files()
+    )
 
 
 def get_root_directory() -> pathlib.Path:
@@ -0,0 +1,239 @@
+import datetime
+import pathlib
+import sqlite3
+import statistics
+from logging import getLogger
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from competitive_verifier.models import JudgeStatus, VerifyCommandResult
+
+if TYPE_CHECKING:
+    from _typeshed import StrPath
+
+logger = getLogger(__name__)
+
+DEFAULT_RUNS = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    "commit" TEXT,
+    toolchain TEXT,
+    recorded_at TEXT NOT NULL,
+    total_seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verifications (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    verification_name TEXT,
+    status TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    slowest REAL,
+    heaviest REAL,
+    last_execution_time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verifications_path
+    ON verifications(path, verification_name, run_id);
+CREATE TABLE IF NOT EXISTS testcases (
+    verification_id INTEGER NOT NULL REFERENCES verifications(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    memory REAL
+);
+CREATE INDEX IF NOT EXISTS testcases_verification
+    ON testcases(verification_id, name);
+"""
+
+
+class HistoryDB:
+    """The history of verification results in a SQLite database.
+
+    Each run appends the results of the files verified in it, keyed by the commit
+    and the toolchain fingerprint.
+    """
+
+    path: pathlib.Path
+
+    def __init__(self, path: "StrPath") -> None:
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "HistoryDB":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def record(
+        self,
+        result: VerifyCommandResult,
+        *,
+        commit: Optional[str],
+        toolchain: Optional[str],
+        recorded_at: Optional[datetime.datetime] = None,
+    ) -> int:
+        """Appends a run. Files carried over from previous results are not recorded.
+
+        Returns:
+            int: The id of the run
+        """
+        recorded_at = recorded_at or datetime.datetime.now(datetime.timezone.utc)
+        with self._conn:
+            cur = self._conn.execute(
+                'INSERT INTO runs ("commit", toolchain, recorded_at, total_seconds)'
+                " VALUES (?, ?, ?, ?)",
+                (commit, toolchain, recorded_at.isoformat(), result.total_seconds),
+            )
+            run_id = cur.lastrowid
+            assert run_id is not None
+            for path, file_result in result.files.items():
+                if not file_result.newest:
+                    continue
+                for v in file_result.verifications:
+                    cur = self._conn.execute(
+                        "INSERT INTO verifications (run_id, path, verification_name,"
+                        " status, elapsed, slowest, heaviest, last_execution_time)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            run_id,
+                            path.as_posix(),
+                            v.verification_name,
+                            v.status.value,
+                            v.elapsed,
+                            v.slowest,
+                            v.heaviest,
+                            v.last_execution_time.isoformat(),
+                        ),
+                    )
+                    if v.testcases:
+                        self._conn.executemany(
+                            "INSERT INTO testcases"
+                            " (verification_id, name, status, elapsed, memory)"
+                            " VALUES (?, ?, ?, ?, ?)",
+                            (
+                                (
+                                    cur.lastrowid,
+                                    c.name,
+                                    c.status.value,
+                                    c.elapsed,
+                                    c.memory,
+                                )
+                                for c in v.testcases
+                            ),
+                        )
+        logger.info("recorded the run %d in %s", run_id, self.path.as_posix())
+        return run_id
+
+    def testcase_history(
+        self,
+        path: pathlib.Path,
+        verification_name: Optional[str],
+        name: str,
+        *,
+        runs: int = DEFAULT_RUNS,
+        toolchain: Optional[str] = None,
+    ) -> list[tuple[float, Optional[float]]]:
+        """The elapsed seconds and memory of a test case in the last `runs` runs.
+
+        Args:
+            toolchain (Optional[str]): If given, only the runs with the toolchain
+
+        Returns:
+            list[tuple[float, Optional[float]]]: (elapsed, memory), the newest first
+        """
+        return self._conn.execute(
+            "SELECT t.elapsed, t.memory FROM testcases t"
+            " JOIN verifications v ON t.verification_id = v.id"
+            " JOIN runs r ON v.run_id = r.id"
+            " WHERE v.path = ? AND v.verification_name IS ? AND t.name = ?"
+            " AND (? IS NULL OR r.toolchain = ?)"
+            " ORDER BY v.run_id DESC LIMIT ?",
+            (path.as_posix(), verification_name, name, toolchain, toolchain, runs),
+        ).fetchall()
+
+    def median_testcase_elapsed(
+        self,
+        path: pathlib.Path,
+        verification_name: Optional[str],
+        name: str,
+        *,
+        runs: int = DEFAULT_RUNS,
+        toolchain: Optional[str] = None,
+    ) -> Optional[float]:
+        """The median elapsed seconds of a test case in the last `runs` runs"""
+        history = self.testcase_history(
+            path, verification_name, name, runs=runs, toolchain=toolchain
+        )
+        if not history:
+            return None
+        return statistics.median(e for e, _ in history)
+
+    def median_testcases(
+        self,
+        path: pathlib.Path,
+        verification_name: Optional[str],
+        *,
+        runs: int = DEFAULT_RUNS,
+        toolchain: Optional[str] = None,
+    ) -> dict[str, tuple[float, Optional[float]]]:
+        """The median elapsed seconds and memory of the accepted test cases
+        in the last `runs` runs which verified the verification.
+
+        Returns:
+            dict[str, tuple[float, Optional[float]]]: name -> (elapsed, memory)
+        """
+        rows = self._conn.execute(
+            "SELECT t.name, t.elapsed, t.memory FROM testcases t"
+            " WHERE t.status = ? AND t.verification_id IN ("
+            "SELECT v.id FROM verifications v JOIN runs r ON v.run_id = r.id"
+            " WHERE v.path = ? AND v.verification_name IS ?"
+            " AND (? IS NULL OR r.toolchain = ?)"
+            " ORDER BY v.run_id DESC LIMIT ?)",
+            (
+                JudgeStatus.AC.value,
+                path.as_posix(),
+                verification_name,
+                toolchain,
+                toolchain,
+                runs,
+            ),
+        )
+        elapsed: dict[str, list[float]] = {}
+        memory: dict[str, list[float]] = {}
+        for name, e, m in rows:
+            elapsed.setdefault(name, []).append(e)
+            if m is not None:
+                memory.setdefault(name, []).append(m)
+        return {
+            name: (
+                statistics.median(e),
+                statistics.median(memory[name]) if name in memory else None,
+            )
+            for name, e in elapsed.items()
+        }
+
+    def median_file_elapsed(
+        self, paths: Iterable[pathlib.Path], *, runs: int = DEFAULT_RUNS
+    ) -> dict[pathlib.Path, float]:
+        """The median total elapsed seconds of the files in the last `runs` runs
+        which verified them. Files never recorded are omitted.
+        """
+        result: dict[pathlib.Path, float] = {}
+        for path in paths:
+            rows = self._conn.execute(
+                "SELECT SUM(elapsed) FROM verifications WHERE path = ?"
+                " GROUP BY run_id ORDER BY run_id DESC LIMIT ?",
+                (path.as_posix(), runs),
+            ).fetchall()
+            if rows:
+                result[path] = statistics.median(r[0] for r in rows)
+        return result
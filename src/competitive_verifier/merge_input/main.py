@@ -1,28 +1,94 @@
 import argparse
+import json
 import logging
 import pathlib
 import sys
-from functools import reduce
 from logging import getLogger
-from typing import Iterable, Optional
+from typing import Any, Iterable, Optional
 
+from pydantic import ValidationError
+
+from competitive_verifier import self_profile
 from competitive_verifier.arg import add_verbose_argument
+from competitive_verifier.error import VerifierError
 from competitive_verifier.log import configure_stderr_logging
 from competitive_verifier.models import VerificationInput
+from competitive_verifier.util import map_file_chunks, to_relative
 
 logger = getLogger(__name__)
 
 
+_Files = dict[pathlib.Path, Any]
+
+
 def merge(inputs: Iterable[VerificationInput]) -> VerificationInput:
-    return reduce(lambda a, b: a.merge(b), inputs)
+    files: _Files = {}
+    for input in inputs:
+        files.update(input.files)
+    return VerificationInput(files=files)
+
+
+def _load_json(path: pathlib.Path) -> Any:
+    try:
+        with path.open("rb") as fp:
+            return json.load(fp)
+    except ValueError as e:
+        raise VerifierError(f"{path} is not a verify_files.json: {e}", inner=e) from e
+
+
+def _validate_json_files(paths: Iterable[pathlib.Path]) -> None:
+    """Finds the file which makes the merged data invalid"""
+    for path in paths:
+        try:
+            VerificationInput.model_validate_json(path.read_bytes())
+        except ValidationError as e:
+            raise VerifierError(
+                f"{path} is not a verify_files.json: {e}", inner=e
+            ) from e
+
+
+def _merge_json_files(paths: list[pathlib.Path]) -> _Files:
+    """Merges verify_files.json files without validating the files"""
+    files: _Files = {}
+    relative: dict[str, Optional[pathlib.Path]] = {}
+    for path in paths:
+        data = _load_json(path)
+        if not isinstance(data, dict):
+            raise VerifierError(f"{path} is not a verify_files.json")
+        for k, f in data.get("files", {}).items():
+            if k not in relative:
+                relative[k] = to_relative(pathlib.Path(k))
+            p = relative[k]
+            if p:
+                files[p] = f
+    return files
+
+
+def merge_json_files(*verify_files_json: pathlib.Path) -> VerificationInput:
+    """Merges verify_files.json files in order.
+
+    Chunks of the files are parsed and merged in parallel, and only the merged
+    input is validated.
+    """
+    files: _Files = {}
+    for chunk in map_file_chunks(_merge_json_files, verify_files_json):
+        files.update(chunk)
+    try:
+        result = VerificationInput.model_validate({"files": files})
+    except ValidationError:
+        _validate_json_files(verify_files_json)
+        raise
+    for f in result.files.values():
+        f.dependencies = set(d for d in map(to_relative, f.dependencies) if d)
+    return result
 
 
 def run_impl(
     *verify_files_json: pathlib.Path,
 ) -> VerificationInput:
     configure_stderr_logging()
-    result = merge(map(VerificationInput.parse_file_relative, verify_files_json))
-    return result
+    with self_profile.phase("merge"):
+        return merge_json_files(*verify_files_json)
 
 
 def run(args: argparse.Namespace) -> bool:
@@ -1,25 +1,114 @@
 import argparse
+import json
 import logging
 import pathlib
 import sys
-from functools import reduce
 from logging import getLogger
-from typing import Iterable, Optional
+from typing import Any, Iterable, Optional
 
-from competitive_verifier import github, summary
+from pydantic import ValidationError
+
+from competitive_verifier import github, self_profile, summary
 from competitive_verifier.arg import (
     add_result_json_argument,
     add_verbose_argument,
     add_write_summary_argument,
 )
+from competitive_verifier.error import VerifierError
 from competitive_verifier.log import configure_stderr_logging
-from competitive_verifier.models import VerifyCommandResult
+from competitive_verifier.models import FileResult, VerifyCommandResult
+from competitive_verifier.util import map_file_chunks, to_relative
 
 logger = getLogger(__name__)
 
 
+_Files = dict[pathlib.Path, Any]
+
+
+def _is_newest(r: Any) -> bool:
+    if isinstance(r, FileResult):
+        return r.newest
+    return r.get("newest", True)
+
+
+def _merge_files_into(files: _Files, other: _Files) -> None:
+    """Merges `other` into `files` as `VerifyCommandResult.merge` does.
+
+    A result wins if it is newest or the current one is not,
+    so the last newest result wins, or the last result if none is newest.
+    """
+    for k, r in other.items():
+        cur = files.get(k)
+        if cur is None or _is_newest(r) or not _is_newest(cur):
+            files[k] = r
+
+
 def merge(results: Iterable[VerifyCommandResult]) -> VerifyCommandResult:
-    return reduce(lambda a, b: a.merge(b), results)
+    total_seconds = 0.0
+    files: _Files = {}
+    for r in results:
+        total_seconds += r.total_seconds
+        _merge_files_into(files, r.files)
+    return VerifyCommandResult(total_seconds=total_seconds, files=files)
+
+
+def _load_json(path: pathlib.Path) -> Any:
+    try:
+        with path.open("rb") as fp:
+            return json.load(fp)
+    except ValueError as e:
+        raise VerifierError(f"{path} is not a result json: {e}", inner=e) from e
+
+
+def _validate_json_files(paths: Iterable[pathlib.Path]) -> None:
+    """Finds the file which makes the merged data invalid"""
+    for path in paths:
+        try:
+            VerifyCommandResult.model_validate_json(path.read_bytes())
+        except ValidationError as e:
+            raise VerifierError(f"{path} is not a result json: {e}", inner=e) from e
+
+
+def _merge_json_files(paths: list[pathlib.Path]) -> tuple[float, _Files]:
+    """Merges result json files without validating the file results"""
+    total_seconds = 0.0
+    files: _Files = {}
+    relative: dict[str, Optional[pathlib.Path]] = {}
+    for path in paths:
+        data = _load_json(path)
+        if not isinstance(data, dict) or "total_seconds" not in data:
+            raise VerifierError(f"{path} is not a result json")
+        total_seconds += data["total_seconds"]
+
+        shard: _Files = {}
+        for k, r in data.get("files", {}).items():
+            if k not in relative:
+                relative[k] = to_relative(pathlib.Path(k))
+            p = relative[k]
+            if p:
+                shard[p] = r
+        _merge_files_into(files, shard)
+    return total_seconds, files
+
+
+def merge_json_files(*result_json: pathlib.Path) -> VerifyCommandResult:
+    """Merges result json files in order.
+
+    Chunks of the files are parsed and merged in parallel, and only the merged
+    result is validated.
+    """
+    total_seconds = 0.0
+    files: _Files = {}
+    for chunk_seconds, chunk_files in map_file_chunks(_merge_json_files, result_json):
+        total_seconds += chunk_seconds
+        _merge_files_into(files, chunk_files)
+    try:
+        return VerifyCommandResult.model_validate(
+            {"total_seconds": total_seconds, "files": files}
+        )
+    except ValidationError:
+        _validate_json_files(result_json)
+        raise
 
 
 def run_impl(
@@ -27,7 +116,8 @@ def run_impl(
     write_summary: bool = False,
 ) -> VerifyCommandResult:
     configure_stderr_logging()
-    result = merge(map(VerifyCommandResult.parse_file_relative, result_json))
+    with self_profile.phase("merge"):
+        result = merge_json_files(*result_json)
     if write_summary:
         gh_summary_path = github.env.get_step_summary_path()
         if gh_summary_path and gh_summary_path.parent.exists():
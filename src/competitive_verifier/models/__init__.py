@@ -8,7 +8,10 @@ from .path import ForcePosixPath, RelativeDirectoryPath, SortedPathList, SortedP
 from .result import (
     FileResult,
     JudgeStatus,
+    PerformanceRegression,
+    RegressionKind,
     TestcaseResult,
+    TestcaseResults,
     VerificationResult,
     VerifyCommandResult,
 )
@@ -35,7 +38,10 @@ __all__ = [
     "ResultStatus",
     "VerifyCommandResult",
     "TestcaseResult",
+    "TestcaseResults",
     "JudgeStatus",
+    "PerformanceRegression",
+    "RegressionKind",
     "BaseVerification",
     "ShellCommand",
     "ShellCommandLike",
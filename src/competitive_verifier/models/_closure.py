@@ -0,0 +1,109 @@
+import pathlib
+from collections.abc import Iterator, Mapping
+from itertools import compress
+from typing import Iterable, TypeVar
+
+from ._scc import SccGraph
+
+_T = TypeVar("_T")
+
+
+_BITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _select(items: list[_T], mask: int) -> Iterator[_T]:
+    """Yields ``items[i]`` for each bit ``i`` set in ``mask``."""
+    return compress(items, bin(mask)[:1:-1].encode().translate(_BITS))
+
+
+class DependencyClosure:
+    """Strongly connected components and transitive closures of a dependency graph.
+
+    The closure of each component is an integer bitset over vertex indices, which is
+    computed once over the condensation DAG.
+    """
+
+    paths: list[pathlib.Path]
+    index: dict[pathlib.Path, int]
+    groups: list[list[int]]
+    """Components in the topological order. Dependents are ahead."""
+    group_ids: list[int]
+    masks: list[int]
+    """The bitset of the transitive dependencies of each component."""
+
+    def __init__(
+        self,
+        paths: Iterable[pathlib.Path],
+        dependencies: Iterable[tuple[pathlib.Path, Iterable[pathlib.Path]]],
+    ) -> None:
+        self.paths = list(paths)
+        self.index = {p: i for i, p in enumerate(self.paths)}
+        index = self.index
+
+        edges: list[tuple[int, int]] = []
+        for p, deps in dependencies:
+            src = index[p]
+            for dep in deps:
+                dst = index.get(dep)
+                if dst is not None:
+                    edges.append((src, dst))
+        g = SccGraph(len(self.paths))
+        for src, dst in edges:
+            g.add_edge(src, dst)
+
+        group_num, self.group_ids = g.scc_ids()
+        self.groups = [[] for _ in range(group_num)]
+        for i, c in enumerate(self.group_ids):
+            self.groups[c].append(i)
+
+        # Every edge goes to the same or a later component, so the components
+        # are processed from the last one.
+        group_ids = self.group_ids
+        successors: list[set[int]] = [set() for _ in range(group_num)]
+        for src, dst in edges:
+            c, d = group_ids[src], group_ids[dst]
+            if c != d:
+                successors[c].add(d)
+        masks = [0] * group_num
+        for c in range(group_num - 1, -1, -1):
+            mask = 0
+            for i in self.groups[c]:
+                mask |= 1 << i
+            for d in successors[c]:
+                mask |= masks[d]
+            masks[c] = mask
+        self.masks = masks
+
+    def closure_mask(self, path: pathlib.Path) -> int:
+        return self.masks[self.group_ids[self.index[path]]]
+
+    def to_paths(self, mask: int) -> set[pathlib.Path]:
+        return set(_select(self.paths, mask))
+
+
+class TransitiveDependencies(Mapping[pathlib.Path, set[pathlib.Path]]):
+    """A mapping to the transitive dependencies which creates each set on demand.
+
+    The files in a strongly connected component share the same set.
+    """
+
+    def __init__(self, closure: DependencyClosure) -> None:
+        self._closure = closure
+        self._sets: dict[int, set[pathlib.Path]] = {}
+
+    def __getitem__(self, key: pathlib.Path) -> set[pathlib.Path]:
+        closure = self._closure
+        c = closure.group_ids[closure.index[key]]
+        s = self._sets.get(c)
+        if s is None:
+            s = self._sets[c] = closure.to_paths(closure.masks[c])
+        return s
+
+    def __iter__(self) -> Iterator[pathlib.Path]:
+        return iter(self._closure.paths)
+
+    def __len__(self) -> int:
+        return len(self._closure.paths)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._closure.index
@@ -1,9 +1,9 @@
 """
-Copy from ac-library-python
+Based on ac-library-python
 https://github.com/not522/ac-library-python/blob/58f324ec020d57191e7b9e4957b0c5feb5ed3aff/atcoder/_scc.py
-"""
 
-import sys
+The depth-first search is iterative, so deep graphs need no recursion limit.
+"""
 
 
 class CSR:
@@ -41,51 +41,54 @@ class SccGraph:
         self._edges.append((from_vertex, to_vertex))
 
     def scc_ids(self) -> tuple[int, list[int]]:
-        g = CSR(self._n, self._edges)
+        n = self._n
+        g = CSR(n, self._edges)
+        start = g.start
+        elist = g.elist
         now_ord = 0
         group_num = 0
         visited: list[int] = []
-        low = [0] * self._n
-        order = [-1] * self._n
-        ids = [0] * self._n
-
-        sys.setrecursionlimit(max(self._n + 1000, sys.getrecursionlimit()))
-
-        def dfs(v: int) -> None:
-            nonlocal now_ord
-            nonlocal group_num
-            nonlocal visited
-            nonlocal low
-            nonlocal order
-            nonlocal ids
-
-            low[v] = now_ord
-            order[v] = now_ord
+        low = [0] * n
+        order = [-1] * n
+        ids = [0] * n
+        # the next edge to scan for each vertex on the DFS stack
+        next_edge = start[:n]
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            low[root] = order[root] = now_ord
             now_ord += 1
-            visited.append(v)
-            for i in range(g.start[v], g.start[v + 1]):
-                to = g.elist[i]
-                if order[to] == -1:
-                    dfs(to)
-                    low[v] = min(low[v], low[to])
-                else:
-                    low[v] = min(low[v], order[to])
-
-            if low[v] == order[v]:
-                while True:
-                    u = visited[-1]
-                    visited.pop()
-                    order[u] = self._n
-                    ids[u] = group_num
-                    if u == v:
-                        break
-                group_num += 1
-
-        for i in range(self._n):
-            if order[i] == -1:
-                dfs(i)
-
-        for i in range(self._n):
+            visited.append(root)
+            stack = [root]
+            while stack:
+                v = stack[-1]
+                i = next_edge[v]
+                if i < start[v + 1]:
+                    next_edge[v] = i + 1
+                    to = elist[i]
+                    if order[to] == -1:
+                        low[to] = order[to] = now_ord
+                        now_ord += 1
+                        visited.append(to)
+                        stack.append(to)
+                    elif order[to] < low[v]:
+                        low[v] = order[to]
+                    continue
+
+                stack.pop()
+                if low[v] == order[v]:
+                    while True:
+                        u = visited.pop()
+                        order[u] = n
+                        ids[u] = group_num
+                        if u == v:
+                            break
+                    group_num += 1
+                if stack and low[v] < low[stack[-1]]:
+                    low[stack[-1]] = low[v]
+
+        for i in range(n):
             ids[i] = group_num - 1 - ids[i]
 
         return group_num, ids
@@ -2,13 +2,13 @@ import enum
 import pathlib
 from functools import cached_property
 from logging import getLogger
-from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Union
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, NamedTuple, Optional, Union
 
 from pydantic import BaseModel, Field
 
 from competitive_verifier.util import to_relative
 
-from ._scc import SccGraph
+from ._closure import DependencyClosure, TransitiveDependencies
 from .path import ForcePosixPath, SortedPathSet
 from .result import FileResult
 from .verification import Verification
@@ -152,6 +152,13 @@ class VerificationInput(BaseModel):
         impl.files = new_files
         return impl
 
+    @cached_property
+    def _closure(self) -> DependencyClosure:
+        return DependencyClosure(
+            self.files.keys(),
+            ((p, f.dependencies) for p, f in self.files.items()),
+        )
+
     def scc(self, *, reversed: bool = False) -> list[set[pathlib.Path]]:
         """Strongly Connected Component
 
@@ -161,35 +168,13 @@ class VerificationInput(BaseModel):
         Returns:
             list[set[pathlib.Path]]: Strongly Connected Component result
         """
-        paths = list(p for p in self.files.keys())
-        vers_rev = {v: i for i, v in enumerate(paths)}
-        g = SccGraph(len(paths))
-        for p, file in self.files.items():
-            for e in file.dependencies:
-                t = vers_rev.get(e, -1)
-                if 0 <= t:
-                    if reversed:
-                        g.add_edge(t, vers_rev[p])
-                    else:
-                        g.add_edge(vers_rev[p], t)
-        return [set(paths[ix] for ix in ls) for ls in g.scc()]
+        closure = self._closure
+        groups = closure.groups[::-1] if reversed else closure.groups
+        return [set(closure.paths[ix] for ix in ls) for ls in groups]
 
     @cached_property
-    def transitive_depends_on(self) -> _DependencyEdges:
-        d: _DependencyEdges = {}
-        g = self.scc(reversed=True)
-        for group in g:
-            result = group.copy()
-            for p in group:
-                for dep in self.files[p].dependencies:
-                    if dep not in result:
-                        resolved = d.get(dep)
-                        if resolved is not None:
-                            result.update(resolved)
-            for p in group:
-                d[p] = result
-
-        return d
+    def transitive_depends_on(self) -> Mapping[pathlib.Path, set[pathlib.Path]]:
+        return TransitiveDependencies(self._closure)
 
     @cached_property
     def _dependency_graph(
@@ -244,6 +229,24 @@ class VerificationInput(BaseModel):
     def verified_with(self) -> _DependencyEdges:
         return self._dependency_graph.verified_with
 
+    def affected_files(self, changed: Iterable[pathlib.Path]) -> set[pathlib.Path]:
+        """The files which depend on any of `changed` directly or transitively
+
+        Returns:
+            set[pathlib.Path]: The changed files and their dependents in ``files``
+        """
+        required_by = self.required_by
+        verified_with = self.verified_with
+        stack = [p for p in changed if p in self.files]
+        affected = set(stack)
+        while stack:
+            p = stack.pop()
+            for q in required_by[p] | verified_with[p]:
+                if q not in affected:
+                    affected.add(q)
+                    stack.append(q)
+        return affected
+
     def filterd_files(self, files: dict[ForcePosixPath, "FileResult"]):
         for k, v in files.items():
             if k in self.files:
@@ -1,10 +1,21 @@
+import array
 import datetime
+import math
 import pathlib
+from collections.abc import Iterator, Sequence
+from enum import Enum
 from logging import getLogger
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Union, overload
 
 from onlinejudge_command.subcommand.test import JudgeStatus
-from pydantic import BaseModel, Field, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    GetCoreSchemaHandler,
+    SerializationInfo,
+    field_validator,
+)
+from pydantic_core import core_schema
 
 from competitive_verifier.util import to_relative
 
@@ -44,6 +55,240 @@ class TestcaseResult(BaseModel):
     """
 
 
+_STATUSES = tuple(JudgeStatus)
+_STATUS_CODES = {s: i for i, s in enumerate(_STATUSES)}
+
+
+def _to_memory(v: float) -> Optional[float]:
+    return None if math.isnan(v) else v
+
+
+class TestcaseResults(Sequence[TestcaseResult]):
+    """The results of test cases stored as columns.
+
+    A result holds hundreds of thousands of test cases, so it stores them as
+    parallel arrays and creates each `TestcaseResult` on access.
+    The JSON representation is the same as ``list[TestcaseResult]``.
+    """
+
+    __slots__ = ("names", "status_codes", "elapsed", "memory")
+
+    names: list[str]
+    status_codes: bytes
+    """The indices of `JudgeStatus` members."""
+    elapsed: "array.array[float]"
+    memory: "array.array[float]"
+    """NaN means None."""
+
+    def __init__(
+        self,
+        names: Iterable[str] = (),
+        statuses: Iterable[JudgeStatus] = (),
+        elapsed: Iterable[float] = (),
+        memory: Iterable[Optional[float]] = (),
+    ) -> None:
+        self.names = list(names)
+        self.status_codes = bytes(_STATUS_CODES[s] for s in statuses)
+        self.elapsed = array.array("d", elapsed)
+        self.memory = array.array("d", (math.nan if m is None else m for m in memory))
+        if not (
+            len(self.names)
+            == len(self.status_codes)
+            == len(self.elapsed)
+            == len(self.memory)
+        ):
+            raise ValueError("The columns of test cases must have the same length")
+
+    @classmethod
+    def from_items(
+        cls, items: Iterable[Union[TestcaseResult, dict[str, Any]]]
+    ) -> "TestcaseResults":
+        self = cls()
+        status_codes = bytearray()
+        for item in items:
+            if isinstance(item, TestcaseResult):
+                item = item.__dict__
+            self.names.append(item["name"])
+            status_codes.append(_STATUS_CODES[item["status"]])
+            self.elapsed.append(item["elapsed"])
+            m = item.get("memory")
+            self.memory.append(math.nan if m is None else m)
+        self.status_codes = bytes(status_codes)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, index: int) -> TestcaseResult:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TestcaseResults":
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[TestcaseResult, "TestcaseResults"]:
+        if isinstance(index, slice):
+            return TestcaseResults(
+                self.names[index],
+                (_STATUSES[c] for c in self.status_codes[index]),
+                self.elapsed[index],
+                map(_to_memory, self.memory[index]),
+            )
+        return TestcaseResult.model_construct(
+            name=self.names[index],
+            status=_STATUSES[self.status_codes[index]],
+            elapsed=self.elapsed[index],
+            memory=_to_memory(self.memory[index]),
+        )
+
+    def __iter__(self) -> Iterator[TestcaseResult]:
+        for name, code, elapsed, memory in zip(
+            self.names, self.status_codes, self.elapsed, self.memory
+        ):
+            yield TestcaseResult.model_construct(
+                name=name,
+                status=_STATUSES[code],
+                elapsed=elapsed,
+                memory=_to_memory(memory),
+            )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TestcaseResults):
+            # NaN != NaN, so the memory is compared as bytes
+            return (
+                self.names == other.names
+                and self.status_codes == other.status_codes
+                and self.elapsed == other.elapsed
+                and self.memory.tobytes() == other.memory.tobytes()
+            )
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TestcaseResults({list(self)!r})"
+
+    @staticmethod
+    def _serialize(
+        value: Iterable[TestcaseResult], info: SerializationInfo
+    ) -> list[dict[str, Any]]:
+        # The field may be assigned without validation.
+        self = (
+            value
+            if isinstance(value, TestcaseResults)
+            else TestcaseResults.from_items(value)
+        )
+        if info.mode_is_json():
+            statuses = [s.value for s in _STATUSES]
+        else:
+            statuses = list(_STATUSES)
+        exclude_none = info.exclude_none
+        result: list[dict[str, Any]] = []
+        for name, code, elapsed, memory in zip(
+            self.names, self.status_codes, self.elapsed, self.memory
+        ):
+            d = {"name": name, "status": statuses[code], "elapsed": elapsed}
+            if memory == memory:
+                d["memory"] = memory
+            elif not exclude_none:
+                d["memory"] = None
+            result.append(d)
+        return result
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        # Test cases are validated as typed dicts, which is much cheaper than models.
+        item = core_schema.typed_dict_schema(
+            {
+                "name": core_schema.typed_dict_field(core_schema.str_schema()),
+                "status": core_schema.typed_dict_field(
+                    handler.generate_schema(JudgeStatus)
+                ),
+                "elapsed": core_schema.typed_dict_field(core_schema.float_schema()),
+                "memory": core_schema.typed_dict_field(
+                    core_schema.nullable_schema(core_schema.float_schema()),
+                    required=False,
+                ),
+            }
+        )
+        json_items = core_schema.list_schema(item)
+        python_items = core_schema.list_schema(
+            core_schema.union_schema(
+                [core_schema.is_instance_schema(TestcaseResult), item],
+                mode="left_to_right",
+            )
+        )
+        json_schema = core_schema.list_schema(TestcaseResult.__pydantic_core_schema__)
+        return core_schema.json_or_python_schema(
+            json_schema=core_schema.no_info_after_validator_function(
+                cls.from_items, json_items
+            ),
+            python_schema=core_schema.union_schema(
+                [
+                    core_schema.is_instance_schema(cls),
+                    core_schema.no_info_after_validator_function(
+                        cls.from_items, python_items
+                    ),
+                ],
+                mode="left_to_right",
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls._serialize, info_arg=True
+            ),
+            metadata={"pydantic_js_functions": [lambda _, h: h(json_schema)]},
+        )
+
+
+class RegressionKind(str, Enum):
+    TIME = "time"
+    """The elapsed time grew beyond the threshold."""
+    MEMORY = "memory"
+    """The memory usage grew beyond the threshold."""
+    TLE_MARGIN = "tle_margin"
+    """The elapsed time is close to the TLE time."""
+    MLE_MARGIN = "mle_margin"
+    """The memory usage is close to the MLE memory size."""
+
+
+class PerformanceRegression(BaseModel):
+    name: str = Field(
+        description="The name of test case.",
+    )
+    """The name of test case.
+    """
+
+    kind: RegressionKind = Field(
+        description="The kind of regression.",
+    )
+    """The kind of regression.
+    """
+
+    current: float = Field(
+        description="The seconds or megabytes of the test case in this run.",
+    )
+    """The seconds or megabytes of the test case in this run.
+    """
+
+    previous: Optional[float] = Field(
+        default=None,
+        description="The seconds or megabytes of the test case in the previous runs.",
+    )
+    """The seconds or megabytes of the test case in the previous runs.
+    """
+
+    limit: Optional[float] = Field(
+        default=None,
+        description="The TLE time in seconds or the MLE memory size in megabytes.",
+    )
+    """The TLE time in seconds or the MLE memory size in megabytes.
+    """
+
+
 class VerificationResult(BaseModel):
     verification_name: Optional[str] = Field(
         default=None,
@@ -77,13 +322,20 @@ class VerificationResult(BaseModel):
     """Maximum size of memory used in megabytes.
     """
 
-    testcases: Optional[list[TestcaseResult]] = Field(
+    testcases: Optional[TestcaseResults] = Field(
         default=None,
         description="The results of each test case.",
     )
     """The results of each test case.
     """
 
+    regressions: Optional[list[PerformanceRegression]] = Field(
+        default=None,
+        description="The test cases whose performance regressed from the previous runs.",
+    )
+    """The test cases whose performance regressed from the previous runs.
+    """
+
     last_execution_time: datetime.datetime = Field(
         default_factory=lambda: datetime.datetime.now(datetime.timezone.utc),
         description="The time at which the last validation was performed.",
@@ -35,6 +35,7 @@ class ShellCommand(BaseModel):
         check: bool = False,
         capture_output: bool = False,
         group_log: bool = False,
+        input: Optional[Union[str, bytes]] = None,
     ) -> CompletedProcess[bytes]:
         ...
 
@@ -45,6 +46,7 @@ class ShellCommand(BaseModel):
         check: bool = False,
         capture_output: bool = False,
         group_log: bool = False,
+        input: Optional[Union[str, bytes]] = None,
     ) -> CompletedProcess[str]:
         ...
 
@@ -54,6 +56,7 @@ class ShellCommand(BaseModel):
         check: bool = False,
         capture_output: bool = False,
         group_log: bool = False,
+        input: Optional[Union[str, bytes]] = None,
     ) -> Union[CompletedProcess[str], CompletedProcess[bytes]]:
         return exec_command(
             command=self.command,
@@ -63,6 +66,7 @@ class ShellCommand(BaseModel):
             capture_output=capture_output,
             cwd=self.cwd,
             group_log=group_log,
+            input=input,
         )
 
     @classmethod
@@ -27,12 +27,21 @@ from onlinejudge_command.subcommand.test import run_checking_output
 from pydantic import BaseModel, Field
 from pydantic.functional_validators import BeforeValidator
 
-from competitive_verifier.models import ResultStatus, TestcaseResult, VerificationResult
+from competitive_verifier import trace
+from competitive_verifier.models import (
+    ResultStatus,
+    TestcaseResults,
+    VerificationResult,
+)
 
 from .func import checker_exe_name, get_cache_directory, get_directory
 
 logger = getLogger(__name__)
 
+MAXRSS_FILE_ENV = "COMPETITIVE_VERIFIER_MAXRSS_FILE"
+"""The file to which a wrapper of the program writes the peak RSS in kilobytes
+instead of GNU time, e.g. the client of the Python fork server"""
+
 
 class OjTestArguments(BaseModel):
     """onlinejudge_command.subcommand.test.add_subparser"""
@@ -76,9 +85,13 @@ def oj_exec_command(
         stdin = PIPE  # type: ignore
     if gnu_time is not None:
         context: Any = tempfile.NamedTemporaryFile(delete=True)
+        # The fork server of Python reports the peak RSS of the forked child,
+        # because GNU time measures only its client.
+        maxrss_context: Any = tempfile.NamedTemporaryFile(delete=True)
     else:
         context = contextlib.nullcontext()
-    with context as fh:
+        maxrss_context = contextlib.nullcontext()
+    with context as fh, maxrss_context as maxrss_fh:
         if isinstance(command, str):
             command_str = command
             command = shlex.split(command)
@@ -95,6 +108,8 @@ def oj_exec_command(
             preexec_fn = os.setsid
 
         try:
+            if maxrss_fh is not None:
+                env = (env or {}) | {MAXRSS_FILE_ENV: maxrss_fh.name}
             if env:
                 env = os.environ | env
             proc = Popen(
@@ -134,6 +149,11 @@ def oj_exec_command(
             logger.debug("GNU time says:\n%s", reported)
             if reported.strip() and reported.splitlines()[-1].isdigit():
                 memory = int(reported.splitlines()[-1]) / 1000
+            with open(maxrss_fh.name) as fh1:
+                reported = fh1.read().strip()
+            if reported.isdigit():
+                logger.debug("The fork server says: %s", reported)
+                memory = int(reported) / 1000
     return (
         OjExecInfo(
             answer=answer,
@@ -314,6 +334,34 @@ def check_gnu_time(gnu_time: Optional[str] = None) -> bool:
     return orig_check_gnu_time(gnu_time or get_gnu_time_command())
 
 
+def match_output(
+    answer: bytes,
+    test_input_path: pathlib.Path,
+    test_output_path: Optional[pathlib.Path],
+    *,
+    args: OjTestArguments,
+) -> Optional[bool]:
+    """Compares the answer with the expected output or checks it with the judge.
+
+    Returns:
+        Optional[bool]: None if there is neither the expected output nor the judge
+    """
+    match_function = build_match_function(
+        compare_mode=CompareMode(args.compare_mode),
+        error=args.error,
+        judge_command=str(args.judge) if args.judge else None,
+        silent=args.silent,
+        test_input_path=test_input_path,
+        test_output_path=test_output_path,
+    )
+    return run_checking_output(
+        answer=answer,
+        test_output_path=test_output_path,
+        is_special_judge=args.judge is not None,
+        match_function=match_function,
+    )
+
+
 def test_single_case(
     test_name: str,
     test_input_path: pathlib.Path,
@@ -328,7 +376,7 @@ def test_single_case(
         logger.info("%s", test_name)
 
     # run the binary
-    with test_input_path.open("rb") as inf:
+    with test_input_path.open("rb") as inf, trace.span(test_name, cat="exec"):
         info, proc = oj_exec_command(
             args.command,
             env=args.env,
@@ -350,20 +398,10 @@ def test_single_case(
         if memory:
             logger.info("memory: %f MB", memory)
 
-        match_function = build_match_function(
-            compare_mode=CompareMode(args.compare_mode),
-            error=args.error,
-            judge_command=str(args.judge) if args.judge else None,
-            silent=args.silent,
-            test_input_path=test_input_path,
-            test_output_path=test_output_path,
-        )
-        match_result = run_checking_output(
-            answer=answer.encode(),
-            test_output_path=test_output_path,
-            is_special_judge=args.judge is not None,
-            match_function=match_function,
-        )
+        with trace.span("check", cat="check", testcase=test_name):
+            match_result = match_output(
+                answer.encode(), test_input_path, test_output_path, args=args
+            )
         status = display_result(
             proc,
             answer,
@@ -395,7 +433,12 @@ def test_single_case(
     }
 
 
-def run(args: OjTestArguments) -> OjTestResult:
+def prepare_tests(args: OjTestArguments) -> dict[str, dict[str, pathlib.Path]]:
+    """Lists the test cases and resolves `args.gnu_time`.
+
+    Returns:
+        dict[str, dict[str, pathlib.Path]]: name -> {"in": input, "out": output}
+    """
     # list tests
     if not args.test:
         args.test = fmtutils.glob_with_format(args.directory, args.format)  # by default
@@ -420,6 +463,11 @@ def run(args: OjTestArguments) -> OjTestResult:
         args.gnu_time = None
     if args.mle is not None and args.gnu_time is None:
         raise RuntimeError("--mle is used but GNU time does not exist")
+    return tests
+
+
+def run(args: OjTestArguments) -> OjTestResult:
+    tests = prepare_tests(args)
 
     # run tests
     history: list[OjTestcaseResult] = []
@@ -478,7 +526,7 @@ def run(args: OjTestArguments) -> OjTestResult:
     )
 
 
-def run_wrapper(
+def get_test_arguments(
     *,
     url: str,
     command: Union[str, list[str]],
@@ -486,7 +534,8 @@ def run_wrapper(
     tle: Optional[float],
     mle: Optional[float],
     error: Optional[float],
-) -> VerificationResult:
+) -> OjTestArguments:
+    """The arguments to test the problem downloaded by `oj.download`"""
     directory = get_directory(url)
     test_directory = directory / "test"
 
@@ -494,7 +543,7 @@ def run_wrapper(
     if not checker_path.exists():
         checker_path = None
 
-    args = OjTestArguments(
+    return OjTestArguments(
         command=command,
         env=env,
         cookie=get_cache_directory() / "cookie.txt",
@@ -505,6 +554,20 @@ def run_wrapper(
         print_input=True,
         judge=checker_path,
     )
+
+
+def run_wrapper(
+    *,
+    url: str,
+    command: Union[str, list[str]],
+    env: Optional[dict[str, str]],
+    tle: Optional[float],
+    mle: Optional[float],
+    error: Optional[float],
+) -> VerificationResult:
+    args = get_test_arguments(
+        url=url, command=command, env=env, tle=tle, mle=mle, error=error
+    )
     result = run(args)
 
     return VerificationResult(
@@ -512,13 +575,10 @@ def run_wrapper(
         elapsed=result.elapsed,
         slowest=result.slowest,
         heaviest=result.heaviest,
-        testcases=[
-            TestcaseResult(
-                name=case.testcase.name,
-                elapsed=case.elapsed,
-                memory=case.memory,
-                status=case.status,
-            )
-            for case in result.testcases
-        ],
+        testcases=TestcaseResults(
+            names=[case.testcase.name for case in result.testcases],
+            statuses=[case.status for case in result.testcases],
+            elapsed=[case.elapsed for case in result.testcases],
+            memory=[case.memory for case in result.testcases],
+        ),
     )
@@ -3,7 +3,6 @@ import functools
 import os
 import pathlib
 import platform
-import shutil
 from logging import getLogger
 from typing import Any, Optional
 
@@ -11,6 +10,7 @@ from pydantic import BaseModel
 
 import competitive_verifier.oj.verify.languages.special_comments as special_comments
 import competitive_verifier.oj.verify.shlex2 as shlex
+import competitive_verifier.toolchain as toolchain
 from competitive_verifier.oj.verify.languages.cplusplus_bundle import Bundler
 from competitive_verifier.oj.verify.models import (
     Language,
@@ -130,6 +130,10 @@ class CPlusPlusLanguage(Language):
         self.config = config or OjVerifyCPlusPlusConfig()
 
     def _list_environments(self) -> list[CPlusPlusLanguageEnvironment]:
+        return self._environments
+
+    @functools.cached_property
+    def _environments(self) -> list[CPlusPlusLanguageEnvironment]:
         default_CXXFLAGS = ["--std=c++17", "-O2", "-Wall", "-g"]
         if platform.system() == "Windows" or "CYGWIN" in platform.system():
             default_CXXFLAGS.append("-Wl,-stack,0x10000000")
@@ -173,11 +177,11 @@ class CPlusPlusLanguage(Language):
         else:
             # default: use found compilers
             for name in ("g++", "clang++"):
-                path = shutil.which(name)
+                path = toolchain.which(name)
                 if path is not None:
                     envs.append(
                         CPlusPlusLanguageEnvironment(
-                            CXX=pathlib.Path(path), CXXFLAGS=default_CXXFLAGS
+                            CXX=path, CXXFLAGS=default_CXXFLAGS
                         )
                     )
 
@@ -4,10 +4,10 @@ import json
 import os
 import pathlib
 import re
-import shutil
 from logging import getLogger
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 
+import competitive_verifier.toolchain as toolchain
 from competitive_verifier.oj.verify.utils import exec_command
 
 logger = getLogger(__name__)
@@ -164,10 +164,22 @@ TR1_LIBS = {
 }
 
 
-@functools.lru_cache(maxsize=None)
+_RE_LINE_MARKER = re.compile(rb'# (\d+) ".*"')
+_RE_IF = re.compile(rb"\s*#\s*(if|ifdef|ifndef)\s.*")
+_RE_ELSE = re.compile(rb"\s*#\s*(else\s*|elif\s.*)")
+_RE_ENDIF = re.compile(rb"\s*#\s*endif\s*")
+_RE_PRAGMA_ONCE = re.compile(rb"\s*#\s*pragma\s+once\s*")
+_RE_IFNDEF = re.compile(rb"\s*#\s*ifndef\s+(\w+)\s*")
+_RE_DEFINE = re.compile(rb"\s*#\s*define\s+(\w+)\s*")
+_RE_BLANK = re.compile(rb"^\s*$")
+_RE_INCLUDE_SYSTEM = re.compile(rb"\s*#\s*include\s*<(.*)>\s*")
+_RE_INCLUDE_QUOTE = re.compile(rb'\s*#\s*include\s*"(.*)"\s*')
+
+
 def _check_compiler(compiler: str) -> str:
     # Executables named "g++" are not always g++, due to the fake g++ of macOS
-    version = exec_command([compiler, "--version"]).stdout.decode()
+    found = toolchain.get_toolchain(compiler)
+    version = found.version if found else ""
     if "clang" in version.lower() or "Apple LLVM".lower() in version.lower():
         return "clang"
     if "g++" in version.lower():
@@ -181,7 +193,7 @@ def _get_uncommented_code(
 ) -> bytes:
     # `iquotes_options` must be a tuple to use `lru_cache`
 
-    if shutil.which(compiler) is None:
+    if toolchain.which(compiler) is None:
         raise BundleError(f"command not found: {compiler}")
     if _check_compiler(compiler) != "gcc":
         if compiler == "g++":
@@ -215,7 +227,7 @@ def get_uncommented_code(
     )
     lines: list[bytes] = []
     for line in code.splitlines(keepends=True):
-        m = re.match(rb'# (\d+) ".*"', line.rstrip())
+        m = _RE_LINE_MARKER.match(line.rstrip())
         if m:
             lineno = int(m.group(1))
             while len(lines) + 1 < lineno:
@@ -225,6 +237,66 @@ def get_uncommented_code(
     return b"".join(lines)
 
 
+class _Token(NamedTuple):
+    """A line of a header classified by the directive it contains"""
+
+    line: bytes
+    is_if: bool
+    is_else: bool
+    is_endif: bool
+    is_pragma_once: bool
+    is_code: bool
+    ifndef_macro: Optional[str]
+    define_macro: Optional[str]
+    include_system: Optional[bytes]
+    include_quote: Optional[bytes]
+
+
+def _group(m: Optional[re.Match[bytes]]) -> Optional[bytes]:
+    return m.group(1) if m else None
+
+
+@functools.lru_cache(maxsize=None)
+def _tokenize(
+    path: pathlib.Path, *, iquotes: tuple[pathlib.Path, ...], compiler: str
+) -> tuple[_Token, ...]:
+    code = path.read_bytes()
+    if not code.endswith(b"\n"):
+        # ファイルの末尾に改行がなかったら足す
+        code += b"\n"
+
+    lines = code.splitlines(keepends=True)
+    uncommented_lines = get_uncommented_code(
+        path, iquotes=list(iquotes), compiler=compiler
+    ).splitlines(keepends=True)
+    uncommented_lines.extend(
+        [b""] * (len(lines) - len(uncommented_lines))
+    )  # trailing comment lines are removed
+    assert len(lines) == len(uncommented_lines)
+
+    tokens: list[_Token] = []
+    for line, uncommented_line in zip(lines, uncommented_lines):
+        ifndef_macro = _group(_RE_IFNDEF.match(uncommented_line))
+        define_macro = _group(_RE_DEFINE.match(uncommented_line))
+        tokens.append(
+            _Token(
+                line=line,
+                is_if=_RE_IF.match(uncommented_line) is not None,
+                is_else=_RE_ELSE.match(uncommented_line) is not None,
+                is_endif=_RE_ENDIF.match(uncommented_line) is not None,
+                # #pragma once は comment 扱いで消されてしまう
+                is_pragma_once=_RE_PRAGMA_ONCE.match(line) is not None,
+                is_code=bool(uncommented_line)
+                and _RE_BLANK.match(uncommented_line) is None,
+                ifndef_macro=ifndef_macro.decode() if ifndef_macro else None,
+                define_macro=define_macro.decode() if define_macro else None,
+                include_system=_group(_RE_INCLUDE_SYSTEM.match(uncommented_line)),
+                include_quote=_group(_RE_INCLUDE_QUOTE.match(uncommented_line)),
+            )
+        )
+    return tuple(tokens)
+
+
 class BundleError(Exception):
     pass
 
@@ -241,6 +313,60 @@ class BundleErrorAt(BundleError):
         super().__init__(message, *args, **kwargs)
 
 
+class _Fragment(NamedTuple):
+    """The expansion of a header.
+
+    The expansion is reusable while every `pragma_once`/`pragma_once_system` lookup
+    that it made against the incoming state gives the same answer.
+    """
+
+    lines: tuple[bytes, ...]
+    pops_line_directives: bool
+    reads_pragma_once: tuple[tuple[pathlib.Path, bool], ...]
+    reads_pragma_once_system: tuple[tuple[str, bool], ...]
+    writes_pragma_once: frozenset[pathlib.Path]
+    writes_pragma_once_system: frozenset[str]
+    expanded: frozenset[pathlib.Path]
+
+
+class _Frame:
+    lines: list[bytes]
+    pops_line_directives: bool
+    reads_pragma_once: dict[pathlib.Path, bool]
+    reads_pragma_once_system: dict[str, bool]
+    writes_pragma_once: set[pathlib.Path]
+    writes_pragma_once_system: set[str]
+    expanded: set[pathlib.Path]
+
+    def __init__(self) -> None:
+        self.lines = []
+        self.pops_line_directives = False
+        self.reads_pragma_once = {}
+        self.reads_pragma_once_system = {}
+        self.writes_pragma_once = set()
+        self.writes_pragma_once_system = set()
+        self.expanded = set()
+
+    def to_fragment(self) -> _Fragment:
+        return _Fragment(
+            lines=tuple(self.lines),
+            pops_line_directives=self.pops_line_directives,
+            reads_pragma_once=tuple(self.reads_pragma_once.items()),
+            reads_pragma_once_system=tuple(self.reads_pragma_once_system.items()),
+            writes_pragma_once=frozenset(self.writes_pragma_once),
+            writes_pragma_once_system=frozenset(self.writes_pragma_once_system),
+            expanded=frozenset(self.expanded),
+        )
+
+
+_FragmentKey = tuple[pathlib.Path, tuple[pathlib.Path, ...], str, pathlib.Path]
+_fragments: dict[_FragmentKey, list[_Fragment]] = {}
+
+
+def clear_fragment_cache() -> None:
+    _fragments.clear()
+
+
 class Bundler:
     iquotes: list[pathlib.Path]
     pragma_once: set[pathlib.Path]
@@ -248,6 +374,10 @@ class Bundler:
     result_lines: list[bytes]
     path_stack: set[pathlib.Path]
     compiler: str
+    _frames: list[_Frame]
+    _cwd: pathlib.Path
+    _resolved_iquotes: tuple[pathlib.Path, ...]
+    _resolved_includes: dict[tuple[pathlib.Path, pathlib.Path], pathlib.Path]
 
     def __init__(
         self,
@@ -260,16 +390,55 @@ class Bundler:
         self.iquotes = iquotes
         self.pragma_once = set()
         self.pragma_once_system = set()
-        self.result_lines = []
         self.path_stack = set()
         self.compiler = compiler
+        self._frames = [_Frame()]
+        self.result_lines = self._frames[-1].lines
+        self._cwd = pathlib.Path.cwd()
+        self._resolved_iquotes = tuple(iquote.resolve() for iquote in iquotes)
+        self._resolved_includes = {}
+
+    def _in_pragma_once(self, path: pathlib.Path) -> bool:
+        result = path in self.pragma_once
+        for frame in self._frames:
+            if path not in frame.writes_pragma_once:
+                frame.reads_pragma_once.setdefault(path, result)
+        return result
+
+    def _in_pragma_once_system(self, included: str) -> bool:
+        result = included in self.pragma_once_system
+        for frame in self._frames:
+            if included not in frame.writes_pragma_once_system:
+                frame.reads_pragma_once_system.setdefault(included, result)
+        return result
+
+    def _add_pragma_once(self, path: pathlib.Path) -> None:
+        self.pragma_once.add(path)
+        for frame in self._frames:
+            frame.writes_pragma_once.add(path)
+
+    def _add_pragma_once_system(self, included: str) -> None:
+        self.pragma_once_system.add(included)
+        for frame in self._frames:
+            frame.writes_pragma_once_system.add(included)
+
+    def _add_expanded(self, path: pathlib.Path) -> None:
+        for frame in self._frames:
+            frame.expanded.add(path)
+
+    def _pop_line_directives(self) -> None:
+        frame = self._frames[-1]
+        while frame.lines and frame.lines[-1].startswith(b"#line "):
+            frame.lines.pop()
+        if not frame.lines:
+            # The directives of the enclosing file are popped when spliced
+            frame.pops_line_directives = True
 
     # これをしないと __FILE__ や __LINE__ が壊れる
     def _line(self, line: int, path: pathlib.Path) -> None:
-        while self.result_lines and self.result_lines[-1].startswith(b"#line "):
-            self.result_lines.pop()
+        self._pop_line_directives()
         try:
-            path = path.relative_to(pathlib.Path.cwd())
+            path = path.relative_to(self._cwd)
         except ValueError:
             pass
         # パス中の特殊文字を JSON style にエスケープしてから生成コードに記述
@@ -283,15 +452,42 @@ class Bundler:
     def _resolve(
         self, path: pathlib.Path, *, included_from: pathlib.Path
     ) -> pathlib.Path:
-        if (included_from.parent / path).exists():
-            return (included_from.parent / path).resolve()
-        for dir_ in self.iquotes:
+        key = (path, included_from.parent)
+        resolved = self._resolved_includes.get(key)
+        if resolved is not None:
+            return resolved
+        for dir_ in [included_from.parent, *self.iquotes]:
             if (dir_ / path).exists():
-                return (dir_ / path).resolve()
+                resolved = (dir_ / path).resolve()
+                self._resolved_includes[key] = resolved
+                return resolved
         raise BundleErrorAt(path, -1, "no such header")
 
-    def update(self, path: pathlib.Path) -> None:  # noqa: C901
-        if path.resolve() in self.pragma_once:
+    def _fragment_key(self, path: pathlib.Path) -> _FragmentKey:
+        return (path, self._resolved_iquotes, self.compiler, self._cwd)
+
+    def _find_fragment(self, key: _FragmentKey) -> Optional[_Fragment]:
+        for fragment in _fragments.get(key, ()):
+            if not fragment.expanded.isdisjoint(self.path_stack):
+                # The cycle must be reported as it is
+                continue
+            if all(
+                (p in self.pragma_once) == v for p, v in fragment.reads_pragma_once
+            ) and all(
+                (s in self.pragma_once_system) == v
+                for s, v in fragment.reads_pragma_once_system
+            ):
+                return fragment
+        return None
+
+    def _splice(self, fragment: _Fragment) -> None:
+        if fragment.pops_line_directives:
+            self._pop_line_directives()
+        self.result_lines.extend(fragment.lines)
+
+    def update(self, path: pathlib.Path) -> None:
+        resolved = path.resolve()
+        if self._in_pragma_once(resolved):
             logger.debug(
                 "%s: skipped since this file is included once with include guard",
                 str(path),
@@ -301,208 +497,216 @@ class Bundler:
         # 再帰的に自分自身を #include してたら諦める
         if path in self.path_stack:
             raise BundleErrorAt(path, -1, "cycle found in inclusion relations")
+
+        key = self._fragment_key(path)
+        fragment = self._find_fragment(key)
+        if fragment is not None:
+            logger.debug("%s: reuse the expansion", str(path))
+            for p, _ in fragment.reads_pragma_once:
+                self._in_pragma_once(p)
+            for s, _ in fragment.reads_pragma_once_system:
+                self._in_pragma_once_system(s)
+            for p in fragment.writes_pragma_once:
+                self._add_pragma_once(p)
+            for s in fragment.writes_pragma_once_system:
+                self._add_pragma_once_system(s)
+            self._add_expanded(path)
+            for p in fragment.expanded:
+                self._add_expanded(p)
+            self._splice(fragment)
+            return
+
+        self._add_expanded(path)
         self.path_stack.add(path)
+        frame = _Frame()
+        self._frames.append(frame)
+        self.result_lines = frame.lines
         try:
-            code = path.read_bytes()
-            if not code.endswith(b"\n"):
-                # ファイルの末尾に改行がなかったら足す
-                code += b"\n"
-
-            # include guard のまわりの変数
-            # NOTE: include guard に使われたマクロがそれ以外の用途にも使われたり #undef されたりすると壊れるけど、無視します
-            non_guard_line_found = False
-            pragma_once_found = False
-            include_guard_macro = None
-            include_guard_define_found = False
-            include_guard_endif_found = False
-            preprocess_if_nest = 0
-
-            lines = code.splitlines(keepends=True)
-            uncommented_lines = get_uncommented_code(
-                path, iquotes=self.iquotes, compiler=self.compiler
-            ).splitlines(keepends=True)
-            uncommented_lines.extend(
-                [b""] * (len(lines) - len(uncommented_lines))
-            )  # trailing comment lines are removed
-            assert len(lines) == len(uncommented_lines)
-            self._line(1, path)
-            for i, (line, uncommented_line) in enumerate(zip(lines, uncommented_lines)):
-                # nest の処理
-                if re.match(rb"\s*#\s*(if|ifdef|ifndef)\s.*", uncommented_line):
-                    preprocess_if_nest += 1
-                if re.match(rb"\s*#\s*(else\s*|elif\s.*)", uncommented_line):
-                    if preprocess_if_nest == 0:
-                        raise BundleErrorAt(path, i + 1, "unmatched #else / #elif")
-                if re.match(rb"\s*#\s*endif\s*", uncommented_line):
-                    preprocess_if_nest -= 1
-                    if preprocess_if_nest < 0:
-                        raise BundleErrorAt(path, i + 1, "unmatched #endif")
-                is_toplevel = preprocess_if_nest == 0 or (
-                    preprocess_if_nest == 1 and include_guard_macro is not None
-                )
+            self._expand(path, resolved)
+        finally:
+            self._frames.pop()
+            self.result_lines = self._frames[-1].lines
+            self.path_stack.remove(path)
 
-                # #pragma once
-                if re.match(
-                    rb"\s*#\s*pragma\s+once\s*", line
-                ):  # #pragma once は comment 扱いで消されてしまう
-                    logger.debug("%s: line %s: #pragma once", str(path), i + 1)
-                    if non_guard_line_found:
-                        # 先頭以外で #pragma once されてた場合は諦める
-                        raise BundleErrorAt(
-                            path, i + 1, "#pragma once found in a non-first line"
-                        )
-                    if include_guard_macro is not None:
-                        raise BundleErrorAt(
-                            path,
-                            i + 1,
-                            "#pragma once found in an include guard with #ifndef",
-                        )
-                    if path.resolve() in self.pragma_once:
-                        return
-                    pragma_once_found = True
-                    self.pragma_once.add(path.resolve())
-                    self._line(i + 2, path)
-                    continue
-
-                matched: Optional[re.Match[bytes]]
-                # #ifndef HOGE_H as guard
-                if (
-                    not pragma_once_found
-                    and not non_guard_line_found
-                    and include_guard_macro is None
-                ):
-                    matched = re.match(rb"\s*#\s*ifndef\s+(\w+)\s*", uncommented_line)
-                    if matched:
-                        include_guard_macro = matched.group(1).decode()
-                        logger.debug(
-                            "%s: line %s: #ifndef %s",
-                            str(path),
-                            i + 1,
-                            include_guard_macro,
-                        )
-                        self.result_lines.append(b"\n")
-                        continue
-
-                # #define HOGE_H as guard
+        fragment = frame.to_fragment()
+        _fragments.setdefault(key, []).append(fragment)
+        self._splice(fragment)
+
+    def _expand(self, path: pathlib.Path, resolved: pathlib.Path) -> None:  # noqa: C901
+        # include guard のまわりの変数
+        # NOTE: include guard に使われたマクロがそれ以外の用途にも使われたり #undef されたりすると壊れるけど、無視します
+        non_guard_line_found = False
+        pragma_once_found = False
+        include_guard_macro = None
+        include_guard_define_found = False
+        include_guard_endif_found = False
+        preprocess_if_nest = 0
+
+        tokens = _tokenize(
+            resolved,
+            iquotes=tuple(self.iquotes),
+            compiler=self.compiler,
+        )
+        self._line(1, path)
+        for i, token in enumerate(tokens):
+            line = token.line
+            # nest の処理
+            if token.is_if:
+                preprocess_if_nest += 1
+            if token.is_else:
+                if preprocess_if_nest == 0:
+                    raise BundleErrorAt(path, i + 1, "unmatched #else / #elif")
+            if token.is_endif:
+                preprocess_if_nest -= 1
+                if preprocess_if_nest < 0:
+                    raise BundleErrorAt(path, i + 1, "unmatched #endif")
+            is_toplevel = preprocess_if_nest == 0 or (
+                preprocess_if_nest == 1 and include_guard_macro is not None
+            )
+
+            # #pragma once
+            if token.is_pragma_once:
+                logger.debug("%s: line %s: #pragma once", str(path), i + 1)
+                if non_guard_line_found:
+                    # 先頭以外で #pragma once されてた場合は諦める
+                    raise BundleErrorAt(
+                        path, i + 1, "#pragma once found in a non-first line"
+                    )
+                if include_guard_macro is not None:
+                    raise BundleErrorAt(
+                        path,
+                        i + 1,
+                        "#pragma once found in an include guard with #ifndef",
+                    )
+                if self._in_pragma_once(resolved):
+                    return
+                pragma_once_found = True
+                self._add_pragma_once(resolved)
+                self._line(i + 2, path)
+                continue
+
+            # #ifndef HOGE_H as guard
+            if (
+                not pragma_once_found
+                and not non_guard_line_found
+                and include_guard_macro is None
+                and token.ifndef_macro is not None
+            ):
+                include_guard_macro = token.ifndef_macro
+                logger.debug(
+                    "%s: line %s: #ifndef %s",
+                    str(path),
+                    i + 1,
+                    include_guard_macro,
+                )
+                self.result_lines.append(b"\n")
+                continue
+
+            # #define HOGE_H as guard
+            if (
+                include_guard_macro is not None
+                and not include_guard_define_found
+                and token.define_macro == include_guard_macro
+            ):
+                self._add_pragma_once(resolved)
+                logger.debug(
+                    "%s: line %s: #define %s",
+                    str(path),
+                    i + 1,
+                    include_guard_macro,
+                )
+                include_guard_define_found = True
+                self.result_lines.append(b"\n")
+                continue
+
+            # #endif as guard
+            if (
+                include_guard_define_found
+                and preprocess_if_nest == 0
+                and not include_guard_endif_found
+                and token.is_endif
+            ):
+                include_guard_endif_found = True
+                self.result_lines.append(b"\n")
+                continue
+
+            if token.is_code:
+                non_guard_line_found = True
                 if include_guard_macro is not None and not include_guard_define_found:
-                    matched = re.match(rb"\s*#\s*define\s+(\w+)\s*", uncommented_line)
-                    if matched and matched.group(1).decode() == include_guard_macro:
-                        self.pragma_once.add(path.resolve())
-                        logger.debug(
-                            "%s: line %s: #define %s",
-                            str(path),
-                            i + 1,
-                            include_guard_macro,
-                        )
-                        include_guard_define_found = True
-                        self.result_lines.append(b"\n")
-                        continue
-
-                # #endif as guard
-                if (
-                    include_guard_define_found
-                    and preprocess_if_nest == 0
-                    and not include_guard_endif_found
+                    # 先頭に #ifndef が見付かっても #define が続かないならそれは include guard ではない
+                    include_guard_macro = None
+                if include_guard_endif_found:
+                    # include guard の外側にコードが書かれているとまずいので検出する
+                    raise BundleErrorAt(path, i + 1, "found codes out of include guard")
+
+            # #include <...>
+            if token.include_system is not None:
+                included = token.include_system.decode()
+                logger.debug(
+                    "%s: line %s: #include <%s>", str(path), i + 1, str(included)
+                )
+                if self._in_pragma_once_system(included):
+                    self._line(i + 2, path)
+                elif not is_toplevel:
+                    # #pragma once 系の判断ができない場合はそっとしておく
+                    self.result_lines.append(line)
+                elif (
+                    included in C_STANDARD_LIBS
+                    or included in CXX_STANDARD_LIBS
+                    or included in CXX_C_ORIGIN_LIBS
                 ):
-                    if re.match(rb"\s*#\s*endif\s*", uncommented_line):
-                        include_guard_endif_found = True
-                        self.result_lines.append(b"\n")
-                        continue
-
-                if uncommented_line and not re.match(rb"^\s*$", uncommented_line):
-                    non_guard_line_found = True
-                    if (
-                        include_guard_macro is not None
-                        and not include_guard_define_found
-                    ):
-                        # 先頭に #ifndef が見付かっても #define が続かないならそれは include guard ではない
-                        include_guard_macro = None
-                    if include_guard_endif_found:
-                        # include guard の外側にコードが書かれているとまずいので検出する
-                        raise BundleErrorAt(
-                            path, i + 1, "found codes out of include guard"
-                        )
-
-                # #include <...>
-                matched = re.match(rb"\s*#\s*include\s*<(.*)>\s*", uncommented_line)
-                if matched:
-                    included = matched.group(1).decode()
-                    logger.debug(
-                        "%s: line %s: #include <%s>", str(path), i + 1, str(included)
-                    )
-                    if included in self.pragma_once_system:
+                    if self._in_pragma_once_system(BITS_STDCXX_H):
                         self._line(i + 2, path)
-                    elif not is_toplevel:
-                        # #pragma once 系の判断ができない場合はそっとしておく
+                    else:
+                        self._add_pragma_once_system(included)
                         self.result_lines.append(line)
-                    elif (
-                        included in C_STANDARD_LIBS
-                        or included in CXX_STANDARD_LIBS
-                        or included in CXX_C_ORIGIN_LIBS
-                    ):
-                        if BITS_STDCXX_H in self.pragma_once_system:
-                            self._line(i + 2, path)
-                        else:
-                            self.pragma_once_system.add(included)
-                            self.result_lines.append(line)
-                    elif included in EXT_LIBS:
-                        if BITS_EXTCXX_H in self.pragma_once_system:
-                            self._line(i + 2, path)
-                        else:
-                            self.pragma_once_system.add(included)
-                            self.result_lines.append(line)
-                    elif included in TR1_LIBS:
-                        if BITS_STDTR1CXX_H in self.pragma_once_system:
-                            self._line(i + 2, path)
-                        else:
-                            self.pragma_once_system.add(included)
-                            self.result_lines.append(line)
+                elif included in EXT_LIBS:
+                    if self._in_pragma_once_system(BITS_EXTCXX_H):
+                        self._line(i + 2, path)
                     else:
-                        # possibly: bits/*, tr2/* boost/*, c-posix library, etc.
-                        self.pragma_once_system.add(included)
+                        self._add_pragma_once_system(included)
                         self.result_lines.append(line)
-                        if included in [BITS_EXTCXX_H, BITS_STDTR1CXX_H]:
-                            self.pragma_once_system.add(BITS_STDCXX_H)
-                    continue
-
-                # #include "..."
-                matched = re.match(rb'\s*#\s*include\s*"(.*)"\s*', uncommented_line)
-                if matched:
-                    included = matched.group(1).decode()
-                    logger.debug(
-                        '%s: line %s: #include "%s"', str(path), i + 1, included
-                    )
-                    if not is_toplevel:
-                        # #if の中から #include されると #pragma once 系の判断が不可能になるので諦める
-                        raise BundleErrorAt(
-                            path,
-                            i + 1,
-                            "unable to process #include in #if / #ifdef / #ifndef other than include guards",
-                        )
-                    self.update(
-                        self._resolve(pathlib.Path(included), included_from=path)
+                elif included in TR1_LIBS:
+                    if self._in_pragma_once_system(BITS_STDTR1CXX_H):
+                        self._line(i + 2, path)
+                    else:
+                        self._add_pragma_once_system(included)
+                        self.result_lines.append(line)
+                else:
+                    # possibly: bits/*, tr2/* boost/*, c-posix library, etc.
+                    self._add_pragma_once_system(included)
+                    self.result_lines.append(line)
+                    if included in [BITS_EXTCXX_H, BITS_STDTR1CXX_H]:
+                        self._add_pragma_once_system(BITS_STDCXX_H)
+                continue
+
+            # #include "..."
+            if token.include_quote is not None:
+                included = token.include_quote.decode()
+                logger.debug('%s: line %s: #include "%s"', str(path), i + 1, included)
+                if not is_toplevel:
+                    # #if の中から #include されると #pragma once 系の判断が不可能になるので諦める
+                    raise BundleErrorAt(
+                        path,
+                        i + 1,
+                        "unable to process #include in #if / #ifdef / #ifndef other than include guards",
                     )
-                    self._line(i + 2, path)
-                    # #include "iostream" みたいに書いたときの挙動をはっきりさせる
-                    # #include <iostream> /* とかをやられた場合を落とす
-                    continue
-
-                # otherwise
-                self.result_lines.append(line)
+                self.update(self._resolve(pathlib.Path(included), included_from=path))
+                self._line(i + 2, path)
+                # #include "iostream" みたいに書いたときの挙動をはっきりさせる
+                # #include <iostream> /* とかをやられた場合を落とす
+                continue
 
-            # #if #endif の対応が壊れてたら諦める
-            last_index = i + 1  # pyright: ignore[reportUnboundVariable]
+            # otherwise
+            self.result_lines.append(line)
 
-            if preprocess_if_nest != 0:
-                raise BundleErrorAt(
-                    path, last_index, "unmatched #if / #ifdef / #ifndef"
-                )
-            if include_guard_macro is not None and not include_guard_endif_found:
-                raise BundleErrorAt(path, last_index, "unmatched #ifndef")
+        # #if #endif の対応が壊れてたら諦める
+        last_index = len(tokens)
 
-        finally:
-            # 中で return することがあるので finally 節に入れておく
-            self.path_stack.remove(path)
+        if preprocess_if_nest != 0:
+            raise BundleErrorAt(path, last_index, "unmatched #if / #ifdef / #ifndef")
+        if include_guard_macro is not None and not include_guard_endif_found:
+            raise BundleErrorAt(path, last_index, "unmatched #ifndef")
 
     def get(self) -> bytes:
-        return b"".join(self.result_lines)
+        return b"".join(self._frames[0].lines)
@@ -1,21 +1,63 @@
-from typing import Optional
-
-from pydantic import Field
+import hashlib
+import pathlib
+from typing import Optional, Sequence
 
+import competitive_verifier.config as config
 from competitive_verifier.models import ShellCommand, ShellCommandLike
 from competitive_verifier.oj.verify.languages.user_defined import UserDefinedLanguage
-from competitive_verifier.oj.verify.models import OjVerifyUserDefinedConfig
+from competitive_verifier.oj.verify.models import (
+    LanguageEnvironment,
+    OjVerifyUserDefinedConfig,
+)
 
 
 class OjVerifyGoConfig(OjVerifyUserDefinedConfig):
-    execute: ShellCommandLike = Field(
-        default_factory=lambda: ShellCommand(
-            command=["go", "run", "{basedir}/{path}"],
+    execute: Optional[
+        ShellCommandLike
+    ] = None  # pyright: ignore[reportIncompatibleVariableOverride]
+
+
+class GoLanguageEnvironment(LanguageEnvironment):
+    @property
+    def name(self) -> str:
+        return "go"
+
+    def _build_dir(self, path: pathlib.Path, *, basedir: pathlib.Path) -> pathlib.Path:
+        """The directory of the binary, which is isolated per file."""
+        key = hashlib.sha256((basedir / path).resolve().as_posix().encode()).hexdigest()
+        return config.get_cache_dir() / "go" / key[:32]
+
+    def get_compile_command(
+        self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
+    ) -> ShellCommand:
+        build_dir = self._build_dir(path, basedir=basedir)
+        return ShellCommand(
+            command=[
+                "go",
+                "build",
+                "-o",
+                str(build_dir / "a.out"),
+                str(basedir / path),
+            ],
             env={"GO111MODULE": "off"},
-        ),
-    )
+        )
+
+    def get_execute_command(
+        self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
+    ) -> ShellCommand:
+        return ShellCommand(
+            command=[str(self._build_dir(path, basedir=basedir) / "a.out")]
+        )
 
 
 class GoLanguage(UserDefinedLanguage):
     def __init__(self, *, config: Optional[OjVerifyGoConfig]):
         super().__init__(extension="go", config=config or OjVerifyGoConfig())
+
+    def list_environments(
+        self, path: pathlib.Path, *, basedir: pathlib.Path
+    ) -> Sequence[LanguageEnvironment]:
+        if self.config.execute is None:
+            # `go build` once, and execute the binary for each test case
+            return [GoLanguageEnvironment()]
+        return super().list_environments(path, basedir=basedir)
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from competitive_verifier.models import ShellCommand, ShellCommandLike
 from competitive_verifier.oj.verify.languages.user_defined import UserDefinedLanguage
@@ -8,12 +8,33 @@ from competitive_verifier.oj.verify.models import OjVerifyUserDefinedConfig
 
 
 class OjVerifyHaskellConfig(OjVerifyUserDefinedConfig):
+    compile: Optional[ShellCommandLike] = Field(
+        default_factory=lambda: ShellCommand(
+            command=[
+                "ghc",
+                "-O2",
+                "-outputdir",
+                "{tempdir}/ghc/{path}",
+                "-o",
+                "{tempdir}/ghc/{path}/a.out",
+                "{basedir}/{path}",
+            ],
+        ),
+    )
     execute: ShellCommandLike = Field(
         default_factory=lambda: ShellCommand(
-            command=["runghc", "{basedir}/{path}"],
+            command=["{tempdir}/ghc/{path}/a.out"],
         ),
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def no_default_compile_for_custom_execute(cls, data: Any) -> Any:
+        # The default binary is useless for a custom command such as `runghc`.
+        if isinstance(data, dict) and "execute" in data and "compile" not in data:
+            return {**data, "compile": None}
+        return data
+
 
 class HaskellLanguage(UserDefinedLanguage):
     def __init__(self, *, config: Optional[OjVerifyHaskellConfig]):
@@ -1,10 +1,14 @@
+import hashlib
+import os
 import pathlib
 from logging import getLogger
 from typing import Any, Optional, Sequence
 
 from pydantic import ValidationInfo, field_validator
 
+import competitive_verifier.config as config
 import competitive_verifier.oj.verify.shlex2 as shlex
+from competitive_verifier.oj.verify import utils
 from competitive_verifier.oj.verify.languages.user_defined import UserDefinedLanguage
 from competitive_verifier.oj.verify.models import (
     LanguageEnvironment,
@@ -13,6 +17,10 @@ from competitive_verifier.oj.verify.models import (
 
 logger = getLogger(__name__)
 
+# Runs the module of the installed package at verify time, so that verify_files.json
+# does not depend on the Python environment which ran oj-resolve.
+_JAVA_BATCH_MODULE = "competitive_verifier.oj.verify.languages.java_batch"
+
 
 class OjVerifyJavaConfig(OjVerifyUserDefinedConfig):
     execute: None = None  # pyright: ignore[reportIncompatibleVariableOverride]
@@ -25,7 +33,28 @@ class OjVerifyJavaConfig(OjVerifyUserDefinedConfig):
         raise ValueError(f'You cannot overwrite "{info.field_name}" for Java language')
 
 
+class JavaBatch:
+    """The verification files compiled by one `javac` invocation."""
+
+    classes_dir: pathlib.Path
+    paths: list[pathlib.Path]
+
+    def __init__(self, *, classes_dir: pathlib.Path, paths: list[pathlib.Path]):
+        self.classes_dir = classes_dir
+        self.paths = paths
+
+    def fallback_dir(self, path: pathlib.Path) -> pathlib.Path:
+        """The classes directory of `path` when the batch fails to compile."""
+        key = hashlib.sha256(path.as_posix().encode()).hexdigest()[:16]
+        return self.classes_dir.with_name(f"{self.classes_dir.name}-{key}")
+
+
 class JavaLanguageEnvironment(LanguageEnvironment):
+    batch: Optional[JavaBatch]
+
+    def __init__(self, *, batch: Optional[JavaBatch] = None):
+        self.batch = batch
+
     @property
     def name(self) -> str:
         return "Java"
@@ -33,21 +62,96 @@ class JavaLanguageEnvironment(LanguageEnvironment):
     def get_compile_command(
         self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
     ) -> str:
-        return shlex.join(["javac", str(basedir / path)])
+        if self.batch is None or path not in self.batch.paths:
+            return shlex.join(
+                [
+                    "javac",
+                    "-d",
+                    str(tempdir / "java"),
+                    "-sourcepath",
+                    str(basedir),
+                    str(basedir / path),
+                ]
+            )
+
+        # The first verification compiles all of the files in the batch while
+        # holding a lock, and the others reuse the classes.
+        return shlex.join(
+            [
+                "python",
+                "-m",
+                _JAVA_BATCH_MODULE,
+                "--javac",
+                "javac",
+                "--sourcepath",
+                str(basedir),
+                "--classes-dir",
+                str(self.batch.classes_dir),
+                "--fallback-dir",
+                str(self.batch.fallback_dir(path)),
+                str(basedir / path),
+                "--",
+                *(str(basedir / p) for p in self.batch.paths),
+            ]
+        )
 
     def get_execute_command(
         self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
     ) -> str:
         relative_path = (basedir / path).relative_to(basedir)
         class_path = ".".join([*relative_path.parent.parts, relative_path.stem])
-        return shlex.join(["java", class_path])
+        if self.batch is None or path not in self.batch.paths:
+            classpath = str(tempdir / "java")
+        else:
+            # The fallback directory exists only when the batch failed.
+            classpath = os.pathsep.join(
+                [str(self.batch.fallback_dir(path)), str(self.batch.classes_dir)]
+            )
+        return shlex.join(["java", "-cp", classpath, class_path])
+
+
+def _sources_digest(paths: list[pathlib.Path]) -> str:
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(path.as_posix().encode())
+        h.update(b"\0")
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+    return h.hexdigest()
 
 
 class JavaLanguage(UserDefinedLanguage):
+    _java_batch: Optional[JavaBatch]
+
     def __init__(self, *, config: Optional[OjVerifyJavaConfig]):
         super().__init__(extension="java", config=config or OjVerifyJavaConfig())
+        self._java_batch = None
+
+    def prepare(self, paths: list[pathlib.Path], *, basedir: pathlib.Path) -> None:
+        """Collects the verification files to compile them in one `javac` invocation.
+
+        The classes directory is named after the digest of all `.java` files, so stale classes are never reused.
+        """
+        super().prepare(paths, basedir=basedir)
+
+        targets: list[pathlib.Path] = []
+        for path in paths:
+            attributes = self.list_attributes(path, basedir=basedir)
+            if "PROBLEM" in attributes and "IGNORE" not in attributes:
+                targets.append(path)
+        if not targets:
+            return
+
+        try:
+            digest = _sources_digest(utils.list_files_with_suffix(".java"))
+        except OSError as e:
+            logger.warning("Failed to read .java files: %s", e)
+            return
+        self._java_batch = JavaBatch(
+            classes_dir=config.get_cache_dir() / "java" / digest[:32],
+            paths=sorted(targets),
+        )
 
     def list_environments(
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> Sequence[LanguageEnvironment]:
-        return [JavaLanguageEnvironment()]
+        return [JavaLanguageEnvironment(batch=self._java_batch)]
@@ -0,0 +1,121 @@
+# Python Version: 3.9+
+"""Compiles the Java verification files of a batch once.
+
+This module is executed by the compile command of each Java verification
+with ``python -m``, so the command resolves the installed package at verify time.
+
+``python -m competitive_verifier.oj.verify.languages.java_batch --javac JAVAC --sourcepath DIR --classes-dir CLASSES --fallback-dir FALLBACK FILE -- BATCH...``
+    Compiles BATCH into CLASSES by one ``javac`` invocation, unless CLASSES
+    already exists. Processes compiling the same batch wait for each other by
+    a lock file, and the classes are written to a temporary directory which is
+    renamed to CLASSES, so a half-written CLASSES is never used.
+    If the batch fails, compiles only FILE into FALLBACK instead.
+"""
+import argparse
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections.abc import Iterator
+
+
+@contextlib.contextmanager
+def _lock(path: str) -> Iterator[None]:
+    with open(path, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+
+            fh.seek(0)
+            while True:
+                try:
+                    # retries for 10 seconds and raises OSError
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _javac(javac: str, sourcepath: str, dest: str, files: list[str]) -> int:
+    """Compiles `files` into `dest` atomically"""
+    parent = os.path.dirname(os.path.abspath(dest))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f"{os.path.basename(dest)}.", dir=parent)
+    try:
+        code = subprocess.run(
+            [javac, "-d", tmp, "-sourcepath", sourcepath, *files]
+        ).returncode
+        if code == 0:
+            try:
+                os.replace(tmp, dest)
+            except OSError:
+                # another process has compiled the same files
+                if not os.path.isdir(dest):
+                    raise
+        return code
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compile_batch(
+    *,
+    javac: str,
+    sourcepath: str,
+    classes_dir: str,
+    fallback_dir: str,
+    file: str,
+    batch: list[str],
+) -> int:
+    if os.path.isdir(classes_dir) or os.path.isdir(fallback_dir):
+        return 0
+
+    os.makedirs(os.path.dirname(os.path.abspath(classes_dir)), exist_ok=True)
+    failed = f"{classes_dir}.failed"
+    with _lock(f"{classes_dir}.lock"):
+        if os.path.isdir(classes_dir):
+            return 0
+        if not os.path.exists(failed):
+            if _javac(javac, sourcepath, classes_dir, batch) == 0:
+                return 0
+            # The others compile only their own files without retrying the batch.
+            with open(failed, "wb"):
+                pass
+    print(f"Failed to compile the batch. Compile only {file}", file=sys.stderr)
+    return _javac(javac, sourcepath, fallback_dir, [file])
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--javac", required=True)
+    parser.add_argument("--sourcepath", required=True)
+    parser.add_argument("--classes-dir", required=True)
+    parser.add_argument("--fallback-dir", required=True)
+    parser.add_argument("file")
+    parser.add_argument("batch", nargs="+")
+    args = parser.parse_args(argv)
+    return compile_batch(
+        javac=args.javac,
+        sourcepath=args.sourcepath,
+        classes_dir=args.classes_dir,
+        fallback_dir=args.fallback_dir,
+        file=args.file,
+        batch=args.batch,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,13 @@
 # Python Version: 3.x
 import functools
+import hashlib
 import pathlib
 from logging import getLogger
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
+import competitive_verifier.config as config
 import competitive_verifier.oj.verify.shlex2 as shlex
 from competitive_verifier.oj.verify.models import (
     Language,
@@ -38,16 +40,26 @@ class NimLanguageEnvironment(LanguageEnvironment):
     def name(self) -> str:
         return "Nim"
 
+    def _build_dir(self, path: pathlib.Path) -> pathlib.Path:
+        """The nimcache directory which is reused while the file and the flags are unchanged."""
+        key = hashlib.sha256(
+            "\0".join(
+                [path.resolve().as_posix(), self.compile_to, *self.nim_flags]
+            ).encode()
+        ).hexdigest()[:32]
+        return config.get_cache_dir() / "nim" / key
+
     def get_compile_command(
         self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
     ) -> str:
+        build_dir = self._build_dir(path)
         return shlex.join(
             [
                 "nim",
                 self.compile_to,
                 "-p:.",
-                f"-o:{str(tempdir /'a.out')}",
-                f"--nimcache:{str(tempdir)}",
+                f"-o:{str(build_dir /'a.out')}",
+                f"--nimcache:{str(build_dir)}",
             ]
             + self.nim_flags
             + [str(path)]
@@ -56,7 +68,7 @@ class NimLanguageEnvironment(LanguageEnvironment):
     def get_execute_command(
         self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
     ) -> str:
-        return str(tempdir / "a.out")
+        return str(self._build_dir(path) / "a.out")
 
 
 @functools.lru_cache(maxsize=None)
@@ -1,94 +1,312 @@
-# pyright: reportUnknownVariableType=false, reportUnknownMemberType=false
 # Python Version: 3.x
-import concurrent.futures
+import ast
 import functools
+import hashlib
 import os
 import pathlib
-import platform
 import sys
+import tempfile
 from logging import getLogger
-from typing import Sequence
+from typing import Iterable, Iterator, Optional, Sequence
 
-import importlab.environment
-import importlab.fs
-import importlab.graph
+from pydantic import BaseModel
 
-from competitive_verifier.oj.verify.models import Language, LanguageEnvironment
+import competitive_verifier.git as git
+import competitive_verifier.oj.verify.shlex2 as shlex
+from competitive_verifier.oj.verify.models import (
+    Language,
+    LanguageEnvironment,
+    OjVerifyLanguageConfig,
+)
 
 logger = getLogger(__name__)
 
+_FORK_SERVER = str(pathlib.Path(__file__).with_name("python_forkserver.py"))
+
+
+class OjVerifyPythonConfigEnv(BaseModel):
+    python: str
+    flags: Optional[list[str]] = None
+    precompile: bool = False
+    """Compiles the file and its dependencies to .pyc files before running test cases."""
+    name: Optional[str] = None
+    """The verification name. default: the file name of `python`"""
+
+
+class OjVerifyPythonConfig(OjVerifyLanguageConfig):
+    environments: Optional[list[OjVerifyPythonConfigEnv]] = None
+    fork_server: bool = False
+    """Runs test cases in processes forked from a server which has imported the libraries.
+
+    It is available only on POSIX systems.
+    """
+
 
 class PythonLanguageEnvironment(LanguageEnvironment):
+    python: str
+    flags: list[str]
+    precompile: bool
+    fork_server: bool
+    _name: str
+
+    def __init__(
+        self,
+        *,
+        python: str = "python",
+        flags: Optional[list[str]] = None,
+        precompile: bool = False,
+        fork_server: bool = False,
+        name: str = "Python",
+    ):
+        self.python = python
+        self.flags = flags or []
+        self.precompile = precompile
+        self.fork_server = fork_server
+        self._name = name
+
     @property
     def name(self) -> str:
-        return "Python"
+        return self._name
+
+    def _python_path(self, basedir: pathlib.Path) -> str:
+        python_path = os.getenv("PYTHONPATH")
+        if python_path:
+            return basedir.resolve().as_posix() + os.pathsep + python_path
+        return basedir.resolve().as_posix()
+
+    def _socket_path(self, path: pathlib.Path, *, basedir: pathlib.Path) -> str:
+        # A path in the cache directory may exceed the length limit of a UNIX domain socket.
+        key = hashlib.sha256(
+            "\0".join(
+                [
+                    basedir.resolve().as_posix(),
+                    path.as_posix(),
+                    self.python,
+                    *self.flags,
+                ]
+            ).encode()
+        ).hexdigest()[:16]
+        # The server creates the directory with mode 0700 and refuses it if it is not private.
+        return os.path.join(
+            tempfile.gettempdir(),
+            f"competitive-verifier-{os.getuid()}",
+            f"{key}.sock",
+        )
+
+    def get_compile_command(
+        self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
+    ) -> Optional[str]:
+        env = ["env", f"PYTHONPATH={self._python_path(basedir)}"]
+        commands: list[str] = []
+        if self.precompile:
+            # .pyc files are written to __pycache__ with the tag of the interpreter.
+            dependencies = _python_list_depending_files(path.resolve(), basedir)
+            commands.append(
+                shlex.join(
+                    [
+                        self.python,
+                        *self.flags,
+                        "-m",
+                        "py_compile",
+                        *sorted(map(str, dependencies)),
+                    ]
+                )
+            )
+        if self.fork_server:
+            commands.append(
+                shlex.join(
+                    [
+                        *env,
+                        self.python,
+                        *self.flags,
+                        _FORK_SERVER,
+                        "serve",
+                        self._socket_path(path, basedir=basedir),
+                        str(path),
+                    ]
+                )
+            )
+        return " && ".join(commands) or None
 
     def get_execute_command(
         self, path: pathlib.Path, *, basedir: pathlib.Path, tempdir: pathlib.Path
     ) -> str:
-        python_path = os.getenv("PYTHONPATH")
-        if python_path:
-            python_path = basedir.resolve().as_posix() + os.pathsep + python_path
-        else:
-            python_path = basedir.resolve().as_posix()
-        return f"env PYTHONPATH={python_path} python {path}"
+        command = [self.python, *self.flags, str(path)]
+        if not self.fork_server:
+            return f"env PYTHONPATH={self._python_path(basedir)} {shlex.join(command)}"
+        return shlex.join(
+            [
+                "env",
+                f"PYTHONPATH={self._python_path(basedir)}",
+                self.python,
+                "-I",
+                "-S",
+                _FORK_SERVER,
+                "run",
+                self._socket_path(path, basedir=basedir),
+                "--",
+                *command,
+            ]
+        )
+
+
+class _ImportGraph:
+    """The import graph of Python files under `basedir`.
+
+    Each file is parsed at most once and the graph is shared by all queries.
+    Modules are looked up in the tracked files first, and then in the file system,
+    so untracked modules and directories outside a git work tree are also resolved.
+    """
+
+    def __init__(self, basedir: pathlib.Path, files: Iterable[pathlib.Path]) -> None:
+        self.basedir = basedir.resolve()
+        self._modules: dict[tuple[str, ...], Optional[pathlib.Path]] = {}
+        self._imports: dict[pathlib.Path, frozenset[pathlib.Path]] = {}
+        for file in files:
+            file = file.resolve()
+            if self.basedir not in file.parents:
+                continue
+            parts = file.relative_to(self.basedir).with_suffix("").parts
+            if parts[-1] == "__init__":
+                if len(parts) > 1:
+                    # a package shadows a module of the same name
+                    self._modules[parts[:-1]] = file
+            else:
+                self._modules.setdefault(parts, file)
+
+    def _find_module(self, module: tuple[str, ...]) -> Optional[pathlib.Path]:
+        if module in self._modules:
+            return self._modules[module]
+        found: Optional[pathlib.Path] = None
+        if module:
+            # a package shadows a module of the same name
+            for file in (
+                self.basedir.joinpath(*module, "__init__.py"),
+                self.basedir.joinpath(*module[:-1], module[-1] + ".py"),
+            ):
+                if file.is_file():
+                    found = file
+                    logger.debug("untracked module %s: %s", module, file.as_posix())
+                    break
+        self._modules[module] = found
+        return found
+
+    def _list_imported_modules(
+        self, path: pathlib.Path
+    ) -> Iterator[tuple[tuple[str, ...], ...]]:
+        """Yields candidates of module names for each imported name.
+
+        The last part of `from a.b import c` may be a module or a symbol,
+        so both `a.b.c` and `a.b` are yielded in this order.
+        """
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.warning("Failed to parse %s: %s", path.as_posix(), e)
+            return
+
+        try:
+            package = path.parent.relative_to(self.basedir).parts
+        except ValueError:
+            package = None
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    yield (tuple(alias.name.split(".")),)
+            elif isinstance(node, ast.ImportFrom):
+                module = tuple(node.module.split(".")) if node.module else ()
+                if node.level:
+                    if package is None or len(package) < node.level - 1:
+                        continue
+                    module = package[: len(package) - node.level + 1] + module
+                for alias in node.names:
+                    if alias.name == "*":
+                        yield (module,)
+                    else:
+                        yield (module + (alias.name,), module)
+
+    def direct_dependencies(self, path: pathlib.Path) -> frozenset[pathlib.Path]:
+        path = path.resolve()
+        deps = self._imports.get(path)
+        if deps is None:
+            found: set[pathlib.Path] = set()
+            for candidates in self._list_imported_modules(path):
+                for module in candidates:
+                    file = self._find_module(module)
+                    # We cannot import a file from itself.
+                    if file is not None and file != path:
+                        found.add(file)
+                        break
+            deps = self._imports[path] = frozenset(found)
+            logger.debug("the imports of %s: %s", path.as_posix(), deps)
+        return deps
+
+    def transitive_dependencies(self, path: pathlib.Path) -> set[pathlib.Path]:
+        path = path.resolve()
+        visited = {path}
+        stack = [path]
+        while stack:
+            for dep in self.direct_dependencies(stack.pop()):
+                if dep not in visited:
+                    visited.add(dep)
+                    stack.append(dep)
+        return visited
 
 
 @functools.lru_cache(maxsize=None)
+def _get_import_graph(basedir: pathlib.Path) -> _ImportGraph:
+    files = git.ls_files(basedir.resolve() / "*.py")
+    logger.debug("index %d Python files under %s", len(files), basedir.as_posix())
+    return _ImportGraph(basedir, files)
+
+
 def _python_list_depending_files(
     path: pathlib.Path, basedir: pathlib.Path
 ) -> list[pathlib.Path]:
-    # compute the dependency graph of the `path`
-    env = importlab.environment.Environment(
-        importlab.fs.Path([importlab.fs.OSFileSystem(str(basedir.resolve()))]),
-        (sys.version_info.major, sys.version_info.minor),
-    )
-    try:
-        executor = concurrent.futures.ThreadPoolExecutor()
-        future = executor.submit(
-            importlab.graph.ImportGraph.create,  # pyright: ignore[reportUnknownArgumentType]
-            env,
-            [str(path)],
-            True,
-        )
-        if platform.uname().system == "Windows":
-            timeout = 5.0  # 1.0 sec causes timeout on CI using Windows
-        else:
-            timeout = 1.0
-        res_graph = future.result(timeout=timeout)
-    except concurrent.futures.TimeoutError as e:
-        raise RuntimeError(
-            f"Failed to analyze the dependency graph (timeout): {path}"
-        ) from e
-    try:
-        node_deps_pairs: list[tuple[str, list[str]]] = res_graph.deps_list()
-    except Exception as e:
-        raise RuntimeError(
-            f"Failed to analyze the dependency graph (circular imports?): {path}"
-        ) from e
-    logger.debug("the dependency graph of %s: %s", str(path), node_deps_pairs)
-
-    # collect Python files which are depended by the `path` and under `basedir`
-    res_deps: list[pathlib.Path] = []
-    res_deps.append(path.resolve())
-    for node_, deps_ in node_deps_pairs:
-        node = pathlib.Path(node_)
-        deps = list(map(pathlib.Path, deps_))
-        if node.resolve() == path.resolve():
-            for dep in deps:
-                if basedir.resolve() in dep.resolve().parents:
-                    res_deps.append(dep.resolve())
-            break
-    return list(set(res_deps))
+    return list(_get_import_graph(basedir.resolve()).transitive_dependencies(path))
+
+
+def _python_list_imported_files(
+    path: pathlib.Path, basedir: pathlib.Path
+) -> list[pathlib.Path]:
+    graph = _get_import_graph(basedir.resolve())
+    return [path.resolve(), *graph.direct_dependencies(path)]
 
 
 class PythonLanguage(Language):
+    config: OjVerifyPythonConfig
+
+    def __init__(self, *, config: Optional[OjVerifyPythonConfig] = None):
+        self.config = config or OjVerifyPythonConfig()
+
     def list_dependencies(
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> list[pathlib.Path]:
-        return _python_list_depending_files(path.resolve(), basedir)
+        # The resolver computes the transitive closure of the dependencies.
+        return _python_list_imported_files(path.resolve(), basedir)
 
     def list_environments(
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> Sequence[PythonLanguageEnvironment]:
-        return [PythonLanguageEnvironment()]
+        return self._environments
+
+    @functools.cached_property
+    def _environments(self) -> list[PythonLanguageEnvironment]:
+        fork_server = self.config.fork_server
+        if fork_server and os.name != "posix":
+            logger.warning("The fork server is not available on %s", sys.platform)
+            fork_server = False
+
+        if not self.config.environments:
+            return [PythonLanguageEnvironment(fork_server=fork_server)]
+        return [
+            PythonLanguageEnvironment(
+                python=env.python,
+                flags=env.flags,
+                precompile=env.precompile,
+                fork_server=fork_server,
+                name=env.name or pathlib.Path(env.python).name,
+            )
+            for env in self.config.environments
+        ]
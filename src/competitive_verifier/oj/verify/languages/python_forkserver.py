@@ -0,0 +1,417 @@
+# Python Version: 3.9+
+"""A fork server which runs a Python verification with warm imports.
+
+This file is executed as a standalone script by the interpreter which runs
+verifications, so it must depend only on the standard library.
+
+``python python_forkserver.py serve SOCKET PATH``
+    Imports the modules imported by PATH, starts a daemon listening on SOCKET
+    and exits. The daemon forks a child for each connection and exits when it
+    is idle for a while.
+
+``python -I -S python_forkserver.py run SOCKET -- COMMAND...``
+    Passes its stdin/stdout/stderr, the current directory and the environment
+    variables to the server and exits with the exit status of the child.
+    It executes COMMAND instead if the server is not available.
+
+The server reaps each child with ``wait4`` and replies its exit status and
+peak RSS. A memory meter such as GNU time measures the client, not the child,
+so the client writes the peak RSS in kilobytes to the file named by
+``$COMPETITIVE_VERIFIER_MAXRSS_FILE`` if it is set.
+
+The directory of SOCKET must be owned by the user and inaccessible to the
+others. Otherwise the server does not start and the client does not connect.
+"""
+import ast
+import atexit
+import builtins
+import importlib.machinery
+import json
+import os
+import selectors
+import signal
+import socket
+import stat
+import struct
+import sys
+import threading
+import traceback
+import types
+from typing import Any, Optional
+
+IDLE_TIMEOUT = 120.0
+HANDSHAKE_TIMEOUT = 5.0
+
+MAXRSS_FILE_ENV = "COMPETITIVE_VERIFIER_MAXRSS_FILE"
+
+_LENGTH = struct.Struct("!Q")
+_STATUS = struct.Struct("!iQ")
+"""The exit status and the peak RSS in kilobytes"""
+
+
+def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = conn.recv(size - len(buf))
+        if not chunk:
+            raise EOFError
+        buf += chunk
+    return bytes(buf)
+
+
+def _is_private_directory(path: str) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and st.st_mode & 0o077 == 0
+    )
+
+
+def _is_own_socket(path: str) -> bool:
+    if not _is_private_directory(os.path.dirname(os.path.abspath(path))):
+        return False
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def _maxrss_kilobytes(rusage: Any) -> int:
+    if sys.platform == "darwin":
+        # bytes on macOS
+        return rusage.ru_maxrss // 1024
+    return rusage.ru_maxrss
+
+
+def _list_imported_modules(path: str) -> list[str]:
+    with open(path, "rb") as fh:
+        try:
+            tree = ast.parse(fh.read(), path)
+        except SyntaxError:
+            return []
+    modules: list[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.append(node.module)
+    return modules
+
+
+def _preload(path: str) -> None:
+    for module in _list_imported_modules(path):
+        try:
+            __import__(module)
+        except BaseException:
+            # The child reports the error as the normal interpreter does.
+            pass
+
+
+def _standard_streams() -> list[Any]:
+    streams: list[Any] = []
+    for f in (
+        sys.stdin,
+        sys.stdout,
+        sys.stderr,
+        sys.__stdin__,
+        sys.__stdout__,
+        sys.__stderr__,
+    ):
+        if f is not None and all(f is not other for other in streams):
+            streams.append(f)
+    return streams
+
+
+def _reset_stdio() -> None:
+    """Empties the buffers of the standard streams after their fds are replaced.
+
+    The children inherit the stream objects, and the libraries may keep references
+    to them (e.g. ``write = sys.stdout.write``), so they are never replaced.
+    """
+    for f in _standard_streams():
+        try:
+            if f.readable():
+                # drops the read-ahead data
+                f.read()
+            else:
+                f.flush()
+        except BaseException:
+            pass
+
+
+def _exec_main(path: str) -> None:
+    """Executes a script as the interpreter does with `python PATH`."""
+    main = types.ModuleType("__main__")
+    main.__file__ = path
+    main.__loader__ = importlib.machinery.SourceFileLoader("__main__", path)
+    main.__dict__.update(__cached__=None, __builtins__=builtins)
+    sys.modules["__main__"] = main
+    with open(path, "rb") as fh:
+        code = compile(fh.read(), path, "exec")
+    exec(code, main.__dict__)
+
+
+def _exit_status(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _run_child(path: str, argv0: str, fds: list[int], request: dict[str, Any]) -> None:
+    """Runs `path` as `__main__` in a forked process. Never returns."""
+    status = 1
+    try:
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [argv0]
+        if "random" in sys.modules:
+            # Seeds as a fresh interpreter does.
+            sys.modules["random"].seed()
+
+        try:
+            _exec_main(path)
+            status = 0
+        except SystemExit as e:
+            status = _exit_status(e)
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+
+        for thread in threading.enumerate():
+            if thread is not threading.main_thread() and not thread.daemon:
+                thread.join()
+        atexit._run_exitfuncs()
+        for f in _standard_streams():
+            try:
+                if f.writable():
+                    f.flush()
+            except BaseException:
+                status = status or 120
+    finally:
+        os._exit(status)
+
+
+class _Server:
+    def __init__(self, sock_path: str, path: str) -> None:
+        self.sock_path = sock_path
+        self.argv0 = path
+        self.path = os.path.abspath(path)
+        self.selector = selectors.DefaultSelector()
+        self.children: dict[int, socket.socket] = {}
+
+        tmp_path = f"{sock_path}.{os.getpid()}"
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(tmp_path)
+        self.listener.listen(16)
+        self.inode = os.stat(tmp_path).st_ino
+        # Replaces the socket of the previous server atomically.
+        os.replace(tmp_path, sock_path)
+
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(self.wakeup_w)
+
+        self.selector.register(self.listener, selectors.EVENT_READ, self._accept)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ, self._reap)
+
+    def serve_forever(self) -> None:
+        try:
+            while True:
+                events = self.selector.select(IDLE_TIMEOUT)
+                if not events and not self.children:
+                    return
+                for key, _ in events:
+                    key.data(key.fileobj)
+        finally:
+            try:
+                if os.stat(self.sock_path).st_ino == self.inode:
+                    os.unlink(self.sock_path)
+            except OSError:
+                pass
+
+    def _accept(self, listener: socket.socket) -> None:
+        conn, _ = listener.accept()
+        fds: list[int] = []
+        try:
+            conn.settimeout(HANDSHAKE_TIMEOUT)
+            msg, fds, _, _ = socket.recv_fds(conn, _LENGTH.size, 3)
+            if len(fds) != 3:
+                raise EOFError
+            (size,) = _LENGTH.unpack(msg + _recv_exactly(conn, _LENGTH.size - len(msg)))
+            request = json.loads(_recv_exactly(conn, size))
+        except (OSError, EOFError, ValueError):
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+            return
+
+        pid = os.fork()
+        if pid == 0:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            self.selector.close()
+            self.listener.close()
+            os.close(self.wakeup_r)
+            os.close(self.wakeup_w)
+            for other in self.children.values():
+                other.close()
+            conn.close()
+            _run_child(self.path, self.argv0, fds, request)
+
+        for fd in fds:
+            os.close(fd)
+        conn.settimeout(None)
+        self.children[pid] = conn
+        self.selector.register(conn, selectors.EVENT_READ, self._disconnect(pid))
+
+    def _disconnect(self, pid: int):
+        def callback(conn: socket.socket) -> None:
+            # The client never sends data after the request, so EOF means that it was killed (e.g. TLE).
+            try:
+                data = conn.recv(1)
+            except OSError:
+                data = b""
+            if not data:
+                self.selector.unregister(conn)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+        return callback
+
+    def _reap(self, wakeup_r: int) -> None:
+        try:
+            while os.read(wakeup_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        while self.children:
+            try:
+                pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            conn = self.children.pop(pid, None)
+            if conn is None:
+                continue
+            if os.WIFSIGNALED(status):
+                code = -os.WTERMSIG(status)
+            else:
+                code = os.WEXITSTATUS(status)
+            try:
+                self.selector.unregister(conn)
+            except KeyError:
+                pass
+            try:
+                conn.sendall(_STATUS.pack(code, _maxrss_kilobytes(rusage)))
+            except OSError:
+                pass
+            conn.close()
+
+
+def serve(sock_path: str, path: str) -> int:
+    directory = os.path.dirname(os.path.abspath(sock_path))
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    if not _is_private_directory(directory):
+        print(
+            f"The fork server is disabled because {directory} is not private",
+            file=sys.stderr,
+        )
+        return 0
+
+    sys.path[0] = os.path.dirname(os.path.abspath(path))
+    _preload(path)
+
+    ready_r, ready_w = os.pipe()
+    if os.fork() != 0:
+        os.close(ready_w)
+        with os.fdopen(ready_r, "rb") as fh:
+            ok = fh.read() == b"1"
+        if not ok:
+            print(f"Failed to start the fork server of {path}", file=sys.stderr)
+        # The verification runs without the server in that case.
+        return 0
+
+    os.close(ready_r)
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    _reset_stdio()
+    try:
+        server = _Server(sock_path, path)
+    except OSError:
+        os._exit(1)
+    os.write(ready_w, b"1")
+    os.close(ready_w)
+    try:
+        server.serve_forever()
+    finally:
+        os._exit(0)
+
+
+def run(sock_path: str, command: list[str]) -> int:
+    maxrss_file = os.environ.pop(MAXRSS_FILE_ENV, None)
+    conn: Optional[socket.socket] = None
+    try:
+        if not _is_own_socket(sock_path):
+            raise FileNotFoundError(sock_path)
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(sock_path)
+        request = json.dumps({"cwd": os.getcwd(), "env": dict(os.environ)}).encode()
+        socket.send_fds(conn, [_LENGTH.pack(len(request))], [0, 1, 2])
+    except (OSError, AttributeError):
+        if conn is not None:
+            conn.close()
+        os.execvp(command[0], command)
+
+    assert conn is not None
+    try:
+        conn.sendall(request)
+        code, maxrss = _STATUS.unpack(_recv_exactly(conn, _STATUS.size))
+    except (OSError, EOFError):
+        return 1
+    if maxrss_file:
+        try:
+            with open(maxrss_file, "w") as fh:
+                fh.write(f"{maxrss}\n")
+        except OSError:
+            pass
+    if code < 0:
+        signal.signal(-code, signal.SIG_DFL)
+        os.kill(os.getpid(), -code)
+        return 128 - code
+    return code
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) == 3 and argv[0] == "serve":
+        return serve(argv[1], argv[2])
+    if len(argv) >= 4 and argv[0] == "run" and argv[2] == "--":
+        return run(argv[1], argv[3:])
+    print(__doc__, file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,24 +1,28 @@
 import abc
 import enum
 import functools
+import hashlib
 import itertools
 import json
+import os
 import pathlib
-import shutil
 from collections import defaultdict
 from enum import Enum
 from logging import getLogger
 from typing import Any, Literal, Optional, Sequence
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
+import competitive_verifier.config as config
 import competitive_verifier.oj.verify.shlex2 as shlex
+import competitive_verifier.toolchain as toolchain
 from competitive_verifier.oj.verify.models import (
     Language,
     LanguageEnvironment,
     OjVerifyLanguageConfig,
 )
 from competitive_verifier.oj.verify.utils import exec_command, read_text_normalized
+from competitive_verifier.util import write_text_atomic
 
 logger = getLogger(__name__)
 
@@ -27,6 +31,24 @@ _cargo_checked_workspaces: set[pathlib.Path] = set()
 _related_source_files_by_workspace: dict[
     pathlib.Path, dict[pathlib.Path, frozenset[pathlib.Path]]
 ] = {}
+_targets_by_workspace: dict[
+    pathlib.Path, dict[pathlib.Path, tuple[dict[str, Any], dict[str, Any]]]
+] = {}
+_build_targets_by_workspace: dict[pathlib.Path, list[dict[str, Any]]] = {}
+_digests_by_workspace: dict[pathlib.Path, str] = {}
+
+_CACHE_VERSION = 1
+_TOOLCHAIN_FILES = ("rust-toolchain", "rust-toolchain.toml")
+
+
+class _WorkspaceCache(BaseModel):
+    """The cache of a workspace persisted in the cache directory."""
+
+    version: int
+    digest: str
+    metadata: dict[str, Any]
+    basedir: Optional[str] = None
+    related_source_files: Optional[dict[str, list[str]]] = None
 
 
 class OjVerifyRustListDependenciesBackend(BaseModel):
@@ -139,7 +161,7 @@ def _list_dependencies_by_crate(  # noqa: C901
             for d in main_package["dependencies"]
             if d["rename"]
         }
-        if not shutil.which("cargo-udeps"):
+        if toolchain.which("cargo-udeps") is None:
             raise RuntimeError("`cargo-udeps` not in $PATH")
         args: list[str] = [
             "rustup",
@@ -246,6 +268,21 @@ def _related_source_files(
             pathlib.Path(metadata["workspace_root"])
         ]
 
+    cache = _load_workspace_cache(pathlib.Path(metadata["workspace_root"]))
+    if (
+        cache is not None
+        and cache.related_source_files is not None
+        and cache.basedir == str(basedir)
+    ):
+        logger.info("Use cached dep-info of %s", metadata["workspace_root"])
+        return _related_source_files_by_workspace.setdefault(
+            pathlib.Path(metadata["workspace_root"]),
+            {
+                pathlib.Path(k): frozenset(map(pathlib.Path, v))
+                for k, v in cache.related_source_files.items()
+            },
+        )
+
     # Runs `cargo check` to generate `$target_directory/debug/deps/*.d`.
     if pathlib.Path(metadata["workspace_root"]) not in _cargo_checked_workspaces:
         exec_command(
@@ -329,6 +366,12 @@ def _related_source_files(
             logger.error("no `.d` file for `%s`", target["name"])
 
     _related_source_files_by_workspace[pathlib.Path(metadata["workspace_root"])] = ret
+    if cache is not None:
+        cache.basedir = str(basedir)
+        cache.related_source_files = {
+            str(k): sorted(map(str, v)) for k, v in ret.items()
+        }
+        _save_workspace_cache(cache)
     return ret
 
 
@@ -365,6 +408,23 @@ class RustLanguageEnvironment(LanguageEnvironment):
         path = basedir / path
         metadata = _cargo_metadata(cwd=path.parent)
         target = _ensure_target(metadata, path)
+
+        # Builds all targets to verify in the workspace at once.
+        # The first verification builds them in parallel and the others are no-op.
+        # If it fails, builds only this target not to fail the other verifications.
+        workspace_root = pathlib.Path(metadata["workspace_root"])
+        build_targets = _build_targets_by_workspace.get(workspace_root, [])
+        if any(t is target for t in build_targets):
+            build = ["cargo", "build", "--release", "--workspace"]
+            build_all = shlex.join(
+                build
+                + list(
+                    itertools.chain.from_iterable(map(_target_option, build_targets))
+                )
+            )
+            build_one = shlex.join(build + _target_option(target))
+            return f"cd {str(workspace_root)} && ({build_all} || {build_one})"
+
         return f"cd {str(path.parent.resolve())} && " + shlex.join(
             ["cargo", "build", "--release", *_target_option(target)]
         )
@@ -405,6 +465,36 @@ class RustLanguage(Language):
         else:
             self._list_dependencies_backend = _NoBackend()
 
+    def prepare(self, paths: list[pathlib.Path], *, basedir: pathlib.Path) -> None:
+        """Collects bin/example targets to verify to build them in one `cargo build` for each workspace."""
+        targets_by_workspace: dict[pathlib.Path, dict[tuple[str, ...], Any]] = {}
+        for path in paths:
+            attributes = self.list_attributes(path, basedir=basedir)
+            if "PROBLEM" not in attributes or "IGNORE" in attributes:
+                continue
+            path = basedir / path
+            try:
+                metadata = _cargo_metadata(cwd=path.parent)
+            except Exception as e:
+                logger.warning("Failed to load the metadata of %s: %s", path, e)
+                continue
+            package_and_target = _find_target(metadata, path)
+            if not package_and_target:
+                continue
+            package, target = package_and_target
+            if package["id"] not in metadata["workspace_members"] or not (
+                _is_bin(target) or _is_example(target)
+            ):
+                continue
+            targets_by_workspace.setdefault(
+                pathlib.Path(metadata["workspace_root"]), {}
+            )[tuple(_target_option(target))] = target
+
+        for workspace_root, targets in targets_by_workspace.items():
+            _build_targets_by_workspace[workspace_root] = [
+                targets[k] for k in sorted(targets)
+            ]
+
     def list_dependencies(
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> list[pathlib.Path]:
@@ -445,10 +535,20 @@ def _cargo_metadata_by_manifest_path(manifest_path: pathlib.Path) -> dict[str, A
     if manifest_path in _metadata_by_manifest_path:
         return _metadata_by_manifest_path[manifest_path]
 
-    metadata = _run_cargo_metadata(manifest_path)
+    metadata = _load_cached_metadata(manifest_path)
+    if metadata is None:
+        metadata = _run_cargo_metadata(manifest_path)
+        root_manifest_path = pathlib.Path(metadata["workspace_root"], "Cargo.toml")
+        if root_manifest_path != manifest_path:
+            metadata = _run_cargo_metadata(root_manifest_path)
+        _save_workspace_cache(
+            _WorkspaceCache(
+                version=_CACHE_VERSION,
+                digest=_workspace_digest(metadata),
+                metadata=metadata,
+            )
+        )
     root_manifest_path = pathlib.Path(metadata["workspace_root"], "Cargo.toml")
-    if root_manifest_path != manifest_path:
-        metadata = _run_cargo_metadata(root_manifest_path)
 
     for key in [
         root_manifest_path,
@@ -463,6 +563,108 @@ def _cargo_metadata_by_manifest_path(manifest_path: pathlib.Path) -> dict[str, A
     return metadata
 
 
+def _get_workspace_cache_path(workspace_root: pathlib.Path) -> pathlib.Path:
+    key = hashlib.sha256(str(workspace_root).encode()).hexdigest()[:32]
+    return config.get_cache_dir() / "rust" / f"{key}.json"
+
+
+def _workspace_digest(metadata: dict[str, Any]) -> str:
+    """Computes the digest of manifests, lock files and sources of a workspace.
+
+    :param metadata: Output of `cargo metadata`
+    :returns: A hash which changes when `cargo metadata` or dep-info may change
+    """
+    workspace_root = pathlib.Path(metadata["workspace_root"])
+    digest = _digests_by_workspace.get(workspace_root)
+    if digest is not None:
+        return digest
+
+    roots = {workspace_root} | {
+        pathlib.Path(p["manifest_path"]).parent
+        for p in metadata["packages"]
+        if p["source"] is None
+    }
+    files: set[pathlib.Path] = set()
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            # Skips hidden directories and `target` directories of packages.
+            dirnames[:] = [
+                d
+                for d in dirnames
+                if not d.startswith(".")
+                and not (d == "target" and "Cargo.toml" in filenames)
+            ]
+            for filename in filenames:
+                if (
+                    filename.endswith(".rs")
+                    or filename in ("Cargo.toml", "Cargo.lock")
+                    or filename in _TOOLCHAIN_FILES
+                ):
+                    files.add(pathlib.Path(dirpath, filename))
+
+    h = hashlib.sha256()
+    h.update(toolchain.fingerprint("cargo").encode())
+    for file in sorted(files):
+        h.update(str(file).encode())
+        h.update(b"\0")
+        h.update(hashlib.sha256(file.read_bytes()).digest())
+    digest = h.hexdigest()
+    _digests_by_workspace[workspace_root] = digest
+    return digest
+
+
+def _load_workspace_cache(workspace_root: pathlib.Path) -> Optional[_WorkspaceCache]:
+    """Loads the cache of the workspace if the workspace is unchanged."""
+    path = _get_workspace_cache_path(workspace_root)
+    try:
+        cache = _WorkspaceCache.model_validate_json(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValidationError, ValueError) as e:
+        logger.debug("Failed to load %s: %s", path.as_posix(), e)
+        return None
+    if cache.version != _CACHE_VERSION:
+        return None
+    try:
+        if _workspace_digest(cache.metadata) != cache.digest:
+            return None
+    except OSError as e:
+        logger.debug("Failed to compute the digest of %s: %s", workspace_root, e)
+        return None
+    return cache
+
+
+def _save_workspace_cache(cache: _WorkspaceCache) -> None:
+    path = _get_workspace_cache_path(pathlib.Path(cache.metadata["workspace_root"]))
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(path, cache.model_dump_json())
+    except OSError as e:
+        logger.debug("Failed to save %s: %s", path.as_posix(), e)
+
+
+def _load_cached_metadata(manifest_path: pathlib.Path) -> Optional[dict[str, Any]]:
+    """Returns "metadata" persisted by the previous runs without running `cargo`.
+
+    The workspace root is one of the parent directories of `manifest_path`.
+    """
+    for directory in manifest_path.parents:
+        if not (directory / "Cargo.toml").exists():
+            continue
+        cache = _load_workspace_cache(directory)
+        if cache is None:
+            continue
+        metadata = cache.metadata
+        if manifest_path == directory / "Cargo.toml" or any(
+            pathlib.Path(p["manifest_path"]) == manifest_path
+            for p in metadata["packages"]
+            if p["id"] in metadata["workspace_members"]
+        ):
+            logger.info("Use cached metadata of %s", metadata["workspace_root"])
+            return metadata
+    return None
+
+
 def _run_cargo_metadata(manifest_path: pathlib.Path) -> dict[str, Any]:
     """Runs `cargo metadata` for a certain `Cargo.toml`.
 
@@ -491,17 +693,33 @@ def _run_cargo_metadata(manifest_path: pathlib.Path) -> dict[str, Any]:
     )
 
 
+def _targets_by_src_path(
+    metadata: dict[str, Any]
+) -> dict[pathlib.Path, tuple[dict[str, Any], dict[str, Any]]]:
+    """Returns a (root source file) → (package, target) map of a workspace.
+
+    :param metadata: Output of `cargo metadata`
+    """
+    workspace_root = pathlib.Path(metadata["workspace_root"])
+    targets = _targets_by_workspace.get(workspace_root)
+    if targets is None:
+        targets = {}
+        for package in metadata["packages"]:
+            for target in package["targets"]:
+                # A `src_path` may contain `..`
+                # The path may not actually exist by being excluded from the package.
+                targets.setdefault(
+                    pathlib.Path(target["src_path"]).resolve(), (package, target)
+                )
+        _targets_by_workspace[workspace_root] = targets
+    return targets
+
+
 def _find_target(
     metadata: dict[str, Any],
     src_path: pathlib.Path,
 ) -> Optional[tuple[dict[str, Any], dict[str, Any]]]:
-    for package in metadata["packages"]:
-        for target in package["targets"]:
-            # A `src_path` may contain `..`
-            # The path may not actually exist by being excluded from the package.
-            if pathlib.Path(target["src_path"]).resolve() == src_path:
-                return package, target
-    return None
+    return _targets_by_src_path(metadata).get(src_path)
 
 
 def _ensure_target(metadata: dict[str, Any], src_path: pathlib.Path) -> dict[str, Any]:
@@ -3,7 +3,8 @@ import functools
 import pathlib
 import re
 from logging import getLogger
-from typing import Iterable, Mapping
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple
 
 from competitive_verifier.oj.verify.utils import read_text_normalized
 
@@ -11,40 +12,87 @@ logger = getLogger(__name__)
 
 
 # special comments like Vim and Python: see https://www.python.org/dev/peps/pep-0263/
+_SPECIAL_COMMENT_PATTERN = re.compile(
+    r"\b(?:verify-helper|verification-helper|competitive-verifier):\s*([0-9A-Za-z_]+)(?:\s(.*))?$"
+)
+# use a broad pattern. There are no needs to make match strict.
+_EMBEDDED_URL_PATTERN = re.compile(r"""['"`]?https?://\S*""")
+# Every match of the patterns above contains a match of this pattern.
+# A capturing group makes the search several times slower.
+_MARKER_PATTERN = re.compile(r"https?://|-helper:|-verifier:")
+# line boundaries of `str.splitlines`
+_LINE_BOUNDARY_PATTERN = re.compile("[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+_QUOTES = "'\"`"
+
+
+class ScannedSource(NamedTuple):
+    special_comments: Mapping[str, str]
+    embedded_urls: tuple[str, ...]
+
+
+def _strip_quotes(url: str) -> str:
+    # The URL may be written like `"https://atcoder.jp/"`. In this case, we need to remove `"`s around the URL.
+    # We also need to remove trailing superfluous chars in a case like `{"url":"https://atcoder.jp/"}`.
+    quote = url[0]
+    if quote in _QUOTES:
+        end_quote_pos = url.rfind(quote)
+        if end_quote_pos == 0:
+            # Remove opening quote from the URL like `"https://atcoder.jp/`
+            return url[1:]
+        # Remove quotes and trailing superfluous chars around the URL
+        return url[1:end_quote_pos]
+    return url
+
+
+def scan_text(content: str) -> ScannedSource:
+    """Extracts special comments and embedded URLs in one pass over the text.
+
+    Only the lines and the positions which contain markers are examined by the full patterns.
+    """
+    attributes: dict[str, str] = {}
+    urls: set[str] = set()
+    url_end = 0
+    line_end = 0
+    for marker in _MARKER_PATTERN.finditer(content):
+        pos = marker.start()
+        if content[pos] == "h":
+            if pos < url_end:
+                continue
+            if pos > 0 and content[pos - 1] in _QUOTES and pos - 1 >= url_end:
+                pos -= 1
+            matched = _EMBEDDED_URL_PATTERN.match(content, pos)
+            assert matched is not None
+            url_end = matched.end()
+            urls.add(_strip_quotes(matched.group()))
+        elif pos >= line_end:
+            boundary = _LINE_BOUNDARY_PATTERN.search(content, pos)
+            line_end = boundary.start() if boundary else len(content)
+            line_start = pos
+            while line_start > 0 and not _LINE_BOUNDARY_PATTERN.match(
+                content, line_start - 1
+            ):
+                line_start -= 1
+            matched = _SPECIAL_COMMENT_PATTERN.search(content[line_start:line_end])
+            if matched:
+                key = matched.group(1)
+                value = (matched.group(2) or "").strip()
+                attributes[key] = value
+    return ScannedSource(
+        special_comments=MappingProxyType(attributes),
+        embedded_urls=tuple(sorted(urls)),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def scan(path: pathlib.Path) -> ScannedSource:
+    return scan_text(read_text_normalized(path))
+
+
 @functools.lru_cache(maxsize=None)
 def list_special_comments(path: pathlib.Path) -> Mapping[str, str]:
-    pattern = re.compile(
-        r"\b(?:verify-helper|verification-helper|competitive-verifier):\s*([0-9A-Za-z_]+)(?:\s(.*))?$"
-    )
-    attributes: dict[str, str] = {}
-    for line in read_text_normalized(path).splitlines():
-        matched = pattern.search(line)
-        if matched:
-            key = matched.group(1)
-            value = (matched.group(2) or "").strip()
-            attributes[key] = value
-    return attributes
+    return scan(path.resolve()).special_comments
 
 
 @functools.lru_cache(maxsize=None)
 def list_embedded_urls(path: pathlib.Path) -> Iterable[str]:
-    pattern = re.compile(
-        r"""['"`]?https?://\S*"""
-    )  # use a broad pattern. There are no needs to make match strict.
-    content = read_text_normalized(path)
-    urls: list[str] = []
-    for url in pattern.findall(content):
-        # The URL may be written like `"https://atcoder.jp/"`. In this case, we need to remove `"`s around the URL.
-        # We also need to remove trailing superfluous chars in a case like `{"url":"https://atcoder.jp/"}`.
-        for quote in ("'", '"', "`"):
-            if url.startswith(quote):
-                end_quote_pos = url.rfind(quote)
-                if end_quote_pos == 0:
-                    # Remove opening quote from the URL like `"https://atcoder.jp/`
-                    url = url[1:]
-                else:
-                    # Remove quotes and trailing superfluous chars around the URL
-                    url = url[1:end_quote_pos]
-                break
-        urls.append(url)
-    return sorted(set(urls))
+    return scan(path.resolve()).embedded_urls
@@ -4,11 +4,11 @@ from logging import getLogger
 from tempfile import TemporaryDirectory
 from typing import Optional, Sequence, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 import competitive_verifier.oj.verify.languages.special_comments as special_comments
 import competitive_verifier.oj.verify.utils as utils
-from competitive_verifier.models import ShellCommand, ShellCommandLike
+from competitive_verifier.models import ForcePosixPath, ShellCommand, ShellCommandLike
 from competitive_verifier.oj.verify.models import (
     Language,
     LanguageEnvironment,
@@ -63,6 +63,16 @@ class PathContainer(BaseModel):
         return ShellCommand.parse_command_like(self.format_command(command))
 
 
+class UserDefinedBatchFile(BaseModel):
+    attributes: Optional[dict[str, str]] = None
+    dependencies: Optional[list[ForcePosixPath]] = None
+    bundle: Optional[str] = None
+
+
+class UserDefinedBatchResult(BaseModel):
+    files: dict[ForcePosixPath, UserDefinedBatchFile]
+
+
 class UserDefinedLanguageEnvironment(LanguageEnvironment):
     config: OjVerifyUserDefinedConfig
     _name: str
@@ -96,13 +106,52 @@ class UserDefinedLanguage(Language):
     extension: str
     config: OjVerifyUserDefinedConfig
 
+    _batch: dict[pathlib.Path, UserDefinedBatchFile]
+
     def __init__(self, *, extension: str, config: OjVerifyUserDefinedConfig):
         self.extension = extension
         self.config = config
+        self._batch = {}
+
+    def prepare(self, paths: list[pathlib.Path], *, basedir: pathlib.Path) -> None:
+        if self.config.batch is None or not paths:
+            return
+
+        with TemporaryDirectory() as tempdir:
+            proc = (
+                PathContainer(path=basedir, basedir=basedir, tempdir=tempdir)
+                .parse_command(self.config.batch)
+                .exec_command(
+                    text=False,
+                    capture_output=True,
+                    input="".join(p.as_posix() + "\n" for p in paths).encode(),
+                )
+            )
+        if proc.returncode != 0:
+            logger.warning(
+                "The batch command of .%s files failed: %s",
+                self.extension,
+                proc.stderr.decode(errors="replace"),
+            )
+            return
+        try:
+            result = UserDefinedBatchResult.model_validate_json(proc.stdout)
+        except ValidationError as e:
+            logger.warning(
+                "The batch command of .%s files returned invalid JSON: %s",
+                self.extension,
+                e,
+            )
+            return
+        self._batch.update(result.files)
 
     def list_attributes(
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> dict[str, str]:
+        batch = self._batch.get(path)
+        if batch is not None and batch.attributes is not None:
+            return dict(batch.attributes)
+
         if self.config.list_attributes is None:
             return dict(special_comments.list_special_comments(path))
 
@@ -122,16 +171,16 @@ class UserDefinedLanguage(Language):
     def list_dependencies(
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> list[pathlib.Path]:
+        batch = self._batch.get(path)
+        if batch is not None and batch.dependencies is not None:
+            return [path, *batch.dependencies]
+
         if self.config.list_dependencies is None:
             logger.warning(
                 "The functionality to list dependencies of .%s file is not implemented yet.",
                 self.extension,
             )
-            return list(
-                utils.glob_with_predicate(
-                    lambda path: path.suffix == "." + self.extension
-                )
-            )
+            return utils.list_files_with_suffix("." + self.extension)
 
         with TemporaryDirectory() as tempdir:
             text = (
@@ -146,6 +195,10 @@ class UserDefinedLanguage(Language):
         return dependencies
 
     def bundle(self, path: pathlib.Path, *, basedir: pathlib.Path) -> Optional[bytes]:
+        batch = self._batch.get(path)
+        if batch is not None and batch.bundle is not None:
+            return batch.bundle.encode()
+
         if self.config.bundle is None:
             return None
         with TemporaryDirectory() as tempdir:
@@ -18,7 +18,10 @@ from competitive_verifier.oj.verify.languages.java import (
     OjVerifyJavaConfig,
 )
 from competitive_verifier.oj.verify.languages.nim import NimLanguage, OjVerifyNimConfig
-from competitive_verifier.oj.verify.languages.python import PythonLanguage
+from competitive_verifier.oj.verify.languages.python import (
+    OjVerifyPythonConfig,
+    PythonLanguage,
+)
 from competitive_verifier.oj.verify.languages.ruby import (
     OjVerifyRubyConfig,
     RubyLanguage,
@@ -47,6 +50,7 @@ class OjVerifyLanguageConfigDict(BaseModel):
     haskell: OjVerifyHaskellConfig = Field(default_factory=OjVerifyHaskellConfig)
     java: OjVerifyJavaConfig = Field(default_factory=OjVerifyJavaConfig)
     nim: OjVerifyNimConfig = Field(default_factory=OjVerifyNimConfig)
+    python: OjVerifyPythonConfig = Field(default_factory=OjVerifyPythonConfig)
     ruby: OjVerifyRubyConfig = Field(default_factory=OjVerifyRubyConfig)
     rust: OjVerifyRustConfig = Field(default_factory=OjVerifyRustConfig)
 
@@ -68,7 +72,7 @@ class OjVerifyConfig(BaseModel):
         d[".cc"] = d[".cpp"]
         d[".h"] = d[".cpp"]
         d[".nim"] = NimLanguage(config=languages.nim)
-        d[".py"] = PythonLanguage()
+        d[".py"] = PythonLanguage(config=languages.python)
         d[".hs"] = HaskellLanguage(config=languages.haskell)
         d[".ruby"] = RubyLanguage(config=languages.ruby)
         d[".go"] = GoLanguage(config=languages.go)
@@ -31,6 +31,16 @@ class LanguageEnvironment(abc.ABC):
 
 
 class Language:
+    def prepare(self, paths: list[pathlib.Path], *, basedir: pathlib.Path) -> None:
+        """Called once with all files of the language before the queries for each file.
+
+        If it raises, the error is logged and each file is resolved with its per-file commands,
+        so the state for the batch must be set only after it succeeds.
+
+        :throws Exception:
+        """
+        return None
+
     def list_attributes(
         self, path: pathlib.Path, *, basedir: pathlib.Path
     ) -> dict[str, Any]:
@@ -76,3 +86,4 @@ class OjVerifyUserDefinedConfig(OjVerifyLanguageConfig):
     bundle: Optional[ShellCommandLike] = None
     list_attributes: Optional[ShellCommandLike] = None
     list_dependencies: Optional[ShellCommandLike] = None
+    batch: Optional[ShellCommandLike] = None
@@ -1,12 +1,17 @@
 # Python Version: 3.x
+import functools
 import glob
 import pathlib
+from logging import getLogger
 from subprocess import CompletedProcess
 from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
 
+import competitive_verifier.git as git
 from competitive_verifier.exec import exec_command as _exec_command
 from competitive_verifier.util import read_text_normalized  # noqa # pyright: ignore
 
+logger = getLogger(__name__)
+
 if TYPE_CHECKING:
     from _typeshed import StrOrBytesPath
 
@@ -21,6 +26,35 @@ def glob_with_predicate(pred: Callable[[pathlib.Path], bool]) -> Iterator[pathli
     return filter(pred, map(pathlib.Path, glob.glob("**", recursive=True)))
 
 
+@functools.lru_cache(maxsize=None)
+def _get_suffix_index(cwd: pathlib.Path) -> dict[str, list[pathlib.Path]]:
+    files = git.ls_files() | git.ls_untracked_files()
+    if not files:
+        logger.warning(
+            "No files are found by git in %s. Search the file system instead.",
+            cwd.as_posix(),
+        )
+        files = set(glob_with_predicate(lambda p: p.is_file()))
+    index: dict[str, list[pathlib.Path]] = {}
+    for path in sorted(files):
+        if any(part.startswith(".") for part in path.parts):
+            continue
+        index.setdefault(path.suffix, []).append(path)
+    return index
+
+
+def list_files_with_suffix(suffix: str) -> list[pathlib.Path]:
+    """list_files_with_suffix lists files whose suffix is `suffix`.
+
+    The index is built from tracked and untracked files of git, which are not ignored, once per working directory and shared by all languages. Outside a git work tree, it is built from the file system. Hidden directories and hidden files are ignored as in `glob_with_predicate`.
+    """
+    return list(_get_suffix_index(pathlib.Path.cwd()).get(suffix, []))
+
+
+def clear_file_index() -> None:
+    _get_suffix_index.cache_clear()
+
+
 def exec_command(
     command: "_StrOrListStr",
     *,
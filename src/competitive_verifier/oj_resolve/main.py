@@ -7,6 +7,7 @@ from typing import Optional, Union
 
 from pydantic import ValidationError
 
+from competitive_verifier import self_profile
 from competitive_verifier.arg import add_include_exclude_argument, add_verbose_argument
 from competitive_verifier.log import configure_stderr_logging
 from competitive_verifier.oj.verify.list import OjVerifyConfig
@@ -40,7 +41,8 @@ def run_impl(
         exclude=exclude,
         config=config,
     )
-    resolved = resolver.resolve(bundle=enable_bundle)
+    with self_profile.phase("resolve"):
+        resolved = resolver.resolve(bundle=enable_bundle)
     print(resolved.model_dump_json(exclude_none=True))
     return True
 
@@ -1,15 +1,17 @@
 import fnmatch
 import os
 import pathlib
+import re
 import traceback
 from functools import cached_property
 from itertools import chain
 from logging import getLogger
-from typing import Generator
+from typing import Generator, Optional
 
 import competitive_verifier.config as config
 import competitive_verifier.git as git
 import competitive_verifier.oj as oj
+import competitive_verifier.oj.verify.utils as utils
 from competitive_verifier.models import (
     AddtionalSource,
     ConstVerification,
@@ -20,7 +22,7 @@ from competitive_verifier.models import (
     VerificationInput,
 )
 from competitive_verifier.oj.verify.list import OjVerifyConfig
-from competitive_verifier.oj.verify.models import LanguageEnvironment
+from competitive_verifier.oj.verify.models import Language, LanguageEnvironment
 
 logger = getLogger(__name__)
 
@@ -33,7 +35,6 @@ class OjResolver:
     include: list[str]
     exclude: list[str]
     config: OjVerifyConfig
-    _match_exclude_cache: dict[pathlib.Path, bool]
 
     def __init__(
         self,
@@ -51,38 +52,31 @@ class OjResolver:
         self.include = list(map(_remove_slash, include))
         self.exclude = list(map(_remove_slash, exclude))
         self.config = config
-        self._match_exclude_cache = {}
 
-    def _match_exclude2(self, paths: list[pathlib.Path]) -> bool:
-        if not paths:
-            return False
-        path = paths.pop()
-        cache = self._match_exclude_cache.get(path, None)
-        if cache is not None:
-            return cache
-
-        for ex in self.exclude:
-            if fnmatch.fnmatch(path.as_posix(), ex):
-                self._match_exclude_cache[path] = True
-                return True
-        result = self._match_exclude2(paths)
-        self._match_exclude_cache[path] = result
-        return result
+    @cached_property
+    def _exclude_pattern(self) -> Optional["re.Pattern[str]"]:
+        """The single pattern compiled from all of `exclude` as `fnmatch` does."""
+        if not self.exclude:
+            return None
+        return re.compile(
+            "|".join(fnmatch.translate(os.path.normcase(ex)) for ex in self.exclude)
+        )
 
     def _match_exclude(self, path: pathlib.Path) -> bool:
-        paths = list(path.parents)
-        paths.reverse()
-        paths.append(path)
-        return self._match_exclude2(paths)
+        """A path is excluded if the path or its parent directories match one of `exclude`."""
+        pattern = self._exclude_pattern
+        if pattern is None:
+            return False
+        return any(
+            pattern.match(os.path.normcase(p.as_posix())) for p in (path, *path.parents)
+        )
 
     @cached_property
     def _lang_dict(self):
         return self.config.get_dict()
 
-    def resolve(self, *, bundle: bool) -> VerificationInput:
-        files: dict[pathlib.Path, VerificationFile] = {}
-        basedir = pathlib.Path.cwd()
-
+    def _list_targets(self) -> list[tuple[pathlib.Path, Language]]:
+        targets: list[tuple[pathlib.Path, Language]] = []
         for path in git.ls_files(*self.include):
             if self._match_exclude(path):
                 logger.debug("exclude=%s", path.as_posix())
@@ -91,7 +85,30 @@ class OjResolver:
             language = self._lang_dict.get(path.suffix)
             if language is None:
                 continue
+            targets.append((path, language))
+        return targets
+
+    def resolve(self, *, bundle: bool) -> VerificationInput:
+        files: dict[pathlib.Path, VerificationFile] = {}
+        basedir = pathlib.Path.cwd()
+        utils.clear_file_index()
+
+        targets = self._list_targets()
+        paths_by_language: dict[Language, list[pathlib.Path]] = {}
+        for path, language in targets:
+            paths_by_language.setdefault(language, []).append(path)
+        for language, paths in paths_by_language.items():
+            try:
+                language.prepare(paths, basedir=basedir)
+            except Exception:
+                # The files are resolved with the per-file commands.
+                logger.warning(
+                    "Failed to prepare %s: %s",
+                    type(language).__name__,
+                    traceback.format_exc(),
+                )
 
+        for path, language in targets:
             deps = set(git.ls_files(*language.list_dependencies(path, basedir=basedir)))
             attr = language.list_attributes(path, basedir=basedir)
 
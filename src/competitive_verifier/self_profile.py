@@ -0,0 +1,134 @@
+"""Profiles the Python code of competitive-verifier itself per phase.
+
+Each phase writes ``<phase>.prof`` (cProfile stats for pstats or snakeviz),
+``<phase>.txt`` (the functions by cumulative time) and ``<phase>.tracemalloc.txt``
+(the lines which allocated the memory left at the end of the phase)
+in the output directory.
+"""
+import cProfile
+import pathlib
+import pstats
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Optional
+
+logger = getLogger(__name__)
+
+DEFAULT_TOP = 30
+
+
+class _Phase:
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.allocations: dict[tracemalloc.Traceback, tuple[int, int]] = {}
+        """traceback -> (size, count)"""
+        self.peak = 0
+
+
+class SelfProfiler:
+    """cProfile and tracemalloc per phase.
+
+    Only one cProfile profiler can be active, so entering a phase pauses the phase
+    which encloses it. A phase entered more than once accumulates the results,
+    and entering a phase which is already active does nothing.
+    """
+
+    directory: pathlib.Path
+    top: int
+
+    def __init__(self, directory: pathlib.Path, *, top: int = DEFAULT_TOP) -> None:
+        self.directory = directory
+        self.top = top
+        self._phases: dict[str, _Phase] = {}
+        self._stack: list[_Phase] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        current = self._phases.setdefault(name, _Phase())
+        if current in self._stack:
+            yield
+            return
+
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        elif self._stack:
+            # the enclosing phase keeps its peak before the reset
+            _, peak = tracemalloc.get_traced_memory()
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        if self._stack:
+            self._stack[-1].profile.disable()
+        self._stack.append(current)
+        current.profile.enable()
+        try:
+            yield
+        finally:
+            current.profile.disable()
+            self._stack.pop()
+            _, peak = tracemalloc.get_traced_memory()
+            for p in [current, *self._stack]:
+                p.peak = max(p.peak, peak)
+            after = tracemalloc.take_snapshot()
+            for stat in after.compare_to(before, "lineno"):
+                size, count = current.allocations.get(stat.traceback, (0, 0))
+                current.allocations[stat.traceback] = (
+                    size + stat.size_diff,
+                    count + stat.count_diff,
+                )
+            if started_tracemalloc:
+                tracemalloc.stop()
+            if self._stack:
+                self._stack[-1].profile.enable()
+
+    def dump(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, phase in self._phases.items():
+            phase.profile.dump_stats(self.directory / f"{name}.prof")
+            with (self.directory / f"{name}.txt").open("w", encoding="utf-8") as fp:
+                stats = pstats.Stats(phase.profile, stream=fp)
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+            with (self.directory / f"{name}.tracemalloc.txt").open(
+                "w", encoding="utf-8"
+            ) as fp:
+                fp.write(f"peak traced memory: {phase.peak / 1024:.1f} KiB\n")
+                allocations = sorted(
+                    phase.allocations.items(), key=lambda t: t[1][0], reverse=True
+                )
+                for traceback, (size, count) in allocations[: self.top]:
+                    fp.write(
+                        f"{traceback}: {size / 1024:+.1f} KiB, {count:+d} blocks\n"
+                    )
+        logger.info(
+            "wrote the profiles of %s to %s",
+            ", ".join(self._phases),
+            self.directory.as_posix(),
+        )
+
+
+_profiler: Optional[SelfProfiler] = None
+
+
+def start(directory: pathlib.Path, *, top: int = DEFAULT_TOP) -> SelfProfiler:
+    global _profiler
+    _profiler = SelfProfiler(directory, top=top)
+    return _profiler
+
+
+def stop() -> Optional[SelfProfiler]:
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Profiles the phase if profiling is started, else does nothing"""
+    if _profiler is None:
+        yield
+        return
+    with _profiler.phase(name):
+        yield
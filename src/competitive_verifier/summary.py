@@ -10,6 +10,8 @@ from typing import Optional, TextIO
 from competitive_verifier.models import (
     FileResult,
     JudgeStatus,
+    PerformanceRegression,
+    RegressionKind,
     ResultStatus,
     TestcaseResult,
     VerifyCommandResult,
@@ -200,6 +202,49 @@ def write_summary(fp: TextIO, result: VerifyCommandResult):
                     c.memory_str,
                 )
 
+    _write_regressions(fp, file_results)
+
+
+def _write_regressions(
+    fp: TextIO, file_results: list[tuple[pathlib.Path, FileResult]]
+) -> None:
+    first_regression = True
+    for p, fr in file_results:
+        regressions = [
+            (v.verification_name, r)
+            for v in fr.verifications
+            for r in (v.regressions or [])
+        ]
+        if not regressions:
+            continue
+        if first_regression:
+            fp.write("## Performance regressions\n\n")
+            first_regression = False
+        fp.write(f"### {p.as_posix()}\n\n")
+
+        rtb = TableWriter(fp, ["env", "name", "kind", "Previous", "Current", "Limit"])
+        rtb.write_table_line(*[":---"] * 3 + [":---:"] * 3)
+
+        for env, r in regressions:
+            rtb.write_table_line(
+                env or "",
+                r.name,
+                r.kind.value,
+                _regression_value_str(r, r.previous),
+                _regression_value_str(r, r.current),
+                _regression_value_str(r, r.limit),
+            )
+
+
+def _regression_value_str(
+    regression: PerformanceRegression, value: Optional[float]
+) -> str:
+    if value is None:
+        return "-"
+    if regression.kind in (RegressionKind.TIME, RegressionKind.TLE_MARGIN):
+        return to_human_str_seconds(value)
+    return to_human_str_mega_bytes(value)
+
 
 class DisplayTestcaseResult(TestcaseResult):
     environment: Optional[str]
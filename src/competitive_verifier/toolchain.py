@@ -0,0 +1,177 @@
+import hashlib
+import pathlib
+import shutil
+from logging import getLogger
+from typing import Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+import competitive_verifier.config as config
+from competitive_verifier.exec import exec_command
+from competitive_verifier.models import ForcePosixPath
+from competitive_verifier.util import write_text_atomic
+
+logger = getLogger(__name__)
+
+KNOWN_TOOLCHAINS = ("g++", "clang++", "cargo", "nim", "javac", "python")
+
+_VERSION_OPTIONS: dict[str, list[str]] = {
+    "javac": ["-version"],
+    "java": ["-version"],
+}
+
+_found: dict[str, Optional[pathlib.Path]] = {}
+_probed: dict[str, Optional["Toolchain"]] = {}
+
+
+class Toolchain(BaseModel):
+    name: str = Field(
+        description="The command name of the toolchain.",
+    )
+    """The command name of the toolchain.
+    """
+
+    path: ForcePosixPath = Field(
+        description="The path of the executable found in $PATH.",
+    )
+    """The path of the executable found in $PATH.
+    """
+
+    version: str = Field(
+        description="The output of the version option.",
+    )
+    """The output of the version option.
+    """
+
+    mtime_ns: int
+    size: int
+
+    @property
+    def hash(self) -> str:
+        """The fingerprint of the toolchain. It can be used as a cache key."""
+        return hashlib.sha256(
+            "\0".join([self.name, self.path.as_posix(), self.version]).encode()
+        ).hexdigest()
+
+    def is_same_executable(self, path: pathlib.Path) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return (
+            self.path == path
+            and self.mtime_ns == stat.st_mtime_ns
+            and self.size == stat.st_size
+        )
+
+
+class ToolchainRegistry(BaseModel):
+    toolchains: dict[str, Toolchain] = Field(default_factory=dict)
+
+
+def get_registry_path() -> pathlib.Path:
+    return config.get_cache_dir() / "toolchains.json"
+
+
+def _load_registry() -> ToolchainRegistry:
+    path = get_registry_path()
+    try:
+        return ToolchainRegistry.model_validate_json(path.read_bytes())
+    except FileNotFoundError:
+        pass
+    except (OSError, ValidationError, ValueError) as e:
+        logger.debug("Failed to load %s: %s", path.as_posix(), e)
+    return ToolchainRegistry()
+
+
+def _save_toolchain(toolchain: Toolchain) -> None:
+    path = get_registry_path()
+    registry = _load_registry()
+    registry.toolchains[toolchain.name] = toolchain
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Subcommands running concurrently share the file.
+        write_text_atomic(path, registry.model_dump_json())
+    except OSError as e:
+        logger.debug("Failed to save %s: %s", path.as_posix(), e)
+
+
+def _probe(name: str) -> Optional[Toolchain]:
+    path = which(name)
+    if path is None:
+        logger.debug("toolchain not found: %s", name)
+        return None
+
+    persisted = _load_registry().toolchains.get(name)
+    if persisted is not None and persisted.is_same_executable(path):
+        logger.debug("toolchain %s: reuse %s", name, persisted.path.as_posix())
+        return persisted
+
+    proc = exec_command(
+        [str(path), *_VERSION_OPTIONS.get(pathlib.Path(name).name, ["--version"])],
+        capture_output=True,
+    )
+    version = (proc.stdout + proc.stderr).decode(errors="replace").strip()
+    stat = path.stat()
+    toolchain = Toolchain(
+        name=name,
+        path=path,
+        version=version,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+    )
+    _save_toolchain(toolchain)
+    return toolchain
+
+
+def get_toolchain(name: str) -> Optional[Toolchain]:
+    """Returns the toolchain found in $PATH.
+
+    The executable is probed once per process. Its version is persisted in the cache
+    directory and reused across subcommands while the executable is unchanged.
+
+    Args:
+        name (str): A command name such as ``g++`` or a path to the executable.
+
+    Returns:
+        Optional[Toolchain]: None if the executable is not found.
+    """
+    if name not in _probed:
+        _probed[name] = _probe(name)
+    return _probed[name]
+
+
+def which(name: str) -> Optional[pathlib.Path]:
+    """Cached ``shutil.which``. It does not run the executable to probe its version.
+
+    The path is for probing on this machine. Generated commands should keep the bare command name,
+    because they may run on another machine.
+    """
+    if name not in _found:
+        found = shutil.which(name)
+        _found[name] = pathlib.Path(found) if found else None
+    return _found[name]
+
+
+def fingerprint(*names: str) -> str:
+    """The combined fingerprint of toolchains.
+
+    Args:
+        names (str): Toolchain names. default: ``KNOWN_TOOLCHAINS``
+
+    Returns:
+        str: A hash of found toolchains
+    """
+    h = hashlib.sha256()
+    for name in names or KNOWN_TOOLCHAINS:
+        toolchain = get_toolchain(name)
+        h.update(name.encode())
+        h.update(b"\0")
+        h.update(toolchain.hash.encode() if toolchain else b"-")
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def clear_cache() -> None:
+    _found.clear()
+    _probed.clear()
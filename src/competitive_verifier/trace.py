@@ -0,0 +1,103 @@
+"""Timeline of a run in the Chrome trace event format, which Perfetto and
+chrome://tracing load.
+
+https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+"""
+import json
+import os
+import pathlib
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Any, Optional
+
+logger = getLogger(__name__)
+
+
+class Tracer:
+    """Records complete events of spans.
+
+    The timestamps are microseconds since the Unix epoch, so the traces of the shards
+    of a run can be put on one timeline by concatenating their ``traceEvents``.
+    """
+
+    pid: int
+    events: list[dict[str, Any]]
+
+    def __init__(self, *, process_name: Optional[str] = None) -> None:
+        self.pid = os.getpid()
+        self.events = []
+        self._origin = time.time_ns() // 1000 - time.perf_counter_ns() // 1000
+        self._threads: set[int] = set()
+        if process_name:
+            self._metadata("process_name", process_name, tid=0)
+
+    def now(self) -> int:
+        return self._origin + time.perf_counter_ns() // 1000
+
+    def _metadata(self, name: str, value: str, *, tid: int) -> None:
+        self.events.append(
+            {
+                "name": name,
+                "ph": "M",
+                "pid": self.pid,
+                "tid": tid,
+                "args": {"name": value},
+            }
+        )
+
+    @contextmanager
+    def span(self, name: str, *, cat: str, **args: Any) -> Iterator[None]:
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads.add(tid)
+            self._metadata("thread_name", threading.current_thread().name, tid=tid)
+        begin = self.now()
+        try:
+            yield
+        finally:
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": begin,
+                    "dur": self.now() - begin,
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+    def dump(self, path: pathlib.Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as fp:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, fp)
+        logger.info("wrote %d trace events to %s", len(self.events), path.as_posix())
+
+
+_tracer: Optional[Tracer] = None
+
+
+def start(*, process_name: Optional[str] = None) -> Tracer:
+    global _tracer
+    _tracer = Tracer(process_name=process_name)
+    return _tracer
+
+
+def stop() -> Optional[Tracer]:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+@contextmanager
+def span(name: str, *, cat: str, **args: Any) -> Iterator[None]:
+    """Records the span if tracing is started, else does nothing"""
+    if _tracer is None:
+        yield
+        return
+    with _tracer.span(name, cat=cat, **args):
+        yield
@@ -1,8 +1,11 @@
+import hashlib
+import os
 import pathlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from os import PathLike
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Sequence, TypeVar
 
-from charset_normalizer import from_path  # pyright: ignore[reportUnknownVariableType]
 from charset_normalizer import from_bytes
 
 
@@ -13,9 +16,105 @@ def to_relative(path: pathlib.Path) -> Optional[pathlib.Path]:
         return None
 
 
+_T = TypeVar("_T")
+_U = TypeVar("_U")
+
+_texts: dict[bytes, str] = {}
+_digests: dict[pathlib.Path, tuple[int, int, bytes]] = {}
+
+
 def read_text_normalized(path: PathLike[Any]) -> str:
-    return str(from_path(path).best())
+    """Reads and decodes the file.
+
+    The text is cached by the content, so the same file is decoded only once per process.
+    """
+    path = pathlib.Path(path).resolve()
+    stat = path.stat()
+    cached = _digests.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        text = _texts.get(cached[2])
+        if text is not None:
+            return text
+
+    b = path.read_bytes()
+    digest = hashlib.blake2b(b, digest_size=16).digest()
+    _digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return _decode(b, digest)
 
 
 def normalize_bytes_text(b: bytes) -> str:
-    return str(from_bytes(b).best())
+    return _decode(b, hashlib.blake2b(b, digest_size=16).digest())
+
+
+def _decode(b: bytes, digest: bytes) -> str:
+    text = _texts.get(digest)
+    if text is None:
+        try:
+            text = b.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            text = str(from_bytes(b).best())
+        _texts[digest] = text
+    return text
+
+
+def clear_text_cache() -> None:
+    _texts.clear()
+    _digests.clear()
+
+
+def write_text_atomic(path: pathlib.Path, text: str) -> None:
+    """Writes the file through a temporary file and `os.replace`.
+
+    Readers never see a truncated file, even if the write is interrupted or the processes write the file concurrently.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f"{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            fp.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+"""Files smaller than this in total are parsed in process by `map_file_chunks`,
+which is faster than starting worker processes."""
+
+
+def map_chunks(func: Callable[[list[_T]], _U], items: Sequence[_T]) -> list[_U]:
+    """Applies `func` to contiguous chunks of `items` in worker processes.
+
+    The results are in the order of the chunks. If there is only one CPU or one item,
+    `func` runs once in this process.
+    """
+    workers = min(len(items), os.cpu_count() or 1)
+    if workers <= 1:
+        return [func(list(items))]
+    size = -(-len(items) // workers)
+    chunks = [list(items[i : i + size]) for i in range(0, len(items), size)]
+    with ProcessPoolExecutor(len(chunks)) as executor:
+        return list(executor.map(func, chunks))
+
+
+def map_file_chunks(
+    func: Callable[[list[pathlib.Path]], _U],
+    paths: Sequence[pathlib.Path],
+    *,
+    min_bytes: Optional[int] = None,
+) -> list[_U]:
+    """`map_chunks` for files, which runs `func` in this process if the files are small.
+
+    Args:
+        min_bytes (Optional[int]): default: ``PARALLEL_MIN_BYTES``
+    """
+    if min_bytes is None:
+        min_bytes = PARALLEL_MIN_BYTES
+    try:
+        size = sum(p.stat().st_size for p in paths)
+    except OSError:
+        # `func` reports the error
+        size = 0
+    if size < min_bytes:
+        return [func(list(paths))]
+    return map_chunks(func, paths)
@@ -6,7 +6,8 @@ import sys
 from logging import getLogger
 from typing import Optional
 
-from competitive_verifier import github, summary
+from competitive_verifier import git, github, self_profile, summary, toolchain, trace
+from competitive_verifier.affected.main import get_affected_verification_files
 from competitive_verifier.arg import (
     add_ignore_error_argument,
     add_verbose_argument,
@@ -14,8 +15,10 @@ from competitive_verifier.arg import (
     add_write_summary_argument,
 )
 from competitive_verifier.error import VerifierError
+from competitive_verifier.history import HistoryDB
 from competitive_verifier.log import configure_stderr_logging
 from competitive_verifier.models import VerificationInput, VerifyCommandResult
+from competitive_verifier.verify.regression import RegressionThresholds
 from competitive_verifier.verify.verifier import SplitState, Verifier
 
 logger = getLogger(__name__)
@@ -34,22 +37,107 @@ def run_impl(
     output_path: Optional[pathlib.Path] = None,
     write_summary: bool = False,
     ignore_error: bool = False,
+    affected_since: Optional[str] = None,
+    history_db: Optional[pathlib.Path] = None,
+    regression_thresholds: Optional[RegressionThresholds] = None,
+    trace_path: Optional[pathlib.Path] = None,
 ) -> bool:
     split_state = get_split_state(split, split_index)
+    if trace_path:
+        trace.start(
+            process_name="verify" if split_state is None else f"verify {split_state}"
+        )
+    try:
+        result = _verify(
+            input,
+            prev_result=prev_result,
+            timeout=timeout,
+            default_tle=default_tle,
+            default_mle=default_mle,
+            download=download,
+            split_state=split_state,
+            affected_since=affected_since,
+            history_db=history_db,
+            regression_thresholds=regression_thresholds,
+        )
+        with trace.span("write result", cat="result"):
+            write_result(result, output_path=output_path, write_summary=write_summary)
+    finally:
+        tracer = trace.stop()
+        if tracer and trace_path:
+            tracer.dump(trace_path)
+
+    is_success = result.is_success()
+
+    if is_success:
+        logger.info("success!")
+    else:
+        logger.warning("not success!")
+
+    return is_success or ignore_error
+
+
+def _verify(
+    input: VerificationInput,
+    *,
+    prev_result: Optional[VerifyCommandResult],
+    timeout: float,
+    default_tle: Optional[float],
+    default_mle: Optional[float],
+    download: bool,
+    split_state: Optional[SplitState],
+    affected_since: Optional[str],
+    history_db: Optional[pathlib.Path],
+    regression_thresholds: Optional[RegressionThresholds],
+) -> VerifyCommandResult:
+    affected = None
+    if affected_since is not None:
+        with trace.span("affected", cat="resolve", rev=affected_since):
+            affected = get_affected_verification_files(input, affected_since)
+        logger.info(
+            "affected verification files since %s: %d", affected_since, len(affected)
+        )
 
     if timeout == 0:
         timeout = math.inf
 
-    verifier = Verifier(
-        input,
-        use_git_timestamp=github.env.is_in_github_actions(),
-        timeout=timeout,
-        default_tle=default_tle,
-        default_mle=default_mle,
-        prev_result=prev_result,
-        split_state=split_state,
-    )
-    result = verifier.verify(download=download)
+    history = HistoryDB(history_db) if history_db else None
+    # The timings are comparable only between the runs with the same toolchains.
+    fingerprint = toolchain.fingerprint() if history else None
+    try:
+        verifier = Verifier(
+            input,
+            use_git_timestamp=github.env.is_in_github_actions(),
+            timeout=timeout,
+            default_tle=default_tle,
+            default_mle=default_mle,
+            prev_result=prev_result,
+            split_state=split_state,
+            affected=affected,
+            history=history,
+            regression_thresholds=regression_thresholds,
+            toolchain=fingerprint,
+        )
+        result = verifier.verify(download=download)
+        if history:
+            with trace.span("history", cat="result"):
+                history.record(
+                    result,
+                    commit=git.get_commit_hash(),
+                    toolchain=fingerprint,
+                )
+    finally:
+        if history:
+            history.close()
+    return result
+
+
+def write_result(
+    result: VerifyCommandResult,
+    *,
+    output_path: Optional[pathlib.Path],
+    write_summary: bool,
+) -> None:
     result_json = result.model_dump_json(exclude_none=True)
 
     if write_summary:
@@ -66,15 +154,6 @@ def run_impl(
         output_path.parent.mkdir(parents=True, exist_ok=True)
         output_path.write_text(result_json, encoding="utf-8")
 
-    is_success = result.is_success()
-
-    if is_success:
-        logger.info("success!")
-    else:
-        logger.warning("not success!")
-
-    return is_success or ignore_error
-
 
 def run(args: argparse.Namespace) -> bool:
     default_level = logging.INFO
@@ -84,13 +163,29 @@ def run(args: argparse.Namespace) -> bool:
 
     logger.debug("arguments=%s", vars(args))
     logger.info("verify_files_json=%s", str(args.verify_files_json))
-    input = VerificationInput.parse_file_relative(args.verify_files_json)
-    prev_result = None
-    if args.prev_result:
-        try:
-            prev_result = VerifyCommandResult.parse_file_relative(args.prev_result)
-        except Exception:
-            logger.warning("Failed to parse prev_result: %s", args.prev_result)
+    with self_profile.phase("resolve"):
+        input = VerificationInput.parse_file_relative(args.verify_files_json)
+        prev_result = None
+        if args.prev_result:
+            try:
+                prev_result = VerifyCommandResult.parse_file_relative(args.prev_result)
+            except Exception:
+                logger.warning("Failed to parse prev_result: %s", args.prev_result)
+
+    regression_thresholds = None
+    regression_check = args.regression_check
+    if regression_check is None:
+        # Without a baseline, only the TLE/MLE margins could be reported.
+        regression_check = bool(args.prev_result or args.history_db)
+    if regression_check:
+        regression_thresholds = RegressionThresholds(
+            time_ratio=args.regression_time_ratio,
+            memory_ratio=args.regression_memory_ratio,
+            min_time_increase=args.regression_min_seconds,
+            min_memory_increase=args.regression_min_mb,
+            tle_margin=args.tle_margin,
+            mle_margin=args.mle_margin,
+        )
 
     return run_impl(
         input,
@@ -104,6 +199,10 @@ def run(args: argparse.Namespace) -> bool:
         output_path=args.output,
         write_summary=args.write_summary,
         ignore_error=args.ignore_error,
+        affected_since=args.affected_since,
+        history_db=args.history_db,
+        regression_thresholds=regression_thresholds,
+        trace_path=args.trace,
     )
 
 
@@ -138,6 +237,19 @@ def argument(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         required=False,
         help="Previous result json file",
     )
+    parser.add_argument(
+        "--affected-since",
+        metavar="REV",
+        help="Verify only files affected by changes since the git revision. "
+        "The other files keep the results in --prev-result.",
+    )
+    parser.add_argument(
+        "--history-db",
+        type=pathlib.Path,
+        required=False,
+        help="SQLite database to which verifier appends the results of each run. "
+        "The files are verified in ascending order of the recorded time.",
+    )
 
     parser.add_argument(
         "--no-download",
@@ -152,6 +264,72 @@ def argument(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         required=False,
         help="The output file for which verifier saves the result json.",
     )
+    parser.add_argument(
+        "--trace",
+        type=pathlib.Path,
+        required=False,
+        help="The output file for which verifier saves the timeline of the run "
+        "in the Chrome trace event format",
+    )
+    regression_group = parser.add_argument_group(
+        "performance regression",
+        "Compare test cases with --history-db or --prev-result. "
+        "It is enabled by default only if either of them is given.",
+    )
+    regression_group.add_argument(
+        "--regression-check",
+        action="store_true",
+        default=None,
+        dest="regression_check",
+        help="Enable the comparison even without the baselines, "
+        "which reports only --tle-margin and --mle-margin",
+    )
+    regression_group.add_argument(
+        "--no-regression-check",
+        action="store_false",
+        default=None,
+        dest="regression_check",
+        help="Suppress the comparison",
+    )
+    regression_group.add_argument(
+        "--regression-time-ratio",
+        type=float,
+        default=RegressionThresholds().time_ratio,
+        help="Report test cases slower than the previous time by the ratio",
+    )
+    regression_group.add_argument(
+        "--regression-memory-ratio",
+        type=float,
+        default=RegressionThresholds().memory_ratio,
+        help="Report test cases heavier than the previous memory by the ratio",
+    )
+    regression_group.add_argument(
+        "--regression-min-seconds",
+        type=float,
+        default=RegressionThresholds().min_time_increase,
+        help="Ignore increases of elapsed time smaller than the seconds",
+    )
+    regression_group.add_argument(
+        "--regression-min-mb",
+        type=float,
+        default=RegressionThresholds().min_memory_increase,
+        help="Ignore increases of memory usage smaller than the megabytes",
+    )
+    regression_group.add_argument(
+        "--tle-margin",
+        type=float,
+        default=RegressionThresholds().tle_margin,
+        help="Report test cases whose remaining time is less than "
+        "the fraction of TLE",
+    )
+    regression_group.add_argument(
+        "--mle-margin",
+        type=float,
+        default=RegressionThresholds().mle_margin,
+        help="Report test cases whose remaining memory is less than "
+        "the fraction of MLE",
+    )
+
     parser.add_argument_group()
     parallel_group = parser.add_argument_group("parallel")
     parallel_group.add_argument(
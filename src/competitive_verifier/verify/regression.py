@@ -0,0 +1,137 @@
+from collections.abc import Iterable, Mapping
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from competitive_verifier.models import (
+    JudgeStatus,
+    PerformanceRegression,
+    RegressionKind,
+    TestcaseResult,
+)
+
+Baseline = Mapping[str, tuple[float, Optional[float]]]
+"""name -> (elapsed, memory) of test cases in the previous runs"""
+
+
+class RegressionThresholds(BaseModel):
+    time_ratio: float = Field(
+        default=1.5,
+        description="The ratio of elapsed time to the previous one to be a regression.",
+    )
+    """The ratio of elapsed time to the previous one to be a regression.
+    """
+
+    memory_ratio: float = Field(
+        default=1.5,
+        description="The ratio of memory usage to the previous one to be a regression.",
+    )
+    """The ratio of memory usage to the previous one to be a regression.
+    """
+
+    min_time_increase: float = Field(
+        default=0.1,
+        description="Increases of elapsed seconds smaller than this are noise.",
+    )
+    """Increases of elapsed seconds smaller than this are noise.
+    """
+
+    min_memory_increase: float = Field(
+        default=16,
+        description="Increases of memory usage (MB) smaller than this are noise.",
+    )
+    """Increases of memory usage (MB) smaller than this are noise.
+    """
+
+    tle_margin: float = Field(
+        default=0.2,
+        description="Test cases whose remaining time is less than "
+        "this fraction of TLE are reported.",
+    )
+    """Test cases whose remaining time is less than this fraction of TLE are reported.
+    """
+
+    mle_margin: float = Field(
+        default=0.2,
+        description="Test cases whose remaining memory is less than "
+        "this fraction of MLE are reported.",
+    )
+    """Test cases whose remaining memory is less than this fraction of MLE are reported.
+    """
+
+
+def to_baseline(testcases: Iterable[TestcaseResult]) -> Baseline:
+    return {
+        c.name: (c.elapsed, c.memory) for c in testcases if c.status == JudgeStatus.AC
+    }
+
+
+def detect_regressions(
+    testcases: Iterable[TestcaseResult],
+    baseline: Baseline,
+    *,
+    thresholds: RegressionThresholds,
+    tle: Optional[float] = None,
+    mle: Optional[float] = None,
+) -> list[PerformanceRegression]:
+    """Compares the accepted test cases with the baseline and the limits.
+
+    Args:
+        baseline (Baseline): Test cases not in it are checked only against the limits
+        tle (Optional[float]): The TLE time in seconds
+        mle (Optional[float]): The MLE memory size in megabytes
+    """
+    t = thresholds
+    regressions: list[PerformanceRegression] = []
+    for c in testcases:
+        if c.status != JudgeStatus.AC:
+            continue
+        prev_elapsed, prev_memory = baseline.get(c.name, (None, None))
+        if (
+            prev_elapsed is not None
+            and c.elapsed - prev_elapsed >= t.min_time_increase
+            and c.elapsed >= prev_elapsed * t.time_ratio
+        ):
+            regressions.append(
+                PerformanceRegression(
+                    name=c.name,
+                    kind=RegressionKind.TIME,
+                    current=c.elapsed,
+                    previous=prev_elapsed,
+                )
+            )
+        if (
+            c.memory is not None
+            and prev_memory is not None
+            and c.memory - prev_memory >= t.min_memory_increase
+            and c.memory >= prev_memory * t.memory_ratio
+        ):
+            regressions.append(
+                PerformanceRegression(
+                    name=c.name,
+                    kind=RegressionKind.MEMORY,
+                    current=c.memory,
+                    previous=prev_memory,
+                )
+            )
+        if tle and c.elapsed >= tle * (1 - t.tle_margin):
+            regressions.append(
+                PerformanceRegression(
+                    name=c.name,
+                    kind=RegressionKind.TLE_MARGIN,
+                    current=c.elapsed,
+                    previous=prev_elapsed,
+                    limit=tle,
+                )
+            )
+        if mle and c.memory is not None and c.memory >= mle * (1 - t.mle_margin):
+            regressions.append(
+                PerformanceRegression(
+                    name=c.name,
+                    kind=RegressionKind.MLE_MARGIN,
+                    current=c.memory,
+                    previous=prev_memory,
+                    limit=mle,
+                )
+            )
+    return regressions
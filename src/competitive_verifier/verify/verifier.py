@@ -6,11 +6,13 @@ from functools import cached_property
 from logging import getLogger
 from typing import Optional, Union
 
-from competitive_verifier import git, github, log
+from competitive_verifier import git, github, log, self_profile, trace
 from competitive_verifier.download.main import run_impl as run_download
 from competitive_verifier.error import VerifierError
+from competitive_verifier.history import HistoryDB
 from competitive_verifier.models import (
     FileResult,
+    ProblemVerification,
     ResultStatus,
     Verification,
     VerificationFile,
@@ -19,6 +21,12 @@ from competitive_verifier.models import (
     VerifyCommandResult,
 )
 from competitive_verifier.resource import ulimit_stack
+from competitive_verifier.verify.regression import (
+    Baseline,
+    RegressionThresholds,
+    detect_regressions,
+    to_baseline,
+)
 from competitive_verifier.verify.split_state import SplitState
 
 logger = getLogger(__name__)
@@ -29,6 +37,8 @@ class InputContainer(ABC):
     verification_time: datetime.datetime
     prev_result: Optional[VerifyCommandResult]
     split_state: Optional[SplitState]
+    affected: Optional[set[pathlib.Path]]
+    history: Optional[HistoryDB]
 
     def __init__(
         self,
@@ -37,11 +47,15 @@ class InputContainer(ABC):
         verification_time: datetime.datetime,
         prev_result: Optional[VerifyCommandResult],
         split_state: Optional[SplitState],
+        affected: Optional[set[pathlib.Path]] = None,
+        history: Optional[HistoryDB] = None,
     ) -> None:
         self.input = input
         self.verification_time = verification_time
         self.prev_result = prev_result
         self.split_state = split_state
+        self.affected = affected
+        self.history = history
 
     @abstractmethod
     def get_file_timestamp(self, path: pathlib.Path) -> datetime.datetime:
@@ -72,8 +86,14 @@ class InputContainer(ABC):
     def verification_files(self) -> dict[pathlib.Path, VerificationFile]:
         """
         List of verification files.
+
+        if ``affected`` is not None, only the files in it.
         """
-        return {p: f for p, f in self.input.files.items() if f.is_verification()}
+        return {
+            p: f
+            for p, f in self.input.files.items()
+            if f.is_verification() and (self.affected is None or p in self.affected)
+        }
 
     @cached_property
     def skippable_verification_files(self) -> dict[pathlib.Path, VerificationFile]:
@@ -115,14 +135,22 @@ class InputContainer(ABC):
         if ``split_state`` is None the property is ``remaining_verification_files``;
 
         else ``split_state.split(remaining_verification_files)``.
+
+        if ``history`` is not None, the files never recorded come first and the rest
+        are in ascending order of the median elapsed time, so that ``timeout`` skips
+        as few files as possible.
         """
         if self.split_state is None:
-            return self.remaining_verification_files
-
-        lst = [(p, f) for p, f in self.remaining_verification_files.items()]
-        lst.sort(key=lambda tup: tup[0])
+            files = self.remaining_verification_files
+        else:
+            lst = [(p, f) for p, f in self.remaining_verification_files.items()]
+            lst.sort(key=lambda tup: tup[0])
+            files = {p: f for p, f in self.split_state.split(lst)}
 
-        return {p: f for p, f in self.split_state.split(lst)}
+        if self.history is None:
+            return files
+        expected = self.history.median_file_elapsed(files.keys())
+        return dict(sorted(files.items(), key=lambda t: expected.get(t[0], -1.0)))
 
 
 class BaseVerifier(InputContainer):
@@ -130,6 +158,9 @@ class BaseVerifier(InputContainer):
     default_tle: Optional[float]
     default_mle: Optional[float]
     split_state: Optional[SplitState]
+    regression_thresholds: Optional[RegressionThresholds]
+    toolchain: Optional[str]
+    """The toolchain fingerprint of this run, which selects the runs in ``history``"""
 
     _result: Optional[VerifyCommandResult]
 
@@ -143,17 +174,25 @@ class BaseVerifier(InputContainer):
         prev_result: Optional[VerifyCommandResult],
         split_state: Optional[SplitState],
         verification_time: Optional[datetime.datetime] = None,
+        affected: Optional[set[pathlib.Path]] = None,
+        history: Optional[HistoryDB] = None,
+        regression_thresholds: Optional[RegressionThresholds] = None,
+        toolchain: Optional[str] = None,
     ) -> None:
         super().__init__(
             input=input,
             verification_time=verification_time or self.now().astimezone(),
             prev_result=prev_result,
             split_state=split_state,
+            affected=affected,
+            history=history,
         )
         self._input = input
         self.timeout = timeout
         self.default_tle = default_tle
         self.default_mle = default_mle
+        self.regression_thresholds = regression_thresholds
+        self.toolchain = toolchain
         self._result = None
 
     @property
@@ -173,7 +212,9 @@ class BaseVerifier(InputContainer):
 
     def verify(self, *, download: bool = True) -> VerifyCommandResult:
         start_time = self.now()
-        with log.group("current_verification_files"):
+        with log.group("current_verification_files"), trace.span(
+            "current_verification_files", cat="resolve"
+        ), self_profile.phase("resolve"):
             current_verification_files = self.current_verification_files
         logger.info(
             "current_verification_files: %s",
@@ -201,7 +242,11 @@ class BaseVerifier(InputContainer):
                 prev_time = self.now()
                 verifications = list[VerificationResult]()
                 try:
-                    if download and not run_download(f, check=True, group_log=False):
+                    with trace.span("download", cat="download", file=p.as_posix()):
+                        downloaded = not download or run_download(
+                            f, check=True, group_log=False
+                        )
+                    if not downloaded:
                         raise Exception()
                 except BaseException as e:
                     verifications.append(
@@ -225,7 +270,10 @@ class BaseVerifier(InputContainer):
                         return verifications
 
                     try:
-                        rs, error_message = self.run_verification(ve)
+                        with trace.span(
+                            ve.name or ve.type, cat="verification", file=p.as_posix()
+                        ):
+                            rs, error_message = self.run_verification(ve)
                         if error_message:
                             logger.error("%s: %s, %s", error_message, p, repr(ve))
                             if github.env.is_in_github_actions():
@@ -233,9 +281,9 @@ class BaseVerifier(InputContainer):
                                     message=f"{error_message} {p.as_posix()}",
                                     file=str(p.resolve()),
                                 )
-                        verifications.append(
-                            self.create_command_result(rs, prev_time, name=ve.name)
-                        )
+                        result = self.create_command_result(rs, prev_time, name=ve.name)
+                        self.check_regressions(p, ve, result)
+                        verifications.append(result)
                     except BaseException as e:
                         message = (
                             e.message
@@ -253,7 +301,9 @@ class BaseVerifier(InputContainer):
                         )
                 return verifications
 
-            with log.group(f"Verify: {p.as_posix()}"):
+            with log.group(f"Verify: {p.as_posix()}"), trace.span(
+                p.as_posix(), cat="file"
+            ):
                 file_results[p] = FileResult(verifications=enumerate_verifications())
 
         sippable_file_results = self.skippable_results()
@@ -271,15 +321,67 @@ class BaseVerifier(InputContainer):
         Returns:
             tuple[ResultStatus, Optional[str]]: (Result, error_message)
         """
-        if not verification.run_compile_command():
+        with trace.span("compile", cat="compile"):
+            compiled = verification.run_compile_command()
+        if not compiled:
             return ResultStatus.FAILURE, "Failed to compile"
 
-        rs = verification.run(self)
+        with trace.span("run", cat="run"):
+            rs = verification.run(self)
 
         if rs.status != ResultStatus.SUCCESS:
             return rs, "Failed to test"
         return rs, None
 
+    def testcase_baseline(
+        self, path: pathlib.Path, verification_name: Optional[str]
+    ) -> Baseline:
+        """The test cases in ``history`` recorded with the same toolchain if any, else in ``prev_result``"""
+        if self.history is not None:
+            baseline = self.history.median_testcases(
+                path, verification_name, toolchain=self.toolchain
+            )
+            if baseline:
+                return baseline
+        file_result = self.prev_result.files.get(path) if self.prev_result else None
+        if file_result is not None:
+            for v in file_result.verifications:
+                if v.verification_name == verification_name and v.testcases:
+                    return to_baseline(v.testcases)
+        return {}
+
+    def check_regressions(
+        self,
+        path: pathlib.Path,
+        verification: Verification,
+        result: VerificationResult,
+    ) -> None:
+        """Sets ``result.regressions`` if the performance of test cases regressed"""
+        if self.regression_thresholds is None or not result.testcases:
+            return
+        tle, mle = self.default_tle, self.default_mle
+        if isinstance(verification, ProblemVerification):
+            tle = verification.tle or tle
+            mle = verification.mle or mle
+        regressions = detect_regressions(
+            result.testcases,
+            self.testcase_baseline(path, result.verification_name),
+            thresholds=self.regression_thresholds,
+            tle=tle,
+            mle=mle,
+        )
+        if not regressions:
+            return
+        result.regressions = regressions
+        cases = len(set(r.name for r in regressions))
+        message = f"Performance regressed in {cases} test cases"
+        logger.warning("%s: %s, %s", message, path, repr(verification))
+        if github.env.is_in_github_actions():
+            github.print_warning(
+                message=f"{message} {path.as_posix()}",
+                file=str(path.resolve()),
+            )
+
     def skippable_results(self) -> dict[pathlib.Path, FileResult]:
         """
         Run skippable verification
@@ -292,7 +394,10 @@ class BaseVerifier(InputContainer):
                 prev_time = self.now()
 
                 for v in f.verification_list:
-                    rs = self.run_verification(v)[0]
+                    with trace.span(
+                        v.name or v.type, cat="verification", file=p.as_posix()
+                    ):
+                        rs = self.run_verification(v)[0]
                     verifications.append(
                         self.create_command_result(rs, prev_time, name=v.name)
                     )
@@ -334,6 +439,10 @@ class Verifier(BaseVerifier):
         prev_result: Optional[VerifyCommandResult],
         split_state: Optional[SplitState],
         verification_time: Optional[datetime.datetime] = None,
+        affected: Optional[set[pathlib.Path]] = None,
+        history: Optional[HistoryDB] = None,
+        regression_thresholds: Optional[RegressionThresholds] = None,
+        toolchain: Optional[str] = None,
         use_git_timestamp: bool,
     ) -> None:
         super().__init__(
@@ -341,6 +450,10 @@ class Verifier(BaseVerifier):
             verification_time=verification_time or self.now().astimezone(),
             prev_result=prev_result,
             split_state=split_state,
+            affected=affected,
+            history=history,
+            regression_thresholds=regression_thresholds,
+            toolchain=toolchain,
             timeout=timeout,
             default_tle=default_tle,
             default_mle=default_mle,
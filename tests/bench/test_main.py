@@ -0,0 +1,169 @@
+import argparse
+import contextlib
+import os
+import pathlib
+import sys
+from io import StringIO
+from typing import Iterator, Optional
+
+import pytest
+from pytest_mock import MockerFixture
+
+from competitive_verifier.bench.benchmark import BenchStatistics
+from competitive_verifier.bench.main import argument, run_impl, write_table
+from competitive_verifier.error import VerifierError
+from competitive_verifier.models import JudgeStatus, VerificationInput
+from competitive_verifier.oj import get_directory
+
+URL = "https://judge.yosupo.jp/problem/aplusb"
+
+
+@pytest.fixture
+def problem(
+    mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    monkeypatch.chdir(tmp_path)
+    mocker.patch.dict(
+        os.environ, {"COMPETITIVE_VERIFY_CONFIG_PATH": str(tmp_path / ".cv")}
+    )
+    test_dir = get_directory(URL) / "test"
+    test_dir.mkdir(parents=True)
+    (test_dir / "example_00.in").write_text("1 2\n")
+    (test_dir / "example_00.out").write_text("3\n")
+    (test_dir / "example_01.in").write_text("2 2\n")
+    (test_dir / "example_01.out").write_text("5\n")
+    pathlib.Path("aplusb.py").write_text("print(sum(map(int, input().split())))\n")
+    return VerificationInput.model_validate(
+        {
+            "files": {
+                "aplusb.py": {
+                    "verification": [
+                        {
+                            "type": "problem",
+                            "name": "Python",
+                            "problem": URL,
+                            "command": [sys.executable, "aplusb.py"],
+                            "tle": 10,
+                        }
+                    ]
+                },
+                "lib.py": {},
+            }
+        }
+    )
+
+
+def test_bench(problem: VerificationInput):
+    result = run_impl(
+        problem,
+        [pathlib.Path("aplusb.py").resolve()],
+        repeat=3,
+        warmup=1,
+        download=False,
+    )
+    assert list(result.files) == [pathlib.Path("aplusb.py")]
+    (verification,) = result.files[pathlib.Path("aplusb.py")]
+    assert verification.verification_name == "Python"
+    assert verification.problem == URL
+    assert [(c.name, c.status) for c in verification.cases] == [
+        ("example_00", JudgeStatus.AC),
+        ("example_01", JudgeStatus.WA),
+    ]
+    for c in verification.cases:
+        assert 0 < c.wall.median <= c.wall.p95
+        if sys.platform != "win32":
+            assert c.cpu is not None
+
+    with StringIO() as fp:
+        write_table(fp, result)
+        lines = fp.getvalue().splitlines()
+    assert lines[0] == (
+        "|file|env|name|status|Wall mean|Wall median|Wall p95|CPU median|Peak RSS|"
+    )
+    assert lines[2].startswith("|aplusb.py|Python|example_00|AC|")
+    assert lines[3].startswith("|aplusb.py|Python|example_01|WA|")
+
+
+def test_bench_error(problem: VerificationInput):
+    assert run_impl(problem, [pathlib.Path("lib.py")], download=False).files == {}
+    with pytest.raises(VerifierError):
+        run_impl(problem, [pathlib.Path("unknown.py")], download=False)
+    with pytest.raises(VerifierError):
+        run_impl(problem, [pathlib.Path("aplusb.py")], repeat=0, download=False)
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="sched_setaffinity is required"
+)
+def test_bench_cpu(problem: VerificationInput):
+    original = os.sched_getaffinity(0)
+    cpu = min(original)
+    record = "import os, sys; open(sys.argv[1], 'a').write(str(sorted(os.sched_getaffinity(0))) + chr(10))"
+    (verification,) = problem.files[pathlib.Path("aplusb.py")].verification
+    verification.compile = [sys.executable, "-c", record, "compile.txt"]
+    verification.command = [sys.executable, "-c", record, "execute.txt"]
+    result = run_impl(
+        problem,
+        [pathlib.Path("aplusb.py")],
+        repeat=1,
+        warmup=0,
+        cpu=cpu,
+        download=False,
+    )
+    assert result.cpu == cpu
+    assert os.sched_getaffinity(0) == original
+    # only the measured runs are pinned
+    assert pathlib.Path("compile.txt").read_text() == f"{sorted(original)}\n"
+    assert pathlib.Path("execute.txt").read_text() == f"{[cpu]}\n" * 2
+
+
+def test_bench_cpu_only_executions(
+    problem: VerificationInput, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+):
+    @contextlib.contextmanager
+    def pin_cpu(cpu: Optional[int]) -> Iterator[None]:
+        monkeypatch.setenv("PINNED", str(cpu))
+        yield
+        monkeypatch.delenv("PINNED")
+
+    mocker.patch("competitive_verifier.bench.benchmark.pin_cpu", side_effect=pin_cpu)
+    record = "import os, sys; open(sys.argv[1], 'a').write(os.getenv('PINNED', '-') + chr(10))"
+    (verification,) = problem.files[pathlib.Path("aplusb.py")].verification
+    verification.compile = [sys.executable, "-c", record, "compile.txt"]
+    verification.command = [sys.executable, "-c", record, "execute.txt"]
+    run_impl(
+        problem,
+        [pathlib.Path("aplusb.py")],
+        repeat=2,
+        warmup=1,
+        cpu=3,
+        download=False,
+    )
+    assert pathlib.Path("compile.txt").read_text() == "-\n"
+    assert pathlib.Path("execute.txt").read_text() == "3\n" * 6
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([1.0], BenchStatistics(mean=1, median=1, p95=1)),
+        ([3.0, 1.0, 2.0, 6.0], BenchStatistics(mean=3, median=2.5, p95=6)),
+        (
+            [float(i) for i in range(1, 101)],
+            BenchStatistics(mean=50.5, median=50.5, p95=95),
+        ),
+    ],
+)
+def test_bench_statistics(values: list[float], expected: BenchStatistics):
+    assert BenchStatistics.from_values(values) == expected
+
+
+def test_argument():
+    parsed = argument(argparse.ArgumentParser()).parse_args(
+        ["--verify-json", "v.json", "a.py", "b.py", "-n", "10", "--cpu", "2"]
+    )
+    assert parsed.files == [pathlib.Path("a.py"), pathlib.Path("b.py")]
+    assert parsed.repeat == 10
+    assert parsed.warmup == 1
+    assert parsed.cpu == 2
+    assert parsed.download
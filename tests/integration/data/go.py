@@ -1,3 +1,5 @@
+import hashlib
+import pathlib
 import shutil
 from typing import Any, Optional
 
@@ -24,6 +26,12 @@ class GoWithoutConfigData(IntegrationData):
     def input_name(cls) -> str:
         return "GoData"
 
+    def binary(self, path: str) -> pathlib.Path:
+        key = hashlib.sha256(
+            (self.targets_path / path).resolve().as_posix().encode()
+        ).hexdigest()
+        return self.config_dir_path / "cache/go" / key[:32] / "a.out"
+
     def expected_verify_json(self) -> dict[str, Any]:
         return dict(
             {
@@ -41,9 +49,14 @@ class GoWithoutConfigData(IntegrationData):
                         "verification": [
                             {
                                 "command": {
+                                    "command": [str(self.binary("helloworld.aoj.go"))],
+                                },
+                                "compile": {
                                     "command": [
                                         "go",
-                                        "run",
+                                        "build",
+                                        "-o",
+                                        str(self.binary("helloworld.aoj.go")),
                                         f"{self.targets_path}/helloworld.aoj.go",
                                     ],
                                     "env": {"GO111MODULE": "off"},
@@ -1,8 +1,14 @@
+import hashlib
+import os
+import pathlib
+import shlex
 import shutil
 from typing import Any
 
 import pytest
 
+import competitive_verifier.oj.verify.languages.java_batch as java_batch
+
 from ..types import ConfigDirSetter, FilePaths
 from .integration_data import IntegrationData
 
@@ -19,6 +25,42 @@ class JavaData(IntegrationData):
     def check_envinronment(self) -> bool:
         return bool(shutil.which("javac"))
 
+    @property
+    def classes_dir(self) -> pathlib.Path:
+        return self.config_dir_path / "cache/java/0833659ddf46c846947d8ce93e2af3e4"
+
+    def fallback_dir(self, path: str) -> pathlib.Path:
+        key = hashlib.sha256(path.encode()).hexdigest()[:16]
+        return self.classes_dir.with_name(f"{self.classes_dir.name}-{key}")
+
+    def expected_compile(self, path: str) -> str:
+        return shlex.join(
+            [
+                "python",
+                "-m",
+                java_batch.__name__,
+                "--javac",
+                "javac",
+                "--sourcepath",
+                str(self.targets_path),
+                "--classes-dir",
+                str(self.classes_dir),
+                "--fallback-dir",
+                str(self.fallback_dir(path)),
+                str(self.targets_path / path),
+                "--",
+                str(self.targets_path / "examples/Aplutb_test.java"),
+                str(self.targets_path / "examples/HelloWorld_test.java"),
+            ]
+        )
+
+    def expected_command(self, path: str) -> str:
+        classpath = os.pathsep.join(
+            [str(self.fallback_dir(path)), str(self.classes_dir)]
+        )
+        class_name = path.removesuffix(".java").replace("/", ".")
+        return f"java -cp {classpath} {class_name}"
+
     def expected_verify_json(self) -> dict[str, Any]:
         return dict(
             {
@@ -35,8 +77,12 @@ class JavaData(IntegrationData):
                         },
                         "verification": [
                             {
-                                "command": "java examples.Aplutb_test",
-                                "compile": f"javac {self.targets_path/'examples/Aplutb_test.java'}",
+                                "command": self.expected_command(
+                                    "examples/Aplutb_test.java"
+                                ),
+                                "compile": self.expected_compile(
+                                    "examples/Aplutb_test.java"
+                                ),
                                 "name": "Java",
                                 "problem": "https://judge.yosupo.jp/problem/aplusb",
                                 "type": "problem",
@@ -65,8 +111,12 @@ class JavaData(IntegrationData):
                         },
                         "verification": [
                             {
-                                "command": "java examples.HelloWorld_test",
-                                "compile": f"javac {self.targets_path/'examples/HelloWorld_test.java'}",
+                                "command": self.expected_command(
+                                    "examples/HelloWorld_test.java"
+                                ),
+                                "compile": self.expected_compile(
+                                    "examples/HelloWorld_test.java"
+                                ),
                                 "name": "Java",
                                 "problem": "https://onlinejudge.u-aizu.ac.jp/courses/lesson/2/ITP1/1/ITP1_1_A",
                                 "type": "problem",
@@ -88,13 +88,23 @@ class RustWithoutConfigData(IntegrationData):
                                     / "target/release/aizu-online-judge-itp1-1-a"
                                 ),
                                 "compile": "cd "
-                                f"{self.targets_path/'verification/src/bin'} "
+                                f"{self.targets_path} "
                                 "&& "
+                                "(cargo "
+                                "build "
+                                "--release "
+                                "--workspace "
+                                "--bin "
+                                "aizu-online-judge-itp1-1-a "
+                                "--bin "
+                                "library-checker-aplusb "
+                                "|| "
                                 "cargo "
                                 "build "
                                 "--release "
+                                "--workspace "
                                 "--bin "
-                                "aizu-online-judge-itp1-1-a",
+                                "aizu-online-judge-itp1-1-a)",
                                 "name": "Rust",
                                 "problem": "https://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=ITP1_1_A",
                                 "type": "problem",
@@ -120,13 +130,23 @@ class RustWithoutConfigData(IntegrationData):
                                     / "target/release/library-checker-aplusb"
                                 ),
                                 "compile": "cd "
-                                f"{self.targets_path/'verification/src/bin'} "
+                                f"{self.targets_path} "
                                 "&& "
+                                "(cargo "
+                                "build "
+                                "--release "
+                                "--workspace "
+                                "--bin "
+                                "aizu-online-judge-itp1-1-a "
+                                "--bin "
+                                "library-checker-aplusb "
+                                "|| "
                                 "cargo "
                                 "build "
                                 "--release "
+                                "--workspace "
                                 "--bin "
-                                "library-checker-aplusb",
+                                "library-checker-aplusb)",
                                 "name": "Rust",
                                 "problem": "https://judge.yosupo.jp/problem/aplusb",
                                 "type": "problem",
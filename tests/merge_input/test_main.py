@@ -1,6 +1,15 @@
+import json
+import re
+from functools import reduce
+from pathlib import Path
+from typing import Any
+
 import pytest
+from pytest_mock import MockerFixture
 
 import competitive_verifier.merge_input.main
+import competitive_verifier.util
+from competitive_verifier.error import VerifierError
 from competitive_verifier.models import VerificationInput
 
 test_merge_params: list[tuple[list[VerificationInput], VerificationInput]] = [
@@ -136,3 +145,58 @@ test_merge_params: list[tuple[list[VerificationInput], VerificationInput]] = [
 )
 def test_merge(inputs: list[VerificationInput], expected: VerificationInput):
     assert competitive_verifier.merge_input.main.merge(inputs) == expected
+
+
+@pytest.mark.parametrize("cpu_count, parallel", [(1, True), (3, True), (3, False)])
+def test_merge_json_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+    cpu_count: int,
+    parallel: bool,
+):
+    monkeypatch.chdir(tmp_path)
+    mocker.patch("os.cpu_count", return_value=cpu_count)
+    if parallel:
+        mocker.patch("competitive_verifier.util.PARALLEL_MIN_BYTES", 0)
+    executor = mocker.spy(competitive_verifier.util, "ProcessPoolExecutor")
+
+    shards: list[dict[str, Any]] = [
+        {"foo.py": {}, "bar.py": {"dependencies": ["foo.py"]}},
+        {"bar.py": {"dependencies": [str(tmp_path / "baz.py"), "../outside.py"]}},
+        {"./baz.py": {"document_attributes": {"TITLE": "baz"}}, "../x.py": {}},
+    ]
+    paths: list[Path] = []
+    for i, shard in enumerate(shards):
+        paths.append(tmp_path / f"{i}.json")
+        paths[-1].write_text(json.dumps({"files": shard}))
+
+    merged = competitive_verifier.merge_input.main.merge_json_files(*paths)
+    assert merged == reduce(
+        lambda a, b: a.merge(b), map(VerificationInput.parse_file_relative, paths)
+    )
+    assert merged == VerificationInput.model_validate(
+        {
+            "files": {
+                "foo.py": {},
+                "bar.py": {"dependencies": ["baz.py"]},
+                "baz.py": {"document_attributes": {"TITLE": "baz"}},
+            }
+        }
+    )
+    assert executor.call_count == (1 if parallel and cpu_count > 1 else 0)
+
+
+def test_merge_json_files_error(tmp_path: Path):
+    paths = [tmp_path / "good.json", tmp_path / "bad.json", tmp_path / "broken.json"]
+    paths[0].write_text('{"files": {}}')
+    paths[1].write_text('{"files": {"foo.py": {"dependencies": 1}}}')
+    paths[2].write_text("{")
+    with pytest.raises(
+        VerifierError, match=f"^{re.escape(str(paths[1]))} is not a verify_files.json"
+    ):
+        competitive_verifier.merge_input.main.merge_json_files(*paths[:2])
+    with pytest.raises(
+        VerifierError, match=f"^{re.escape(str(paths[2]))} is not a verify_files.json"
+    ):
+        competitive_verifier.merge_input.main.merge_json_files(*paths)
@@ -1,9 +1,14 @@
+import re
 from datetime import datetime
+from functools import reduce
 from pathlib import Path
 
 import pytest
+from pytest_mock import MockerFixture
 
 import competitive_verifier.merge_result.main
+import competitive_verifier.util
+from competitive_verifier.error import VerifierError
 from competitive_verifier.models import (
     FileResult,
     ResultStatus,
@@ -132,3 +137,79 @@ test_merge_params: list[tuple[list[VerifyCommandResult], VerifyCommandResult]] =
 )
 def test_merge(results: list[VerifyCommandResult], expected: VerifyCommandResult):
     assert competitive_verifier.merge_result.main.merge(results) == expected
+
+
+@pytest.mark.parametrize("cpu_count, parallel", [(1, True), (3, True), (3, False)])
+def test_merge_json_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+    cpu_count: int,
+    parallel: bool,
+):
+    monkeypatch.chdir(tmp_path)
+    mocker.patch("os.cpu_count", return_value=cpu_count)
+    if parallel:
+        mocker.patch("competitive_verifier.util.PARALLEL_MIN_BYTES", 0)
+    executor = mocker.spy(competitive_verifier.util, "ProcessPoolExecutor")
+
+    def file_result(day: int, newest: bool) -> FileResult:
+        return FileResult(
+            newest=newest,
+            verifications=[
+                VerificationResult(
+                    elapsed=day,
+                    status=ResultStatus.SUCCESS,
+                    last_execution_time=datetime(2020, 2, day),
+                )
+            ],
+        )
+
+    shards = [
+        {"foo": (1, True), "bar": (1, True), "baz": (1, False)},
+        {"foo": (2, False), "bar": (2, True)},
+        {"foo": (3, False), "baz": (3, False), str(tmp_path / "qux"): (3, True)},
+        {"bar": (4, False), "../outside": (4, True)},
+        {"baz": (5, False), "./qux": (5, True)},
+    ]
+    paths: list[Path] = []
+    for i, shard in enumerate(shards):
+        paths.append(tmp_path / f"{i}.json")
+        paths[-1].write_text(
+            VerifyCommandResult(
+                total_seconds=i + 1,
+                files={Path(k): file_result(*v) for k, v in shard.items()},
+            ).model_dump_json()
+        )
+
+    merged = competitive_verifier.merge_result.main.merge_json_files(*paths)
+    assert merged == reduce(
+        lambda a, b: a.merge(b), map(VerifyCommandResult.parse_file_relative, paths)
+    )
+    assert merged == VerifyCommandResult(
+        total_seconds=15,
+        files={
+            Path("foo"): file_result(1, True),
+            Path("bar"): file_result(2, True),
+            Path("baz"): file_result(5, False),
+            Path("qux"): file_result(5, True),
+        },
+    )
+    assert executor.call_count == (1 if parallel and cpu_count > 1 else 0)
+
+
+def test_merge_json_files_error(tmp_path: Path):
+    paths = [tmp_path / "good.json", tmp_path / "bad.json", tmp_path / "broken.json"]
+    paths[0].write_text('{"total_seconds": 1, "files": {}}')
+    paths[1].write_text(
+        '{"total_seconds": 1, "files": {"foo": {"verifications": [{"status": "unknown"}]}}}'
+    )
+    paths[2].write_text("{")
+    with pytest.raises(
+        VerifierError, match=f"^{re.escape(str(paths[1]))} is not a result json"
+    ):
+        competitive_verifier.merge_result.main.merge_json_files(*paths[:2])
+    with pytest.raises(
+        VerifierError, match=f"^{re.escape(str(paths[2]))} is not a result json"
+    ):
+        competitive_verifier.merge_result.main.merge_json_files(*paths)
@@ -3,9 +3,11 @@ from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import pytest
+from pydantic import BaseModel, ValidationError
 
 from competitive_verifier.models import (
     FileResult,
+    JudgeStatus,
     ResultStatus,
     VerificationResult,
     VerifyCommandResult,
@@ -318,6 +320,58 @@ def test_verify_command_result_json():
     )
 
 
+def test_testcase_results():
+    # imported here not to be collected as test classes
+    from competitive_verifier.models import TestcaseResult, TestcaseResults
+
+    cases = [
+        TestcaseResult(name="a", status=JudgeStatus.AC, elapsed=0.5, memory=3.25),
+        TestcaseResult(name="b", status=JudgeStatus.WA, elapsed=1, memory=None),
+        TestcaseResult(name="c", status=JudgeStatus.TLE, elapsed=2.5),
+    ]
+    obj = VerificationResult(
+        elapsed=4,
+        status=ResultStatus.FAILURE,
+        testcases=cases,  # pyright: ignore[reportGeneralTypeIssues]
+        last_execution_time=datetime(2016, 12, 24, 15, 16, 34),
+    )
+    testcases = obj.testcases
+    assert isinstance(testcases, TestcaseResults)
+    assert len(testcases) == 3
+    assert list(testcases) == cases
+    assert testcases[1] == cases[1]
+    assert testcases[-1] == cases[-1]
+    assert testcases[1:] == cases[1:]
+    assert testcases == TestcaseResults.from_items(cases)
+    assert testcases != TestcaseResults.from_items(cases[:2])
+
+    # The same JSON as list[TestcaseResult]
+    class ListVerificationResult(BaseModel):
+        testcases: list[TestcaseResult]
+
+    expected = ListVerificationResult(testcases=cases)
+    assert obj.model_dump(include={"testcases"}) == expected.model_dump()
+    for exclude_none in [False, True]:
+        assert obj.model_dump_json(
+            include={"testcases"}, exclude_none=exclude_none
+        ) == expected.model_dump_json(exclude_none=exclude_none)
+
+    assert (
+        VerificationResult.model_validate_json(obj.model_dump_json(exclude_none=True))
+        == obj
+    )
+    assert VerificationResult.model_validate(obj.model_dump()) == obj
+
+    with pytest.raises(ValidationError):
+        VerificationResult.model_validate(
+            {
+                "elapsed": 1,
+                "status": "success",
+                "testcases": [{"name": "a", "status": "XX", "elapsed": 1}],
+            }
+        )
+
+
 test_merge_params = [
     (
         VerifyCommandResult(
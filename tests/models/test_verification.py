@@ -131,6 +131,7 @@ test_run_params: list[
             "env": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -144,6 +145,7 @@ test_run_params: list[
             "env": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -157,6 +159,7 @@ test_run_params: list[
             "env": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -170,6 +173,7 @@ test_run_params: list[
             "env": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -185,6 +189,7 @@ test_run_params: list[
             "env": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -200,6 +205,7 @@ test_run_params: list[
             "env": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
 ]
@@ -244,6 +250,7 @@ test_run_with_env_params: list[
             "cwd": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
         {"TOKEN": "DUMMY"},
     ),
@@ -259,6 +266,7 @@ test_run_with_env_params: list[
             "cwd": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
         {"TOKEN": "DUMMY"},
     ),
@@ -433,6 +441,7 @@ test_run_compile_params: list[
             "cwd": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -453,6 +462,7 @@ test_run_compile_params: list[
             "cwd": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -472,6 +482,7 @@ test_run_compile_params: list[
             "cwd": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -491,6 +502,7 @@ test_run_compile_params: list[
             "cwd": None,
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
     (
@@ -513,6 +525,7 @@ test_run_compile_params: list[
             "cwd": pathlib.Path("~/foo"),
             "capture_output": False,
             "encoding": sys.stdout.encoding,
+            "input": None,
         },
     ),
 ]
@@ -156,6 +156,53 @@ def test_transitive_depends_on():
     assert test_input.transitive_depends_on == expected
 
 
+def test_scc():
+    groups = test_input.scc()
+    assert {frozenset(g) for g in groups} == {
+        frozenset(Path(p) for p in g)
+        for g in [
+            ["foo/bar1.py"],
+            ["foo/bar2.py"],
+            ["foo/baz.py"],
+            ["foo/barbaz.py"],
+            ["hoge/1.py"],
+            ["hoge/hoge.py", "hoge/piyo.py", "hoge/fuga.py"],
+            ["hoge/piyopiyo.py"],
+            ["test/test.py"],
+        ]
+    }
+    position = {p: i for i, g in enumerate(groups) for p in g}
+    for p, deps in test_input.depends_on.items():
+        for dep in deps:
+            assert position[p] <= position[dep]
+    assert test_input.scc(reversed=True) == groups[::-1]
+
+
+def test_transitive_depends_on_deep():
+    # 20 cycles of 1000 files: 0 -> 1 -> ... -> 999 -> 0 -> 1000 -> ...
+    n = 20000
+    dependencies: dict[str, list[str]] = {}
+    for i in range(n):
+        base = i - i % 1000
+        dependencies[f"{i}.py"] = [f"{base + (i + 1) % 1000}.py"]
+        if i == base and i + 1000 < n:
+            dependencies[f"{i}.py"].append(f"{i + 1000}.py")
+    deep = VerificationInput.model_validate(
+        {"files": {p: {"dependencies": d} for p, d in dependencies.items()}}
+    )
+
+    assert deep.transitive_depends_on[Path("0.py")] == {
+        Path(f"{i}.py") for i in range(n)
+    }
+    assert deep.transitive_depends_on[Path("19999.py")] == {
+        Path(f"{i}.py") for i in range(19000, n)
+    }
+    assert deep.transitive_depends_on[Path("19500.py")] is (
+        deep.transitive_depends_on[Path("19000.py")]
+    )
+    assert len(deep.scc()) == 20
+
+
 def test_depends_on():
     simple = {
         "foo/bar1.py": [],
@@ -213,3 +260,23 @@ def test_verified_with():
     assert test_input.verified_with == expected
     assert test_input.verified_with is test_input.verified_with
     assert test_input.verified_with == expected
+
+
+def test_affected_files():
+    def affected(*changed: str) -> set[str]:
+        return set(p.as_posix() for p in test_input.affected_files(map(Path, changed)))
+
+    assert affected() == set()
+    assert affected("README.md") == set()
+    assert affected("test/test.py") == {"test/test.py"}
+    assert affected("foo/bar1.py") == {"foo/bar1.py", "foo/bar2.py", "foo/barbaz.py"}
+    assert affected("hoge/1.py", "foo/baz.py") == {
+        "foo/baz.py",
+        "foo/barbaz.py",
+        "hoge/1.py",
+        "hoge/hoge.py",
+        "hoge/piyo.py",
+        "hoge/fuga.py",
+        "hoge/piyopiyo.py",
+        "test/test.py",
+    }
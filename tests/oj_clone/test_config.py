@@ -1,29 +1,39 @@
 # pyright: reportGeneralTypeIssues=false
 import io
 import textwrap
-from typing import Any
+from typing import Any, Optional
 
 import pytest
 from pydantic import ValidationError
 from pydantic_core import ErrorDetails
 
+from competitive_verifier.models import ShellCommandLike
+from competitive_verifier.oj.verify.languages.haskell import OjVerifyHaskellConfig
 from competitive_verifier.oj.verify.list import OjVerifyConfig
+from competitive_verifier.oj.verify.models import OjVerifyUserDefinedConfig
 
 default_languages: dict[str, Any] = {
     "cpp": {},
-    "go": {
-        "execute": {
-            "command": ["go", "run", "{basedir}/{path}"],
-            "env": {"GO111MODULE": "off"},
-        },
-    },
+    "go": {},
     "haskell": {
+        "compile": {
+            "command": [
+                "ghc",
+                "-O2",
+                "-outputdir",
+                "{tempdir}/ghc/{path}",
+                "-o",
+                "{tempdir}/ghc/{path}/a.out",
+                "{basedir}/{path}",
+            ],
+        },
         "execute": {
-            "command": ["runghc", "{basedir}/{path}"],
+            "command": ["{tempdir}/ghc/{path}/a.out"],
         },
     },
     "java": {},
     "nim": {"environments": []},
+    "python": {"fork_server": False},
     "ruby": {
         "execute": {
             "command": ["ruby", "{basedir}/{path}"],
@@ -72,6 +82,15 @@ test_oj_resolve_config_load_params: dict[str, tuple[str, dict[str, Any]]] = {
             [[languages.nim.environments]]
             compile_to = "cpp"
             NIMFLAGS = ["-d:release", "--opt:speed"]
+            [languages.python]
+            fork_server = true
+            [[languages.python.environments]]
+            python = "python3"
+            [[languages.python.environments]]
+            python = "pypy3"
+            flags = ["-X", "int_max_str_digits=0"]
+            precompile = true
+            name = "PyPy"
             [languages.ruby]
             execute = "ruby {basedir}/{path}"
             [languages.rust]
@@ -105,6 +124,18 @@ test_oj_resolve_config_load_params: dict[str, tuple[str, dict[str, Any]]] = {
                         {"compile_to": "cpp", "NIMFLAGS": ["-d:release", "--opt:speed"]}
                     ],
                 },
+                "python": {
+                    "environments": [
+                        {"python": "python3", "precompile": False},
+                        {
+                            "python": "pypy3",
+                            "flags": ["-X", "int_max_str_digits=0"],
+                            "precompile": True,
+                            "name": "PyPy",
+                        },
+                    ],
+                    "fork_server": True,
+                },
                 "ruby": {
                     "execute": "ruby {basedir}/{path}",
                 },
@@ -286,3 +317,18 @@ def test_oj_resolve_config_load_error(toml: str, expected_error: list[ErrorDetai
                 del ex["ctx"]["error"]
                 del expected_ctx["error"]
         assert errors == expected_error
+
+
+def test_custom_execute_compile():
+    class CompiledConfig(OjVerifyUserDefinedConfig):
+        compile: Optional[ShellCommandLike] = "make {path}"
+
+    # a user-defined language keeps its default compile step
+    assert CompiledConfig(execute="./a.out").compile == "make {path}"
+    assert OjVerifyHaskellConfig().compile is not None
+    # only Haskell drops the default ghc compilation for a custom execute
+    assert OjVerifyHaskellConfig(execute="runghc {path}").compile is None
+    assert (
+        OjVerifyHaskellConfig(execute="./a.out", compile="ghc {path}").compile
+        == "ghc {path}"
+    )
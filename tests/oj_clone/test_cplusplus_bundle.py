@@ -0,0 +1,85 @@
+import pathlib
+import shutil
+import textwrap
+
+import pytest
+
+import competitive_verifier.oj.verify.languages.cplusplus_bundle as cplusplus_bundle
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ not found")
+
+
+@pytest.fixture
+def library(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    monkeypatch.chdir(tmp_path)
+    cplusplus_bundle.clear_fragment_cache()
+    files = {
+        "a.hpp": """
+            #pragma once
+            #include <vector>
+            int a();
+        """,
+        "b.hpp": """
+            #ifndef B_HPP
+            #define B_HPP
+            #include "a.hpp"
+            int b();
+            #endif
+        """,
+        "c.hpp": """
+            #pragma once
+            #include "a.hpp"
+            #include "b.hpp"
+            int c();
+        """,
+        "cycle1.hpp": """
+            #include "cycle2.hpp"
+        """,
+        "cycle2.hpp": """
+            #include "cycle1.hpp"
+        """,
+        "main_c.cpp": """
+            #include "c.hpp"
+            int main() {}
+        """,
+        "main_ab.cpp": """
+            #include "a.hpp"
+            #include <vector>
+            #include "c.hpp"
+            int main() {}
+        """,
+        "main_cycle.cpp": """
+            #include "cycle1.hpp"
+        """,
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_text(textwrap.dedent(content).lstrip())
+    return tmp_path
+
+
+def bundle(library: pathlib.Path, name: str) -> bytes:
+    bundler = cplusplus_bundle.Bundler(iquotes=[library])
+    bundler.update(pathlib.Path(name))
+    return bundler.get()
+
+
+def test_bundle_memoized(library: pathlib.Path):
+    expected: dict[str, bytes] = {}
+    for name in ["main_c.cpp", "main_ab.cpp"]:
+        cplusplus_bundle.clear_fragment_cache()
+        expected[name] = bundle(library, name)
+
+    for name in ["main_c.cpp", "main_ab.cpp", "main_c.cpp", "main_ab.cpp"]:
+        assert bundle(library, name) == expected[name]
+
+    assert expected["main_ab.cpp"].count(b"int a();") == 1
+    assert expected["main_ab.cpp"].count(b"#include <vector>") == 1
+    assert expected["main_c.cpp"].count(b"int b();") == 1
+
+
+def test_bundle_cycle(library: pathlib.Path):
+    for _ in range(2):
+        with pytest.raises(
+            cplusplus_bundle.BundleError, match="cycle found in inclusion relations"
+        ):
+            bundle(library, "main_cycle.cpp")
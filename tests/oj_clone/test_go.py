@@ -0,0 +1,59 @@
+import pathlib
+
+import pytest
+
+from competitive_verifier.models import ShellCommand
+from competitive_verifier.oj.verify.languages.go import (
+    GoLanguage,
+    GoLanguageEnvironment,
+    OjVerifyGoConfig,
+)
+from competitive_verifier.oj.verify.languages.user_defined import (
+    UserDefinedLanguageEnvironment,
+)
+
+
+def test_build_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COMPETITIVE_VERIFY_CONFIG_PATH", str(tmp_path / ".config"))
+    tempdir = tmp_path / "problem"
+
+    def commands(path: str) -> tuple[ShellCommand, ShellCommand]:
+        (env,) = GoLanguage(config=None).list_environments(
+            pathlib.Path(path), basedir=tmp_path
+        )
+        assert isinstance(env, GoLanguageEnvironment)
+        return (
+            env.get_compile_command(
+                pathlib.Path(path), basedir=tmp_path, tempdir=tempdir
+            ),
+            env.get_execute_command(
+                pathlib.Path(path), basedir=tmp_path, tempdir=tempdir
+            ),
+        )
+
+    compile, execute = commands("test/a.go")
+    assert isinstance(execute.command, list)
+    binary = pathlib.Path(execute.command[0])
+    assert binary.name == "a.out"
+    assert binary.parent.parent == tmp_path / ".config/cache/go"
+    assert compile == ShellCommand(
+        command=["go", "build", "-o", str(binary), str(tmp_path / "test/a.go")],
+        env={"GO111MODULE": "off"},
+    )
+
+    # stable across runs, and isolated per file
+    assert commands("test/a.go") == (compile, execute)
+    assert commands("a.go")[1] != execute
+
+
+def test_custom_execute(tmp_path: pathlib.Path):
+    config = OjVerifyGoConfig(execute="go run {basedir}/{path}")
+    path = pathlib.Path("a.go")
+    (env,) = GoLanguage(config=config).list_environments(path, basedir=tmp_path)
+    assert isinstance(env, UserDefinedLanguageEnvironment)
+    assert env.get_compile_command(path, basedir=tmp_path, tempdir=tmp_path) is None
+    assert (
+        env.get_execute_command(path, basedir=tmp_path, tempdir=tmp_path)
+        == f"go run {tmp_path}/a.go"
+    )
@@ -0,0 +1,210 @@
+import os
+import pathlib
+import shlex
+import subprocess
+import sys
+from hashlib import sha256
+
+import pytest
+
+import competitive_verifier.oj.verify.languages.java_batch as java_batch
+import competitive_verifier.oj.verify.utils as utils
+from competitive_verifier.oj.verify.languages.java import JavaLanguage
+
+PROBLEM = "// competitive-verifier: PROBLEM https://judge.yosupo.jp/problem/aplusb\n"
+
+
+@pytest.fixture
+def repository(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COMPETITIVE_VERIFY_CONFIG_PATH", str(tmp_path / ".config"))
+    files = {
+        "lib/UnionFind.java": "package lib;\n",
+        "tests/A_test.java": PROBLEM + "package tests;\n",
+        "tests/B_test.java": PROBLEM + "package tests;\n",
+        "tests/Ignored_test.java": PROBLEM
+        + "// competitive-verifier: IGNORE\npackage tests;\n",
+    }
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", *files], check=True)
+    utils.clear_file_index()
+    yield tmp_path
+    utils.clear_file_index()
+
+
+def test_batched_compile(repository: pathlib.Path):
+    java = JavaLanguage(config=None)
+    paths = [
+        pathlib.Path(p)
+        for p in [
+            "lib/UnionFind.java",
+            "tests/A_test.java",
+            "tests/B_test.java",
+            "tests/Ignored_test.java",
+        ]
+    ]
+    java.prepare(paths, basedir=repository)
+
+    def commands(path: str) -> tuple[str, str]:
+        (env,) = java.list_environments(pathlib.Path(path), basedir=repository)
+        tempdir = repository / "tmp"
+        compile = env.get_compile_command(
+            pathlib.Path(path), basedir=repository, tempdir=tempdir
+        )
+        execute = env.get_execute_command(
+            pathlib.Path(path), basedir=repository, tempdir=tempdir
+        )
+        assert isinstance(compile, str)
+        assert isinstance(execute, str)
+        return compile, execute
+
+    classpath = commands("tests/A_test.java")[1].split()[2].split(os.pathsep)
+    classes_dir = pathlib.Path(classpath[1])
+    assert classes_dir.parent == repository / ".config/cache/java"
+    batch = [repository / "tests/A_test.java", repository / "tests/B_test.java"]
+    fallback_dirs: set[pathlib.Path] = set()
+    for name in ["A_test", "B_test"]:
+        path = repository / "tests" / f"{name}.java"
+        compile, execute = commands(f"tests/{name}.java")
+        fallback_dir = classes_dir.with_name(
+            classes_dir.name
+            + "-"
+            + sha256(f"tests/{name}.java".encode()).hexdigest()[:16]
+        )
+        fallback_dirs.add(fallback_dir)
+        assert compile == shlex.join(
+            [
+                "python",
+                "-m",
+                java_batch.__name__,
+                "--javac",
+                "javac",
+                "--sourcepath",
+                str(repository),
+                "--classes-dir",
+                str(classes_dir),
+                "--fallback-dir",
+                str(fallback_dir),
+                str(path),
+                "--",
+                *map(str, batch),
+            ]
+        )
+        assert execute == (
+            f"java -cp {fallback_dir}{os.pathsep}{classes_dir} tests.{name}"
+        )
+    assert len(fallback_dirs) == 2
+    assert commands("tests/Ignored_test.java") == (
+        f"javac -d {repository/'tmp/java'} -sourcepath {repository}"
+        f" {repository/'tests/Ignored_test.java'}",
+        f"java -cp {repository/'tmp/java'} tests.Ignored_test",
+    )
+
+    # The classes directory changes when a source file is changed.
+    (repository / "lib/UnionFind.java").write_text("package lib;\nclass A {}\n")
+    java.prepare(paths, basedir=repository)
+    assert str(classes_dir) not in commands("tests/A_test.java")[1]
+
+
+FAKE_JAVAC = """
+import os, sys
+args = sys.argv[1:]
+dest = args[args.index("-d") + 1]
+sources = [a for a in args[args.index("-sourcepath") + 2:]]
+with open(os.path.join(os.path.dirname(dest), "calls"), "a") as fh:
+    fh.write(" ".join(os.path.basename(s) for s in sources) + "\\n")
+for source in sources:
+    with open(source) as fh:
+        if "broken" in fh.read():
+            sys.exit(1)
+    name = os.path.splitext(os.path.basename(source))[0]
+    open(os.path.join(dest, name + ".class"), "w").close()
+"""
+
+
+@pytest.fixture
+def fake_javac(tmp_path: pathlib.Path) -> pathlib.Path:
+    javac = tmp_path / "javac"
+    javac.write_text(f"#!{sys.executable}\n{FAKE_JAVAC}")
+    javac.chmod(0o755)
+    return javac
+
+
+def run_batch(
+    fake_javac: pathlib.Path, tmp_path: pathlib.Path, file: str, batch: list[str]
+) -> int:
+    classes_dir = tmp_path / "cache/classes"
+    return java_batch.compile_batch(
+        javac=str(fake_javac),
+        sourcepath=str(tmp_path),
+        classes_dir=str(classes_dir),
+        fallback_dir=str(classes_dir) + "-" + file,
+        file=str(tmp_path / file),
+        batch=[str(tmp_path / p) for p in batch],
+    )
+
+
+@pytest.mark.skipif(os.name != "posix", reason="the fake javac requires POSIX")
+def test_java_batch(tmp_path: pathlib.Path, fake_javac: pathlib.Path):
+    for name in ["A.java", "B.java"]:
+        (tmp_path / name).write_text("")
+    batch = ["A.java", "B.java"]
+    assert run_batch(fake_javac, tmp_path, "A.java", batch) == 0
+    assert run_batch(fake_javac, tmp_path, "B.java", batch) == 0
+    cache = tmp_path / "cache"
+    assert (cache / "calls").read_text() == "A.java B.java\n"
+    assert sorted(p.name for p in (cache / "classes").iterdir()) == [
+        "A.class",
+        "B.class",
+    ]
+    assert sorted(p.name for p in cache.iterdir()) == [
+        "calls",
+        "classes",
+        "classes.lock",
+    ]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="the fake javac requires POSIX")
+def test_java_batch_fallback(tmp_path: pathlib.Path, fake_javac: pathlib.Path):
+    (tmp_path / "A.java").write_text("")
+    (tmp_path / "B.java").write_text("broken")
+    batch = ["A.java", "B.java"]
+    assert run_batch(fake_javac, tmp_path, "A.java", batch) == 0
+    assert run_batch(fake_javac, tmp_path, "B.java", batch) == 1
+    assert run_batch(fake_javac, tmp_path, "A.java", batch) == 0
+    cache = tmp_path / "cache"
+    # the batch is tried once and the fallback of A.java is reused
+    assert (cache / "calls").read_text() == "A.java B.java\nA.java\nB.java\n"
+    assert not (cache / "classes").exists()
+    assert [p.name for p in (cache / "classes-A.java").iterdir()] == ["A.class"]
+    assert not (cache / "classes-B.java").exists()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="the fake javac requires POSIX")
+def test_java_batch_module(tmp_path: pathlib.Path, fake_javac: pathlib.Path):
+    (tmp_path / "A.java").write_text("")
+    classes_dir = tmp_path / "cache/classes"
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            java_batch.__name__,
+            "--javac",
+            str(fake_javac),
+            "--sourcepath",
+            str(tmp_path),
+            "--classes-dir",
+            str(classes_dir),
+            "--fallback-dir",
+            str(tmp_path / "cache/fallback"),
+            str(tmp_path / "A.java"),
+            "--",
+            str(tmp_path / "A.java"),
+        ],
+        check=True,
+    )
+    assert [p.name for p in classes_dir.iterdir()] == ["A.class"]
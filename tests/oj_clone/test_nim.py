@@ -0,0 +1,36 @@
+import pathlib
+
+import pytest
+
+from competitive_verifier.oj.verify.languages.nim import NimLanguageEnvironment
+
+
+def test_build_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COMPETITIVE_VERIFY_CONFIG_PATH", str(tmp_path / ".config"))
+    tempdir = tmp_path / "problem"
+
+    def commands(path: str, **kwargs: list[str]) -> tuple[str, str]:
+        env = NimLanguageEnvironment(
+            compile_to="cpp", NIMFLAGS=kwargs.get("flags", ["-d:release"])
+        )
+        return (
+            env.get_compile_command(
+                pathlib.Path(path), basedir=tmp_path, tempdir=tempdir
+            ),
+            env.get_execute_command(
+                pathlib.Path(path), basedir=tmp_path, tempdir=tempdir
+            ),
+        )
+
+    compile, execute = commands("a.nim")
+    build_dir = pathlib.Path(execute).parent
+    assert build_dir.parent == tmp_path / ".config/cache/nim"
+    assert compile == (
+        f"nim cpp -p:. -o:{build_dir/'a.out'} --nimcache:{build_dir} -d:release a.nim"
+    )
+
+    # stable across runs, and isolated per file and flags
+    assert commands("a.nim") == (compile, execute)
+    assert commands("b.nim")[1] != execute
+    assert commands("a.nim", flags=["-d:danger"])[1] != execute
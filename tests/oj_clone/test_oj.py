@@ -1,3 +1,4 @@
+import os
 import pathlib
 from typing import Any
 
@@ -5,7 +6,11 @@ import pytest
 from pytest_mock import MockerFixture
 
 import competitive_verifier.oj as oj
-from competitive_verifier.oj.tools.test_command import OjTestArguments
+from competitive_verifier.oj.tools.test_command import (
+    MAXRSS_FILE_ENV,
+    OjTestArguments,
+    oj_exec_command,
+)
 
 test_oj_test_params: dict[str, tuple[dict[str, Any], OjTestArguments]] = {
     "default": (
@@ -75,3 +80,35 @@ def test_oj_test(
     oj.test(**input)
 
     run.assert_called_once_with(expected)
+
+
+FAKE_GNU_TIME = """#!/bin/sh
+# fake_time -f %M -o FILE -- COMMAND...
+out=$4
+shift 5
+"$@"
+code=$?
+echo 1000 > "$out"
+exit $code
+"""
+
+
+@pytest.mark.skipif(os.name != "posix", reason="the fake GNU time requires POSIX")
+def test_oj_exec_command_maxrss_file(tmp_path: pathlib.Path):
+    gnu_time = tmp_path / "time"
+    gnu_time.write_text(FAKE_GNU_TIME)
+    gnu_time.chmod(0o755)
+
+    info, proc = oj_exec_command(
+        "echo hello", env=None, input=b"", gnu_time=str(gnu_time)
+    )
+    assert (proc.returncode, info.answer, info.memory) == (0, b"hello\n", 1.0)
+
+    # a wrapper such as the client of the Python fork server reports the memory
+    info, proc = oj_exec_command(
+        f'sh -c "echo 50000 > ${MAXRSS_FILE_ENV}"',
+        env=None,
+        input=b"",
+        gnu_time=str(gnu_time),
+    )
+    assert (proc.returncode, info.memory) == (0, 50.0)
@@ -0,0 +1,310 @@
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import textwrap
+from typing import Iterator
+
+import pytest
+
+import competitive_verifier.oj.verify.languages.python as python
+
+
+@pytest.fixture
+def library(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[pathlib.Path]:
+    monkeypatch.chdir(tmp_path)
+    files = {
+        "lib/__init__.py": "",
+        "lib/a.py": """
+            import os
+            from . import b
+        """,
+        "lib/b.py": """
+            from .c import value
+        """,
+        "lib/c.py": """
+            import lib.a
+            value = 1
+        """,
+        "lib/pkg/__init__.py": """
+            from ..b import *
+        """,
+        "lib/pkg/d.py": "",
+        "main_a.py": """
+            from lib import a
+        """,
+        "main_pkg.py": """
+            import sys
+            def f():
+                from lib.pkg import d, symbol
+        """,
+        "main_syntax_error.py": """
+            import lib.c
+            def
+        """,
+        "untracked.py": "",
+        "main_untracked.py": """
+            import untracked
+        """,
+    }
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(content).lstrip())
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(
+        ["git", "add", *(name for name in files if name != "untracked.py")],
+        check=True,
+    )
+    python._get_import_graph.cache_clear()  # pyright: ignore[reportPrivateUsage]
+    yield tmp_path
+    python._get_import_graph.cache_clear()  # pyright: ignore[reportPrivateUsage]
+
+
+test_list_dependencies_params: list[tuple[str, list[str]]] = [
+    ("main_a.py", ["main_a.py", "lib/a.py"]),
+    ("lib/a.py", ["lib/a.py", "lib/b.py"]),
+    ("lib/c.py", ["lib/c.py", "lib/a.py"]),
+    ("main_pkg.py", ["main_pkg.py", "lib/pkg/__init__.py", "lib/pkg/d.py"]),
+    ("lib/pkg/__init__.py", ["lib/pkg/__init__.py", "lib/b.py"]),
+    ("main_syntax_error.py", ["main_syntax_error.py"]),
+    ("main_untracked.py", ["main_untracked.py", "untracked.py"]),
+]
+
+
+@pytest.mark.parametrize("path, expected", test_list_dependencies_params)
+def test_list_dependencies(library: pathlib.Path, path: str, expected: list[str]):
+    deps = python.PythonLanguage().list_dependencies(
+        pathlib.Path(path), basedir=library
+    )
+    assert sorted(deps) == sorted((library / p).resolve() for p in expected)
+
+
+test_depending_files_params: list[tuple[str, list[str]]] = [
+    ("main_a.py", ["main_a.py", "lib/a.py", "lib/b.py", "lib/c.py"]),
+    (
+        "main_pkg.py",
+        [
+            "main_pkg.py",
+            "lib/pkg/__init__.py",
+            "lib/pkg/d.py",
+            "lib/b.py",
+            "lib/c.py",
+            "lib/a.py",
+        ],
+    ),
+    ("main_untracked.py", ["main_untracked.py", "untracked.py"]),
+]
+
+
+@pytest.mark.parametrize("path, expected", test_depending_files_params)
+def test_depending_files(library: pathlib.Path, path: str, expected: list[str]):
+    deps = python._python_list_depending_files(  # pyright: ignore[reportPrivateUsage]
+        (library / path).resolve(), library
+    )
+    assert sorted(deps) == sorted((library / p).resolve() for p in expected)
+
+
+def test_list_dependencies_outside_git(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg/__init__.py").write_text("")
+    (tmp_path / "pkg/mod.py").write_text("")
+    (tmp_path / "main.py").write_text("from pkg import mod\nimport missing\n")
+    monkeypatch.setenv("GIT_DIR", str(tmp_path / "not-a-repository"))
+    python._get_import_graph.cache_clear()  # pyright: ignore[reportPrivateUsage]
+    try:
+        deps = python.PythonLanguage().list_dependencies(
+            pathlib.Path("main.py"), basedir=tmp_path
+        )
+    finally:
+        python._get_import_graph.cache_clear()  # pyright: ignore[reportPrivateUsage]
+    assert sorted(deps) == sorted(
+        (tmp_path / p).resolve() for p in ["main.py", "pkg/mod.py"]
+    )
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fork server requires POSIX")
+def test_fork_server(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "lib.py").write_text(
+        textwrap.dedent(
+            """
+            import os
+            with open(os.path.join(os.path.dirname(__file__), "imported"), "a") as fh:
+                fh.write("lib\\n")
+            counter = [0]
+            """
+        )
+    )
+    (tmp_path / "main.py").write_text(
+        textwrap.dedent(
+            """
+            import sys
+            import lib
+            lib.counter[0] += 1
+            n = int(input())
+            print(sys.argv[0], n * 2, lib.counter[0])
+            if n < 0:
+                sys.exit(3)
+            if n == 0:
+                raise ValueError("zero")
+            if n >= 64:
+                data = b"x" * (n << 20)
+            """
+        )
+    )
+    env = python.PythonLanguageEnvironment(fork_server=True)
+    path = pathlib.Path("main.py")
+    compile = env.get_compile_command(path, basedir=tmp_path, tempdir=tmp_path)
+    execute = env.get_execute_command(path, basedir=tmp_path, tempdir=tmp_path)
+    assert compile is not None
+
+    def run(input: str):
+        return subprocess.run(
+            execute, shell=True, input=input.encode(), capture_output=True
+        )
+
+    # falls back to the normal interpreter without the server
+    proc = run("1\n")
+    assert (proc.returncode, proc.stdout) == (0, b"main.py 2 1\n")
+    (tmp_path / "imported").unlink()
+
+    subprocess.run(compile, shell=True, check=True)
+    assert (tmp_path / "imported").read_text() == "lib\n"
+    for n in [1, 21]:
+        proc = run(f"{n}\n")
+        assert (proc.returncode, proc.stdout) == (0, f"main.py {n * 2} 1\n".encode())
+    proc = run("-1\n")
+    assert (proc.returncode, proc.stdout) == (3, b"main.py -2 1\n")
+    proc = run("0\n")
+    assert proc.returncode == 1
+    assert b"ValueError: zero" in proc.stderr
+
+    # the client reports the peak RSS of the forked child
+    maxrss = tmp_path / "maxrss"
+    proc = subprocess.run(
+        execute,
+        shell=True,
+        input=b"64\n",
+        capture_output=True,
+        env=os.environ | {"COMPETITIVE_VERIFIER_MAXRSS_FILE": str(maxrss)},
+    )
+    assert (proc.returncode, proc.stdout) == (0, b"main.py 128 1\n")
+    assert int(maxrss.read_text()) >= 64 * 1024
+    # the library is imported only once by the server
+    assert (tmp_path / "imported").read_text() == "lib\n"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fork server requires POSIX")
+def test_fork_server_library_output(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("PYTHONUNBUFFERED", raising=False)
+    (tmp_path / "fastio.py").write_text(
+        textwrap.dedent(
+            """
+            import sys
+            write = sys.stdout.write
+            readline = sys.stdin.readline
+            def answer(s):
+                write(f"got {s}\\n")
+            """
+        )
+    )
+    (tmp_path / "main.py").write_text(
+        textwrap.dedent(
+            """
+            import fastio
+            print("first")
+            fastio.answer(fastio.readline().strip())
+            """
+        )
+    )
+    env = python.PythonLanguageEnvironment(fork_server=True)
+    path = pathlib.Path("main.py")
+    compile = env.get_compile_command(path, basedir=tmp_path, tempdir=tmp_path)
+    execute = env.get_execute_command(path, basedir=tmp_path, tempdir=tmp_path)
+    assert compile is not None
+
+    subprocess.run(compile, shell=True, check=True)
+    for input in [b"hello\n", b"world\n"]:
+        proc = subprocess.run(execute, shell=True, input=input, capture_output=True)
+        assert (proc.returncode, proc.stdout) == (
+            0,
+            b"first\ngot " + input,
+        )
+
+
+def test_environments(library: pathlib.Path):
+    config = python.OjVerifyPythonConfig(
+        environments=[
+            python.OjVerifyPythonConfigEnv(python=sys.executable),
+            python.OjVerifyPythonConfigEnv(
+                python=sys.executable, flags=["-O"], precompile=True, name="optimized"
+            ),
+        ]
+    )
+    path = pathlib.Path("main_a.py")
+    default, optimized = python.PythonLanguage(config=config).list_environments(
+        path, basedir=library
+    )
+    assert default.name == pathlib.Path(sys.executable).name
+    assert optimized.name == "optimized"
+    assert default.get_compile_command(path, basedir=library, tempdir=library) is None
+
+    compile = optimized.get_compile_command(path, basedir=library, tempdir=library)
+    assert compile is not None
+    subprocess.run(compile, shell=True, check=True)
+    assert sorted(
+        p.relative_to(library).as_posix()
+        for p in library.glob("**/__pycache__/*.opt-1.pyc")
+    ) == [
+        f"{name}.{sys.implementation.cache_tag}.opt-1.pyc"
+        for name in [
+            "__pycache__/main_a",
+            "lib/__pycache__/a",
+            "lib/__pycache__/b",
+            "lib/__pycache__/c",
+        ]
+    ]
+
+    execute = optimized.get_execute_command(path, basedir=library, tempdir=library)
+    assert execute.endswith(f"{sys.executable} -O main_a.py")
+    subprocess.run(execute, shell=True, check=True)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fork server requires POSIX")
+def test_fork_server_not_private(tmp_path: pathlib.Path):
+    directory = tmp_path / "sock"
+    directory.mkdir(mode=0o755)
+    directory.chmod(0o755)
+    (tmp_path / "main.py").write_text("print('hello')\n")
+    forkserver = pathlib.Path(python.__file__).with_name("python_forkserver.py")
+    sock = directory / "main.sock"
+
+    proc = subprocess.run(
+        [sys.executable, forkserver, "serve", sock, tmp_path / "main.py"],
+        capture_output=True,
+    )
+    assert proc.returncode == 0
+    assert b"is not private" in proc.stderr
+    assert not sock.exists()
+
+    # the client does not connect to a socket in a directory which the others can access
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(sock))
+        listener.listen(1)
+        proc = subprocess.run(
+            [sys.executable, forkserver, "run", sock, "--"]
+            + [sys.executable, tmp_path / "main.py"],
+            capture_output=True,
+            timeout=30,
+        )
+    assert (proc.returncode, proc.stdout) == (0, b"hello\n")
@@ -0,0 +1,134 @@
+import pathlib
+import shutil
+import subprocess
+import textwrap
+
+import pytest
+from pytest_mock import MockerFixture
+
+import competitive_verifier.oj.verify.languages.rust as rust_module
+from competitive_verifier.oj.verify.languages.rust import RustLanguage
+
+pytestmark = pytest.mark.skipif(shutil.which("cargo") is None, reason="cargo not found")
+
+PROBLEM = "// competitive-verifier: PROBLEM https://judge.yosupo.jp/problem/aplusb\n"
+MAIN = "fn main() {}\n"
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    files = {
+        "Cargo.toml": """
+            [workspace]
+            members = ["a", "b"]
+        """,
+        "a/Cargo.toml": """
+            [package]
+            name = "a"
+            version = "0.1.0"
+            edition = "2021"
+        """,
+        "a/src/main.rs": PROBLEM + MAIN,
+        "a/examples/ex.rs": PROBLEM + MAIN,
+        "b/Cargo.toml": """
+            [package]
+            name = "b"
+            version = "0.1.0"
+            edition = "2021"
+        """,
+        "b/src/lib.rs": PROBLEM,
+        "b/src/bin/foo.rs": PROBLEM + MAIN,
+        "b/src/bin/bar.rs": MAIN,
+    }
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(content).lstrip())
+    return tmp_path
+
+
+def test_batched_build(workspace: pathlib.Path):
+    rust = RustLanguage(config=None)
+    paths = [
+        pathlib.Path(p)
+        for p in [
+            "a/src/main.rs",
+            "a/examples/ex.rs",
+            "b/src/lib.rs",
+            "b/src/bin/foo.rs",
+            "b/src/bin/bar.rs",
+        ]
+    ]
+    rust.prepare(paths, basedir=workspace)
+
+    def compile_command(path: str):
+        (env,) = rust.list_environments(pathlib.Path(path), basedir=workspace)
+        command = env.get_compile_command(
+            pathlib.Path(path), basedir=workspace, tempdir=workspace
+        )
+        assert isinstance(command, str)
+        return command
+
+    build = "cargo build --release --workspace"
+    batched = f"{build} --bin a --bin foo --example ex"
+    assert compile_command("a/src/main.rs") == (
+        f"cd {workspace} && ({batched} || {build} --bin a)"
+    )
+    assert compile_command("b/src/bin/foo.rs") == (
+        f"cd {workspace} && ({batched} || {build} --bin foo)"
+    )
+    assert compile_command("b/src/bin/bar.rs") == (
+        f"cd {workspace / 'b/src/bin'} && cargo build --release --bin bar"
+    )
+
+    subprocess.run(compile_command("a/examples/ex.rs"), shell=True, check=True)
+    for path in ["a/src/main.rs", "a/examples/ex.rs", "b/src/bin/foo.rs"]:
+        (env,) = rust.list_environments(pathlib.Path(path), basedir=workspace)
+        assert pathlib.Path(
+            env.get_execute_command(
+                pathlib.Path(path), basedir=workspace, tempdir=workspace
+            )
+        ).exists()
+
+
+def _clear_memory_cache():
+    rust_module._metadata_by_manifest_path.clear()  # pyright: ignore[reportPrivateUsage]
+    rust_module._cargo_checked_workspaces.clear()  # pyright: ignore[reportPrivateUsage]
+    rust_module._related_source_files_by_workspace.clear()  # pyright: ignore[reportPrivateUsage]
+    rust_module._digests_by_workspace.clear()  # pyright: ignore[reportPrivateUsage]
+    rust_module._list_dependencies_by_crate.cache_clear()  # pyright: ignore[reportPrivateUsage]
+
+
+def test_persisted_metadata(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+):
+    monkeypatch.setenv("COMPETITIVE_VERIFY_CONFIG_PATH", str(workspace / ".config"))
+    spy = mocker.spy(rust_module, "exec_command")
+
+    def list_dependencies(path: str):
+        _clear_memory_cache()
+        return sorted(
+            RustLanguage(config=None).list_dependencies(
+                pathlib.Path(path), basedir=workspace
+            )
+        )
+
+    expected = list_dependencies("b/src/bin/foo.rs")
+    assert spy.call_count > 0
+
+    spy.reset_mock()
+    assert list_dependencies("b/src/bin/foo.rs") == expected
+    assert list_dependencies("a/src/main.rs") == [workspace / "a/src/main.rs"]
+    assert spy.call_count == 0
+
+    # cargo runs again after the sources are changed
+    (workspace / "b/src/bin/foo.rs").write_text(
+        PROBLEM + '#[path = "../m.rs"] mod m;\n' + MAIN
+    )
+    (workspace / "b/src/m.rs").write_text("")
+    assert list_dependencies("b/src/bin/foo.rs") == sorted(
+        [*expected, workspace / "b/src/m.rs"]
+    )
+    assert spy.call_count > 0
+    _clear_memory_cache()
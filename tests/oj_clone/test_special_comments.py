@@ -0,0 +1,55 @@
+import pathlib
+
+import pytest
+
+import competitive_verifier.oj.verify.languages.special_comments as special_comments
+
+test_scan_text_params: list[tuple[str, dict[str, str], list[str]]] = [
+    ("", {}, []),
+    (
+        "// competitive-verifier: PROBLEM https://judge.yosupo.jp/problem/aplusb\n",
+        {"PROBLEM": "https://judge.yosupo.jp/problem/aplusb"},
+        ["https://judge.yosupo.jp/problem/aplusb"],
+    ),
+    (
+        "# verify-helper: IGNORE\r\n# verification-helper:TITLE  a b  \r# competitive-verifier: TITLE c",
+        {"IGNORE": "", "TITLE": "c"},
+        [],
+    ),
+    (
+        "oj-verify-helper: A x-competitive-verifier: B\n// competitive-verifier: C,D verify-helper: E",
+        {"A": "x-competitive-verifier: B", "E": ""},
+        [],
+    ),
+    (
+        """url = "https://atcoder.jp/"; {"url":"http://example.com/a"} `https://b.example.com""",
+        {},
+        ["http://example.com/a", "https://atcoder.jp/", "https://b.example.com"],
+    ),
+    (
+        "https://a.example.com/competitive-verifier:X\n'https://a.example.com/https://c",
+        {"X": ""},
+        [
+            "https://a.example.com/competitive-verifier:X",
+            "https://a.example.com/https://c",
+        ],
+    ),
+]
+
+
+@pytest.mark.parametrize("content, attributes, urls", test_scan_text_params)
+def test_scan_text(content: str, attributes: dict[str, str], urls: list[str]):
+    scanned = special_comments.scan_text(content)
+    assert dict(scanned.special_comments) == attributes
+    assert list(scanned.embedded_urls) == urls
+
+
+def test_scan_cached(tmp_path: pathlib.Path):
+    path = tmp_path / "a.py"
+    path.write_text("# competitive-verifier: TITLE a\n# https://example.com\n")
+    scanned = special_comments.scan(path)
+    assert special_comments.scan(path) is scanned
+    assert special_comments.list_special_comments(path) == {"TITLE": "a"}
+    assert list(special_comments.list_embedded_urls(path)) == ["https://example.com"]
+    with pytest.raises(TypeError):
+        scanned.special_comments["TITLE"] = "b"  # pyright: ignore
@@ -0,0 +1,122 @@
+import pathlib
+import subprocess
+import sys
+
+import pytest
+from pytest_mock import MockerFixture
+
+import competitive_verifier.git as git
+import competitive_verifier.oj.verify.utils as utils
+from competitive_verifier.oj.verify.languages.user_defined import UserDefinedLanguage
+from competitive_verifier.oj.verify.models import OjVerifyUserDefinedConfig
+
+
+@pytest.fixture
+def repository(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    tracked = ["a.hs", "lib/b.hs", "lib/c.kt", ".hidden/d.hs"]
+    for name in [*tracked, "untracked.hs"]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", *tracked], check=True)
+    utils.clear_file_index()
+    yield tmp_path
+    utils.clear_file_index()
+
+
+def test_list_dependencies_without_command(
+    repository: pathlib.Path, mocker: MockerFixture
+):
+    ls_files = mocker.spy(git, "ls_files")
+    config = OjVerifyUserDefinedConfig(execute="true")
+    haskell = UserDefinedLanguage(extension="hs", config=config)
+    kotlin = UserDefinedLanguage(extension="kt", config=config)
+
+    for path in ["a.hs", "lib/b.hs"]:
+        assert haskell.list_dependencies(pathlib.Path(path), basedir=repository) == [
+            pathlib.Path("a.hs"),
+            pathlib.Path("lib/b.hs"),
+            pathlib.Path("untracked.hs"),
+        ]
+    assert kotlin.list_dependencies(pathlib.Path("lib/c.kt"), basedir=repository) == [
+        pathlib.Path("lib/c.kt")
+    ]
+    ls_files.assert_called_once()
+
+
+def test_list_dependencies_outside_git(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_DIR", str(tmp_path / "not-a-repository"))
+    for name in ["a.hs", "lib/b.hs", ".hidden/d.hs"]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    git.clear_ls_files_cache()
+    utils.clear_file_index()
+    try:
+        haskell = UserDefinedLanguage(
+            extension="hs", config=OjVerifyUserDefinedConfig(execute="true")
+        )
+        assert haskell.list_dependencies(pathlib.Path("a.hs"), basedir=tmp_path) == [
+            pathlib.Path("a.hs"),
+            pathlib.Path("lib/b.hs"),
+        ]
+    finally:
+        git.clear_ls_files_cache()
+        utils.clear_file_index()
+
+
+BATCH_SCRIPT = """
+import json, sys
+paths = sys.stdin.read().split()
+print(json.dumps({"files": {
+    p: {"attributes": {"PROBLEM": "https://example.com/" + p}, "dependencies": ["lib/c.kt"], "bundle": "// " + p}
+    for p in paths if p != "lib/c.kt"
+}}))
+"""
+
+
+def test_batch(repository: pathlib.Path):
+    (repository / "batch.py").write_text(BATCH_SCRIPT)
+    (repository / "main.kt").write_text("// competitive-verifier: TITLE main\n")
+    (repository / "lib/c.kt").write_text("// competitive-verifier: TITLE lib\n")
+    kotlin = UserDefinedLanguage(
+        extension="kt",
+        config=OjVerifyUserDefinedConfig(
+            execute="true",
+            batch=[sys.executable, "{basedir}/batch.py"],
+            list_dependencies="echo other.kt",
+        ),
+    )
+    main = pathlib.Path("main.kt")
+    lib = pathlib.Path("lib/c.kt")
+    kotlin.prepare([main, lib], basedir=repository)
+
+    assert kotlin.list_attributes(main, basedir=repository) == {
+        "PROBLEM": "https://example.com/main.kt"
+    }
+    assert kotlin.list_dependencies(main, basedir=repository) == [main, lib]
+    assert kotlin.bundle(main, basedir=repository) == b"// main.kt"
+
+    # files missing in the batch result fall back to the commands of each file
+    assert kotlin.list_attributes(lib, basedir=repository) == {"TITLE": "lib"}
+    assert kotlin.list_dependencies(lib, basedir=repository) == [
+        lib,
+        pathlib.Path("other.kt"),
+    ]
+    assert kotlin.bundle(lib, basedir=repository) is None
+
+
+def test_batch_invalid_json(repository: pathlib.Path):
+    (repository / "main.kt").write_text("// competitive-verifier: TITLE main\n")
+    kotlin = UserDefinedLanguage(
+        extension="kt",
+        config=OjVerifyUserDefinedConfig(execute="true", batch="echo not-json"),
+    )
+    main = pathlib.Path("main.kt")
+    kotlin.prepare([main], basedir=repository)
+    assert kotlin.list_attributes(main, basedir=repository) == {"TITLE": "main"}
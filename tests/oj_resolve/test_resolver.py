@@ -0,0 +1,98 @@
+import pathlib
+import re
+import subprocess
+from typing import Any, Sequence
+
+import pytest
+from pytest_mock import MockerFixture
+
+from competitive_verifier.oj.verify.list import OjVerifyConfig
+from competitive_verifier.oj.verify.models import Language, LanguageEnvironment
+from competitive_verifier.oj_resolve.resolver import OjResolver
+
+test_match_exclude_params: list[tuple[list[str], str, bool]] = [
+    ([], "a/b.cpp", False),
+    (["a"], "a/b.cpp", True),
+    (["a/"], "a/b/c.cpp", True),
+    (["a"], "ab/c.cpp", False),
+    (["*.py"], "a/b.py", True),
+    (["*.py"], "a/b.pyc", False),
+    (["a/*"], "a/b/c.cpp", True),
+    (["b?"], "a/bc/d.cpp", False),
+    (["*/bc"], "a/bc/d.cpp", True),
+    (["[ab]/c.cpp"], "b/c.cpp", True),
+    (["."], "a/b.cpp", True),
+    (["x", "a/b.cpp"], "a/b.cpp", True),
+    (["x", "*/b"], "a/b/c.cpp", True),
+    (["x", "y*"], "a/b/c.cpp", False),
+    (["a|b"], "a/c.cpp", False),
+    (["a|b"], "a|b/c.cpp", True),
+]
+
+
+@pytest.mark.parametrize("exclude, path, expected", test_match_exclude_params)
+def test_match_exclude(exclude: list[str], path: str, expected: bool):
+    resolver = OjResolver(include=[], exclude=exclude, config=OjVerifyConfig())
+    assert (
+        resolver._match_exclude(
+            pathlib.Path(path)
+        )  # pyright: ignore[reportPrivateUsage]
+        is expected
+    )
+
+
+def test_match_exclude_one_pattern(mocker: MockerFixture):
+    fnmatch = mocker.patch("fnmatch.fnmatch", side_effect=AssertionError)
+    resolver = OjResolver(
+        include=[], exclude=["x/*", "*.py", "a/b"], config=OjVerifyConfig()
+    )
+    for path in ["a/b/c/d.cpp", "x/y.cpp", "z/w.py", "z/w.cpp"]:
+        resolver._match_exclude(
+            pathlib.Path(path)
+        )  # pyright: ignore[reportPrivateUsage]
+    fnmatch.assert_not_called()
+    assert isinstance(
+        resolver._exclude_pattern, re.Pattern  # pyright: ignore[reportPrivateUsage]
+    )
+
+
+class FailingPrepareLanguage(Language):
+    def prepare(self, paths: list[pathlib.Path], *, basedir: pathlib.Path) -> None:
+        raise RuntimeError("broken batch")
+
+    def list_attributes(
+        self, path: pathlib.Path, *, basedir: pathlib.Path
+    ) -> dict[str, Any]:
+        return {}
+
+    def list_dependencies(
+        self, path: pathlib.Path, *, basedir: pathlib.Path
+    ) -> list[pathlib.Path]:
+        return [path]
+
+    def list_environments(
+        self, path: pathlib.Path, *, basedir: pathlib.Path
+    ) -> Sequence[LanguageEnvironment]:
+        return []
+
+
+def test_resolve_prepare_error(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+    caplog: pytest.LogCaptureFixture,
+):
+    monkeypatch.chdir(tmp_path)
+    pathlib.Path("a.txt").write_text("")
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", "a.txt"], check=True)
+
+    failing = FailingPrepareLanguage()
+    resolver = OjResolver(include=[], exclude=[], config=OjVerifyConfig())
+    mocker.patch.object(
+        resolver, "_list_targets", return_value=[(pathlib.Path("a.txt"), failing)]
+    )
+    result = resolver.resolve(bundle=False)
+    assert list(result.files) == [pathlib.Path("a.txt")]
+    assert "Failed to prepare FailingPrepareLanguage" in caplog.text
+    assert "broken batch" in caplog.text
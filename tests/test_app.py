@@ -91,3 +91,75 @@ def test_parallel_split(setenv: Any):
     parsed = parse_args(["verify", "--split-index", "1", "--split", "5"])
     assert parsed.split == 5
     assert parsed.split_index == 1
+
+
+def test_parse_args_affected(setenv: Any):
+    parsed = parse_args(["verify", "--affected-since", "origin/main"])
+    assert parsed.affected_since == "origin/main"
+    assert parse_args(["verify"]).affected_since is None
+
+    parsed = parse_args(["affected", "HEAD~"])
+    assert parsed.rev == "HEAD~"
+    assert parsed.verify_files_json == pathlib.Path(
+        ".competitive-verifier/verify_files.json"
+    )
+
+
+def test_parse_args_history_db(setenv: Any):
+    parsed = parse_args(["verify", "--history-db", ".cv/history.db"])
+    assert parsed.history_db == pathlib.Path(".cv/history.db")
+    assert parse_args(["verify"]).history_db is None
+
+
+def test_parse_args_regression(setenv: Any):
+    parsed = parse_args(["verify"])
+    assert parsed.regression_check is None
+    assert parsed.regression_time_ratio == 1.5
+    assert parse_args(["verify", "--regression-check"]).regression_check is True
+    assert parsed.tle_margin == 0.2
+
+    parsed = parse_args(
+        [
+            "verify",
+            "--no-regression-check",
+            "--regression-time-ratio",
+            "2",
+            "--regression-min-mb",
+            "64",
+            "--mle-margin",
+            "0.1",
+        ]
+    )
+    assert parsed.regression_check is False
+    assert parsed.regression_time_ratio == 2
+    assert parsed.regression_min_mb == 64
+    assert parsed.mle_margin == 0.1
+
+
+def test_parse_args_trace(setenv: Any):
+    parsed = parse_args(["verify", "--trace", ".cv/trace.json"])
+    assert parsed.trace == pathlib.Path(".cv/trace.json")
+    assert parse_args(["verify"]).trace is None
+
+
+def test_parse_args_profile_self(setenv: Any):
+    parser = app.get_parser()
+    subparsers = next(
+        a for a in parser._actions if isinstance(a, argparse._SubParsersAction)
+    )
+    for subparser in subparsers.choices.values():
+        assert subparser.get_default("profile_self") is None
+        assert "--profile-self" in subparser._option_string_actions
+
+    parsed = parse_args(["verify", "--profile-self", ".cv/prof"])
+    assert parsed.profile_self == pathlib.Path(".cv/prof")
+
+
+def test_run_subcommand_profile_self(setenv: Any, tmp_path: pathlib.Path):
+    parsed = parse_args(["check", "a.json", "--profile-self", str(tmp_path)])
+    assert app.run_subcommand(lambda _: True, parsed)
+    assert (tmp_path / "check.prof").exists()
+    assert (tmp_path / "check.tracemalloc.txt").exists()
+
+    parsed = parse_args(["check", "a.json"])
+    assert not app.run_subcommand(lambda _: False, parsed)
@@ -0,0 +1,104 @@
+import os
+import pathlib
+import subprocess
+
+import pytest
+from pytest_mock import MockerFixture
+
+import competitive_verifier.git as git
+from competitive_verifier.error import VerifierError
+
+FILES = [
+    "README.md",
+    "lib/a.hpp",
+    "lib/ab/b.hpp",
+    "lib/[ab].hpp",
+    "src/a/b.py",
+    "src/x.py",
+    "src/xy/z.txt",
+]
+
+
+@pytest.fixture
+def repository(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    for name in [*FILES, "untracked.py"]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", *FILES], check=True)
+    git.clear_ls_files_cache()
+    yield tmp_path
+    git.clear_ls_files_cache()
+
+
+test_ls_files_params: list[tuple[str, list[str]]] = [
+    ("", []),
+    ("all", ["."]),
+    ("literal", ["README.md", "src/x.py", "src/x"]),
+    ("directory", ["lib", "src/a/", "src/x.py/", "src/./xy/."]),
+    ("wildcard", ["*.py", "lib/a*", "src/?"]),
+    ("wildcard_directory", ["src/*/", "src/[ab]"]),
+    ("bracket", ["lib/[ab].hpp"]),
+    ("subdirectory", ["../src/x.py"]),
+]
+
+
+@pytest.mark.parametrize(
+    "specs",
+    [p[1] for p in test_ls_files_params],
+    ids=[p[0] for p in test_ls_files_params],
+)
+def test_ls_files(repository: pathlib.Path, specs: list[str]):
+    for cwd in [repository, repository / "lib"]:
+        os.chdir(cwd)
+        expected = set(
+            map(
+                pathlib.Path,
+                filter(
+                    None,
+                    subprocess.run(
+                        ["git", "ls-files", "-z", "--", *specs],
+                        capture_output=True,
+                        text=True,
+                    ).stdout.split("\0"),
+                ),
+            )
+        )
+        assert git.ls_files(*specs) == expected
+
+
+def test_ls_files_once(repository: pathlib.Path, mocker: MockerFixture):
+    exec_command = mocker.spy(git, "exec_command")
+    assert git.ls_files("lib") == {
+        pathlib.Path("lib/a.hpp"),
+        pathlib.Path("lib/ab/b.hpp"),
+        pathlib.Path("lib/[ab].hpp"),
+    }
+    assert git.ls_files(repository / "src" / "x.py") == {pathlib.Path("src/x.py")}
+    assert git.ls_files("*.md") == {pathlib.Path("README.md")}
+    exec_command.assert_called_once()
+
+
+def test_get_changed_files(repository: pathlib.Path):
+    subprocess.run(
+        ["git", "-c", "user.name=a", "-c", "user.email=a@a", "commit", "-qm", "a"],
+        check=True,
+    )
+    (repository / "lib/a.hpp").write_text("a")
+    (repository / "src/x.py").unlink()
+    subprocess.run(["git", "mv", "src/a/b.py", "src/a/c.py"], check=True)
+
+    assert git.get_changed_files("HEAD") == {
+        pathlib.Path("lib/a.hpp"),
+        pathlib.Path("src/x.py"),
+        pathlib.Path("src/a/b.py"),
+        pathlib.Path("src/a/c.py"),
+        pathlib.Path("untracked.py"),
+    }
+    os.chdir(repository / "lib")
+    assert git.get_changed_files("HEAD") == {pathlib.Path("a.hpp")}
+
+    with pytest.raises(VerifierError):
+        git.get_changed_files("no-such-revision")
@@ -0,0 +1,144 @@
+import pathlib
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional
+
+from competitive_verifier.history import HistoryDB
+from competitive_verifier.models import (
+    FileResult,
+    JudgeStatus,
+    ResultStatus,
+    VerificationResult,
+    VerifyCommandResult,
+)
+
+
+def make_result(
+    elapsed: dict[str, list[float]], *, newest: bool = True, name: Optional[str] = None
+) -> VerifyCommandResult:
+    return VerifyCommandResult(
+        total_seconds=sum(sum(v) for v in elapsed.values()),
+        files={
+            pathlib.Path(p): FileResult(
+                newest=newest,
+                verifications=[
+                    VerificationResult(
+                        verification_name=name,
+                        status=ResultStatus.SUCCESS,
+                        elapsed=sum(cases),
+                        testcases=[  # pyright: ignore[reportGeneralTypeIssues]
+                            {
+                                "name": f"case{i}",
+                                "status": JudgeStatus.AC,
+                                "elapsed": e,
+                                "memory": e * 100 if i else None,
+                            }
+                            for i, e in enumerate(cases)
+                        ],
+                        last_execution_time=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                    )
+                ],
+            )
+            for p, cases in elapsed.items()
+        },
+    )
+
+
+def test_record(tmp_path: pathlib.Path):
+    db_path = tmp_path / "history/history.db"
+    with HistoryDB(db_path) as history:
+        for i, e in enumerate([1.0, 3.0, 2.0, 10.0]):
+            history.record(
+                make_result({"a.py": [e, e / 2], "b.py": [e]}),
+                commit=f"commit{i}",
+                toolchain="gcc" if i < 3 else "clang",
+            )
+        history.record(
+            make_result({"a.py": [100.0]}, newest=False),
+            commit="commit4",
+            toolchain="gcc",
+        )
+
+    with HistoryDB(db_path) as history:
+        a = pathlib.Path("a.py")
+        assert history.testcase_history(a, None, "case0") == [
+            (10.0, None),
+            (2.0, None),
+            (3.0, None),
+            (1.0, None),
+        ]
+        assert history.testcase_history(a, None, "case1", runs=2) == [
+            (5.0, 500.0),
+            (1.0, 100.0),
+        ]
+        assert history.testcase_history(a, "other", "case0") == []
+        assert history.median_testcase_elapsed(a, None, "case0") == 2.5
+        assert history.median_testcase_elapsed(a, None, "case0", toolchain="gcc") == 2
+        assert history.median_testcase_elapsed(a, None, "case0", runs=1) == 10
+        assert history.median_testcase_elapsed(a, None, "case9") is None
+        assert history.median_file_elapsed(
+            map(pathlib.Path, ["a.py", "b.py", "c.py"]), runs=3
+        ) == {pathlib.Path("a.py"): 4.5, pathlib.Path("b.py"): 3.0}
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute(
+            'SELECT "commit", toolchain FROM runs ORDER BY id'
+        ).fetchall() == [
+            ("commit0", "gcc"),
+            ("commit1", "gcc"),
+            ("commit2", "gcc"),
+            ("commit3", "clang"),
+            ("commit4", "gcc"),
+        ]
+        # the result carried over is not recorded
+        assert conn.execute("SELECT COUNT(*) FROM verifications").fetchone() == (8,)
+
+
+def test_median_testcases(tmp_path: pathlib.Path):
+    with HistoryDB(tmp_path / "history.db") as history:
+        for i, e in enumerate([1.0, 3.0, 2.0, 10.0]):
+            history.record(
+                make_result({"a.py": [e, e / 2]}),
+                commit=f"commit{i}",
+                toolchain="gcc" if i < 3 else "clang",
+            )
+        history.record(
+            VerifyCommandResult(
+                total_seconds=1,
+                files={
+                    pathlib.Path("a.py"): FileResult(
+                        verifications=[
+                            VerificationResult(
+                                status=ResultStatus.FAILURE,
+                                elapsed=1,
+                                testcases=[  # pyright: ignore[reportGeneralTypeIssues]
+                                    {
+                                        "name": "case0",
+                                        "status": JudgeStatus.TLE,
+                                        "elapsed": 100.0,
+                                    },
+                                ],
+                            )
+                        ]
+                    )
+                },
+            ),
+            commit="commit4",
+            toolchain="gcc",
+        )
+
+        a = pathlib.Path("a.py")
+        # the TLE case is not a baseline
+        assert history.median_testcases(a, None) == {
+            "case0": (2.5, None),
+            "case1": (1.25, 125.0),
+        }
+        assert history.median_testcases(a, None, runs=2) == {
+            "case0": (10.0, None),
+            "case1": (5.0, 500.0),
+        }
+        assert history.median_testcases(a, None, toolchain="gcc") == {
+            "case0": (2.0, None),
+            "case1": (1.0, 100.0),
+        }
+        assert history.median_testcases(a, "other") == {}
@@ -0,0 +1,66 @@
+import pathlib
+import pstats
+import tracemalloc
+
+import competitive_verifier.self_profile as self_profile
+
+
+def allocate_outer() -> list[bytes]:
+    return [bytes(1024) for _ in range(100)]
+
+
+def allocate_inner() -> list[bytes]:
+    return [bytes(1024) for _ in range(200)]
+
+
+def test_phase_without_profiler():
+    assert self_profile.stop() is None
+    with self_profile.phase("nothing"):
+        pass
+    assert self_profile.stop() is None
+
+
+def test_self_profiler(tmp_path: pathlib.Path):
+    kept: list[list[bytes]] = []
+    profiler = self_profile.start(tmp_path / "prof", top=5)
+    try:
+        with self_profile.phase("outer"):
+            kept.append(allocate_outer())
+            with self_profile.phase("inner"):
+                kept.append(allocate_inner())
+                with self_profile.phase("outer"):
+                    kept.append(allocate_outer())
+            with self_profile.phase("inner"):
+                kept.append(allocate_inner())
+    finally:
+        assert self_profile.stop() is profiler
+    assert not tracemalloc.is_tracing()
+
+    profiler.dump()
+    files = sorted(p.name for p in (tmp_path / "prof").iterdir())
+    assert files == [
+        "inner.prof",
+        "inner.tracemalloc.txt",
+        "inner.txt",
+        "outer.prof",
+        "outer.tracemalloc.txt",
+        "outer.txt",
+    ]
+
+    def calls(name: str) -> dict[str, int]:
+        stats = pstats.Stats(str(tmp_path / "prof" / f"{name}.prof"))
+        return {
+            func: cc
+            for (_, _, func), (cc, *_) in stats.stats.items()  # type: ignore
+            if func.startswith("allocate_")
+        }
+
+    # the nested phases pause the enclosing one, and the active phase is not nested
+    assert calls("outer") == {"allocate_outer": 1}
+    assert calls("inner") == {"allocate_inner": 2, "allocate_outer": 1}
+
+    inner = (tmp_path / "prof/inner.tracemalloc.txt").read_text().splitlines()
+    assert inner[0].startswith("peak traced memory: ")
+    assert len(inner) <= 6
+    assert any(__file__ in line for line in inner[1:])
+    assert "cumulative" in (tmp_path / "prof/outer.txt").read_text()
@@ -5,7 +5,13 @@ from io import StringIO
 import pytest
 
 import competitive_verifier.summary as summary
-from competitive_verifier.models import FileResult, JudgeStatus, ResultStatus
+from competitive_verifier.models import (
+    FileResult,
+    JudgeStatus,
+    PerformanceRegression,
+    RegressionKind,
+    ResultStatus,
+)
 from competitive_verifier.models import TestcaseResult as CaseResult
 from competitive_verifier.models import VerificationResult, VerifyCommandResult
 
@@ -186,3 +192,53 @@ def test_summary():
 ||case02|MLE|400ms|32MB|
 """
         assert fp.getvalue() == expected.replace("\r\n", "\n")
+
+
+def test_summary_regressions():
+    def regressed(name: str) -> VerificationResult:
+        return VerificationResult(
+            verification_name=name,
+            elapsed=1,
+            status=ResultStatus.SUCCESS,
+            last_execution_time=datetime.fromtimestamp(1675125600),
+            regressions=[
+                PerformanceRegression(
+                    name="case01", kind=RegressionKind.TIME, current=0.9, previous=0.3
+                ),
+                PerformanceRegression(
+                    name="case02",
+                    kind=RegressionKind.MLE_MARGIN,
+                    current=240,
+                    limit=256,
+                ),
+            ],
+        )
+
+    with StringIO() as fp:
+        summary.write_summary(
+            fp=fp,
+            result=VerifyCommandResult(
+                total_seconds=2,
+                files={
+                    pathlib.Path("foo/bar.py"): FileResult(
+                        verifications=[regressed("ver"), regressed("")]
+                    ),
+                    pathlib.Path("foo/baz.py"): FileResult(
+                        verifications=[regressed("past")], newest=False
+                    ),
+                },
+            ),
+        )
+
+        expected = r"""## Performance regressions
+
+### foo/bar.py
+
+|env|name|kind|Previous|Current|Limit|
+|:---|:---|:---|:---:|:---:|:---:|
+|ver|case01|time|300ms|900ms|-|
+|ver|case02|mle_margin|-|240MB|256MB|
+||case01|time|300ms|900ms|-|
+||case02|mle_margin|-|240MB|256MB|
+"""
+        assert fp.getvalue().endswith(expected.replace("\r\n", "\n"))
@@ -0,0 +1,98 @@
+import pathlib
+import subprocess
+
+import pytest
+from pytest_mock import MockerFixture
+
+import competitive_verifier.toolchain as toolchain
+
+
+@pytest.fixture
+def fake_gcc(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+):
+    monkeypatch.setenv("COMPETITIVE_VERIFY_CONFIG_PATH", str(tmp_path / "config"))
+    executable = tmp_path / "bin" / "g++"
+    executable.parent.mkdir()
+    executable.write_bytes(b"fake")
+
+    def _which(name: str):
+        return str(executable) if name == "g++" else None
+
+    mocker.patch("shutil.which", side_effect=_which)
+    toolchain.clear_cache()
+    yield executable
+    toolchain.clear_cache()
+
+
+@pytest.fixture
+def mock_version(mocker: MockerFixture):
+    return mocker.patch(
+        "competitive_verifier.toolchain.exec_command",
+        return_value=subprocess.CompletedProcess(
+            args=[], returncode=0, stdout=b"g++ (GCC) 12.2.0\n", stderr=b""
+        ),
+    )
+
+
+def test_get_toolchain(fake_gcc: pathlib.Path, mock_version):
+    found = toolchain.get_toolchain("g++")
+    assert found is not None
+    assert found.path == fake_gcc
+    assert found.version == "g++ (GCC) 12.2.0"
+    assert toolchain.which("g++") == fake_gcc
+    assert toolchain.get_toolchain("clang++") is None
+    assert toolchain.which("clang++") is None
+    mock_version.assert_called_once_with(
+        [str(fake_gcc), "--version"], capture_output=True
+    )
+    assert toolchain.get_registry_path().exists()
+
+
+def test_get_toolchain_persisted(fake_gcc: pathlib.Path, mock_version):
+    first = toolchain.get_toolchain("g++")
+    toolchain.clear_cache()
+    assert toolchain.get_toolchain("g++") == first
+    assert mock_version.call_count == 1
+
+    # probe again if the executable is replaced
+    fake_gcc.write_bytes(b"replaced")
+    toolchain.clear_cache()
+    assert toolchain.get_toolchain("g++") is not None
+    assert mock_version.call_count == 2
+
+
+def test_fingerprint(fake_gcc: pathlib.Path, mock_version):
+    fingerprint = toolchain.fingerprint("g++", "clang++")
+    assert fingerprint == toolchain.fingerprint("g++", "clang++")
+    assert fingerprint != toolchain.fingerprint("g++")
+    assert mock_version.call_count == 1
+
+    mock_version.return_value = subprocess.CompletedProcess(
+        args=[], returncode=0, stdout=b"g++ (GCC) 13.1.0\n", stderr=b""
+    )
+    fake_gcc.write_bytes(b"upgraded")
+    toolchain.clear_cache()
+    assert toolchain.fingerprint("g++", "clang++") != fingerprint
+
+
+def test_which_without_probe(fake_gcc: pathlib.Path, mock_version):
+    assert toolchain.which("g++") == fake_gcc
+    assert toolchain.which("clang++") is None
+    mock_version.assert_not_called()
+    assert not toolchain.get_registry_path().exists()
+
+    assert toolchain.get_toolchain("g++") is not None
+    assert mock_version.call_count == 1
+
+
+def test_save_atomically(fake_gcc: pathlib.Path, mock_version):
+    toolchain.get_toolchain("g++")
+    registry = toolchain.get_registry_path()
+    assert [p.name for p in registry.parent.iterdir()] == [registry.name]
+    assert (
+        "g++"
+        in toolchain.ToolchainRegistry.model_validate_json(
+            registry.read_bytes()
+        ).toolchains
+    )
@@ -0,0 +1,55 @@
+import json
+import pathlib
+import threading
+
+import competitive_verifier.trace as trace
+
+
+def test_span_without_tracer():
+    assert trace.stop() is None
+    with trace.span("nothing", cat="test"):
+        pass
+    assert trace.stop() is None
+
+
+def test_tracer(tmp_path: pathlib.Path):
+    tracer = trace.start(process_name="verify 1/4")
+    try:
+        with trace.span("outer", cat="file", file="a.py"):
+            with trace.span("inner", cat="exec"):
+                pass
+
+        def worker():
+            with trace.span("other", cat="exec"):
+                pass
+
+        thread = threading.Thread(target=worker, name="worker")
+        thread.start()
+        thread.join()
+    finally:
+        assert trace.stop() is tracer
+    assert trace.stop() is None
+
+    metadata = [e for e in tracer.events if e["ph"] == "M"]
+    assert [(e["name"], e["args"]["name"]) for e in metadata] == [
+        ("process_name", "verify 1/4"),
+        ("thread_name", threading.current_thread().name),
+        ("thread_name", "worker"),
+    ]
+
+    spans = {e["name"]: e for e in tracer.events if e["ph"] == "X"}
+    assert list(spans) == ["inner", "outer", "other"]
+    outer, inner, other = spans["outer"], spans["inner"], spans["other"]
+    assert outer["cat"] == "file"
+    assert outer["args"] == {"file": "a.py"}
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert outer["pid"] == inner["pid"] == other["pid"]
+    assert outer["tid"] == inner["tid"] != other["tid"]
+
+    path = tmp_path / "trace/trace.json"
+    tracer.dump(path)
+    assert json.loads(path.read_text()) == {
+        "traceEvents": tracer.events,
+        "displayTimeUnit": "ms",
+    }
@@ -0,0 +1,62 @@
+import pathlib
+
+import pytest
+from pytest_mock import MockerFixture
+
+import competitive_verifier.util as util
+
+
+@pytest.fixture(autouse=True)
+def clear_text_cache():
+    util.clear_text_cache()
+    yield
+    util.clear_text_cache()
+
+
+test_read_text_normalized_params: list[tuple[bytes, str]] = [
+    (b"", ""),
+    ("あいう\r\nabc\n".encode("utf-8"), "あいう\r\nabc\n"),
+    (b"\xef\xbb\xbfhello", "hello"),
+    ("こんにちは、世界。今日はいい天気です。".encode("cp932"), "こんにちは、世界。今日はいい天気です。"),
+]
+
+
+@pytest.mark.parametrize("content, expected", test_read_text_normalized_params)
+def test_read_text_normalized(tmp_path: pathlib.Path, content: bytes, expected: str):
+    path = tmp_path / "a.txt"
+    path.write_bytes(content)
+    assert util.read_text_normalized(path) == expected
+    assert util.normalize_bytes_text(content) == expected
+
+
+def test_read_text_normalized_cache(tmp_path: pathlib.Path, mocker: MockerFixture):
+    from_bytes = mocker.spy(util, "from_bytes")
+    content = "あいう".encode("cp932")
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_bytes(content)
+    b.write_bytes(content)
+
+    assert util.read_text_normalized(a) == "あいう"
+    assert util.read_text_normalized(a) == "あいう"
+    assert util.read_text_normalized(b) == "あいう"
+    from_bytes.assert_called_once()
+
+    a.write_text("updated", encoding="utf-8")
+    assert util.read_text_normalized(a) == "updated"
+    from_bytes.assert_called_once()
+
+
+def test_write_text_atomic(tmp_path: pathlib.Path, mocker: MockerFixture):
+    path = tmp_path / "cache.json"
+    util.write_text_atomic(path, '{"a": 1}')
+    util.write_text_atomic(path, '{"a": 2}')
+    assert path.read_text(encoding="utf-8") == '{"a": 2}'
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
+
+    # an interrupted write keeps the previous file
+    mocker.patch("os.replace", side_effect=KeyboardInterrupt)
+    with pytest.raises(KeyboardInterrupt):
+        util.write_text_atomic(path, '{"a": 3}')
+    assert path.read_text(encoding="utf-8") == '{"a": 2}'
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
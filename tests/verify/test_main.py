@@ -2,10 +2,12 @@ import argparse
 from typing import Optional
 
 import pytest
+from pytest_mock import MockerFixture
 
 from competitive_verifier.error import VerifierError
+from competitive_verifier.models import VerificationInput, VerifyCommandResult
 from competitive_verifier.verify.main import argument as argument_verify
-from competitive_verifier.verify.main import get_split_state
+from competitive_verifier.verify.main import get_split_state, run
 from competitive_verifier.verify.verifier import SplitState
 
 test_get_split_state_params = [
@@ -68,3 +70,29 @@ def test_get_split_state_error(args: list[str], message: str):
         get_split_state(parsed.split, parsed.split_index)
 
     assert e.value.message == message
+
+
+test_regression_check_params: list[tuple[list[str], bool]] = [
+    ([], False),
+    (["--regression-check"], True),
+    (["--history-db", "history.db"], True),
+    (["--prev-result", "prev.json"], True),
+    (["--prev-result", "prev.json", "--no-regression-check"], False),
+]
+
+
+@pytest.mark.parametrize("args, expected", test_regression_check_params)
+def test_regression_check(
+    mocker: MockerFixture,
+    args: list[str],
+    expected: bool,
+):
+    mocker.patch.object(VerificationInput, "parse_file_relative")
+    mocker.patch.object(VerifyCommandResult, "parse_file_relative")
+    run_impl = mocker.patch("competitive_verifier.verify.main.run_impl")
+    parsed = argument_verify(argparse.ArgumentParser()).parse_args(
+        ["--verify-json", "verify.json", *args]
+    )
+    run(parsed)
+    thresholds = run_impl.call_args.kwargs["regression_thresholds"]
+    assert (thresholds is not None) == expected
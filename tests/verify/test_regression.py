@@ -0,0 +1,114 @@
+from typing import Optional
+
+import pytest
+
+from competitive_verifier.models import (
+    JudgeStatus,
+    PerformanceRegression,
+    RegressionKind,
+)
+from competitive_verifier.models import TestcaseResults as CaseResults
+from competitive_verifier.verify.regression import (
+    Baseline,
+    RegressionThresholds,
+    detect_regressions,
+    to_baseline,
+)
+
+AC = JudgeStatus.AC
+
+testcases = CaseResults(
+    names=["same", "slow", "noise", "heavy", "near_tle", "near_mle", "new", "tle"],
+    statuses=[AC] * 7 + [JudgeStatus.TLE],
+    elapsed=[1.0, 2.0, 0.05, 1.0, 8.5, 1.0, 1.0, 10.0],
+    memory=[10.0, 10.0, 10.0, 100.0, 10.0, 240.0, None, 10.0],
+)
+
+baseline: Baseline = {
+    "same": (1.0, 10.0),
+    "slow": (1.0, 10.0),
+    "noise": (0.01, 1.0),
+    "heavy": (1.0, 10.0),
+    "near_tle": (8.4, 10.0),
+    "near_mle": (1.0, None),
+    "tle": (1.0, 10.0),
+}
+
+
+test_detect_regressions_params: dict[
+    str, tuple[RegressionThresholds, Optional[float], list[PerformanceRegression]]
+] = {
+    "default": (
+        RegressionThresholds(),
+        None,
+        [
+            PerformanceRegression(
+                name="slow", kind=RegressionKind.TIME, current=2.0, previous=1.0
+            ),
+            PerformanceRegression(
+                name="heavy", kind=RegressionKind.MEMORY, current=100.0, previous=10.0
+            ),
+        ],
+    ),
+    "limits": (
+        RegressionThresholds(time_ratio=3, memory_ratio=20),
+        10,
+        [
+            PerformanceRegression(
+                name="near_tle",
+                kind=RegressionKind.TLE_MARGIN,
+                current=8.5,
+                previous=8.4,
+                limit=10,
+            ),
+            PerformanceRegression(
+                name="near_mle",
+                kind=RegressionKind.MLE_MARGIN,
+                current=240.0,
+                limit=256,
+            ),
+        ],
+    ),
+    "no_min_increase": (
+        RegressionThresholds(min_time_increase=0, min_memory_increase=0),
+        None,
+        [
+            PerformanceRegression(
+                name="slow", kind=RegressionKind.TIME, current=2.0, previous=1.0
+            ),
+            PerformanceRegression(
+                name="noise", kind=RegressionKind.TIME, current=0.05, previous=0.01
+            ),
+            PerformanceRegression(
+                name="noise", kind=RegressionKind.MEMORY, current=10.0, previous=1.0
+            ),
+            PerformanceRegression(
+                name="heavy", kind=RegressionKind.MEMORY, current=100.0, previous=10.0
+            ),
+        ],
+    ),
+}
+
+
+@pytest.mark.parametrize(
+    "thresholds, tle, expected",
+    test_detect_regressions_params.values(),
+    ids=test_detect_regressions_params.keys(),
+)
+def test_detect_regressions(
+    thresholds: RegressionThresholds,
+    tle: Optional[float],
+    expected: list[PerformanceRegression],
+):
+    mle = 256 if tle else None
+    assert (
+        detect_regressions(testcases, baseline, thresholds=thresholds, tle=tle, mle=mle)
+        == expected
+    )
+
+
+def test_to_baseline():
+    assert to_baseline(testcases[5:]) == {
+        "near_mle": (1.0, 240.0),
+        "new": (1.0, None),
+    }
@@ -5,6 +5,7 @@ from typing import Any, Callable, Optional
 
 import pytest
 
+from competitive_verifier.history import HistoryDB
 from competitive_verifier.models import (
     CommandVerification,
     ConstVerification,
@@ -29,12 +30,16 @@ class MockInputContainer(InputContainer):
         verification_time: Optional[datetime.datetime] = None,
         file_timestamps: dict[Optional[Path], datetime.datetime] = {},
         split_state: Optional[SplitState] = None,
+        affected: Optional[set[Path]] = None,
+        history: Optional[HistoryDB] = None,
     ) -> None:
         super().__init__(
             input=VerificationInput.model_validate(obj) if obj else VerificationInput(),
             verification_time=verification_time or datetime.datetime.now(),
             prev_result=prev_result,
             split_state=split_state,
+            affected=affected,
+            history=history,
         )
 
         self.file_timestamps = file_timestamps
@@ -539,3 +544,68 @@ def test_current_verification_files(index: int, expected: dict[Path, Verificatio
     }
     assert resolver.remaining_verification_files == remaining_verification_files
     assert resolver.current_verification_files == expected
+
+
+def test_affected_verification_files():
+    command_verification = {"verification": {"type": "command", "command": "true"}}
+    const_verification = {"verification": {"type": "const", "status": "success"}}
+    resolver = MockInputContainer(
+        {
+            "files": {
+                "lib.py": {},
+                "foo.py": command_verification,
+                "bar.py": command_verification,
+                "baz.py": const_verification,
+                "qux.py": const_verification,
+            },
+        },
+        affected={Path("lib.py"), Path("foo.py"), Path("baz.py")},
+    )
+    assert resolver.remaining_verification_files == {
+        Path("foo.py"): VerificationFile(
+            verification=CommandVerification(command="true"),
+        ),
+    }
+    assert resolver.skippable_verification_files == {
+        Path("baz.py"): VerificationFile(
+            verification=ConstVerification(status=SUCCESS),
+        ),
+    }
+
+
+def test_current_verification_files_history(tmp_path: Path):
+    command_verification = {"verification": {"type": "command", "command": "true"}}
+    with HistoryDB(tmp_path / "history.db") as history:
+        for elapsed in [{"a.py": 3.0, "b.py": 1.0, "c.py": 2.0}, {"a.py": 5.0}]:
+            history.record(
+                VerifyCommandResult(
+                    total_seconds=sum(elapsed.values()),
+                    files={
+                        Path(p): FileResult(
+                            verifications=[
+                                VerificationResult(status=SUCCESS, elapsed=e)
+                            ]
+                        )
+                        for p, e in elapsed.items()
+                    },
+                ),
+                commit=None,
+                toolchain=None,
+            )
+
+        resolver = MockInputContainer(
+            {
+                "files": {
+                    p: command_verification
+                    for p in ["a.py", "b.py", "c.py", "d.py", "e.py"]
+                },
+            },
+            history=history,
+        )
+        assert list(resolver.current_verification_files) == [
+            Path("d.py"),
+            Path("e.py"),
+            Path("b.py"),
+            Path("c.py"),
+            Path("a.py"),
+        ]
@@ -5,14 +5,21 @@ from typing import Any, Callable, Optional
 
 import pytest
 
+from competitive_verifier import trace
+from competitive_verifier.history import HistoryDB
 from competitive_verifier.models import (
     ConstVerification,
     FileResult,
+    JudgeStatus,
+    PerformanceRegression,
+    ProblemVerification,
+    RegressionKind,
     ResultStatus,
     VerificationInput,
     VerificationResult,
     VerifyCommandResult,
 )
+from competitive_verifier.verify.regression import RegressionThresholds
 from competitive_verifier.verify.verifier import BaseVerifier, SplitState
 
 SUCCESS = ResultStatus.SUCCESS
@@ -33,12 +40,18 @@ class MockVerifier(BaseVerifier):
         prev_result: Optional[VerifyCommandResult],
         verification_time: datetime.datetime,
         split_state: Optional[SplitState],
+        history: Optional[HistoryDB] = None,
+        regression_thresholds: Optional[RegressionThresholds] = None,
+        toolchain: Optional[str] = None,
     ) -> None:
         super().__init__(
             input=VerificationInput.model_validate(obj),
             verification_time=verification_time,
             prev_result=prev_result,
             split_state=split_state,
+            history=history,
+            regression_thresholds=regression_thresholds,
+            toolchain=toolchain,
             default_tle=10,
             default_mle=256,
             timeout=10,
@@ -432,3 +445,195 @@ def test_verify(
 ):
     mock_exists(True)
     assert verifier.verify() == VerifyCommandResult.model_validate(expected)
+
+
+def make_verification_result(
+    elapsed: list[float], *, name: Optional[str] = "ver"
+) -> VerificationResult:
+    return VerificationResult(
+        verification_name=name,
+        status=SUCCESS,
+        elapsed=sum(elapsed),
+        testcases=[  # pyright: ignore[reportGeneralTypeIssues]
+            {"name": f"case{i}", "status": JudgeStatus.AC, "elapsed": e}
+            for i, e in enumerate(elapsed)
+        ],
+    )
+
+
+def test_check_regressions(tmp_path: Path):
+    path = Path("test/foo.py")
+    prev_result = VerifyCommandResult(
+        total_seconds=3,
+        files={
+            path: FileResult(
+                verifications=[
+                    make_verification_result([1.0, 1.0], name="other"),
+                    make_verification_result([1.0, 1.0, 1.0]),
+                ]
+            )
+        },
+    )
+    verification = ProblemVerification(
+        name="ver", command="true", problem="https://example.com", tle=2
+    )
+
+    def check(verifier: MockVerifier) -> Optional[list[PerformanceRegression]]:
+        result = make_verification_result([1.0, 1.7, 3.0])
+        verifier.check_regressions(path, verification, result)
+        return result.regressions
+
+    def mock_verifier(**kwargs: Any) -> MockVerifier:
+        return MockVerifier(
+            {"files": {}},
+            prev_result=prev_result,
+            verification_time=datetime.datetime(2007, 1, 2, 15, 4, 5),
+            split_state=None,
+            **kwargs,
+        )
+
+    assert check(mock_verifier()) is None
+    assert check(mock_verifier(regression_thresholds=RegressionThresholds())) == [
+        PerformanceRegression(
+            name="case1", kind=RegressionKind.TIME, current=1.7, previous=1.0
+        ),
+        PerformanceRegression(
+            name="case1",
+            kind=RegressionKind.TLE_MARGIN,
+            current=1.7,
+            previous=1.0,
+            limit=2,
+        ),
+        PerformanceRegression(
+            name="case2", kind=RegressionKind.TIME, current=3.0, previous=1.0
+        ),
+        PerformanceRegression(
+            name="case2",
+            kind=RegressionKind.TLE_MARGIN,
+            current=3.0,
+            previous=1.0,
+            limit=2,
+        ),
+    ]
+
+    # the history takes precedence over the previous result
+    with HistoryDB(tmp_path / "history.db") as history:
+        history.record(
+            VerifyCommandResult(
+                total_seconds=5.6,
+                files={
+                    path: FileResult(
+                        verifications=[make_verification_result([1.0, 1.6, 3.0])]
+                    )
+                },
+            ),
+            commit=None,
+            toolchain=None,
+        )
+        assert check(
+            mock_verifier(
+                history=history,
+                regression_thresholds=RegressionThresholds(tle_margin=0),
+            )
+        ) == [
+            PerformanceRegression(
+                name="case2",
+                kind=RegressionKind.TLE_MARGIN,
+                current=3.0,
+                previous=3.0,
+                limit=2,
+            ),
+        ]
+
+
+def test_check_regressions_toolchain(tmp_path: Path):
+    path = Path("test/foo.py")
+    verification = ProblemVerification(
+        name="ver", command="true", problem="https://example.com"
+    )
+
+    def check(verifier: MockVerifier) -> Optional[list[PerformanceRegression]]:
+        result = make_verification_result([2.0])
+        verifier.check_regressions(path, verification, result)
+        return result.regressions
+
+    with HistoryDB(tmp_path / "history.db") as history:
+        for elapsed, fingerprint in [(1.0, "gcc-12"), (2.0, "gcc-13")]:
+            history.record(
+                VerifyCommandResult(
+                    total_seconds=elapsed,
+                    files={
+                        path: FileResult(
+                            verifications=[make_verification_result([elapsed])]
+                        )
+                    },
+                ),
+                commit=None,
+                toolchain=fingerprint,
+            )
+
+        def mock_verifier(fingerprint: str) -> MockVerifier:
+            return MockVerifier(
+                {"files": {}},
+                prev_result=None,
+                verification_time=datetime.datetime(2007, 1, 2, 15, 4, 5),
+                split_state=None,
+                history=history,
+                regression_thresholds=RegressionThresholds(tle_margin=0),
+                toolchain=fingerprint,
+            )
+
+        # only the runs with the same toolchain are the baseline
+        assert check(mock_verifier("gcc-13")) is None
+        assert check(mock_verifier("gcc-12")) == [
+            PerformanceRegression(
+                name="case0", kind=RegressionKind.TIME, current=2.0, previous=1.0
+            ),
+        ]
+        assert check(mock_verifier("clang")) is None
+
+
+def test_verify_trace(mock_exists: Callable[[bool], Any]):
+    mock_exists(True)
+    verifier = MockVerifier(
+        {
+            "files": {
+                "test/foo.py": {
+                    "verification": [
+                        NotSkippableConstVerification(status=SUCCESS),
+                        NotSkippableConstVerification(name="v2", status=SUCCESS),
+                    ],
+                },
+                "test/skip.py": {
+                    "verification": [ConstVerification(status=SUCCESS)],
+                },
+            }
+        },
+        prev_result=None,
+        verification_time=datetime.datetime(2007, 1, 2, 15, 4, 5),
+        split_state=None,
+    )
+    tracer = trace.start()
+    try:
+        verifier.verify()
+    finally:
+        trace.stop()
+
+    assert [
+        (e["cat"], e["name"], e["args"].get("file"))
+        for e in tracer.events
+        if e["ph"] == "X"
+    ] == [
+        ("resolve", "current_verification_files", None),
+        ("download", "download", "test/foo.py"),
+        ("compile", "compile", None),
+        ("run", "run", None),
+        ("verification", "const", "test/foo.py"),
+        ("compile", "compile", None),
+        ("run", "run", None),
+        ("verification", "v2", "test/foo.py"),
+        ("file", "test/foo.py", None),
+        ("compile", "compile", None),
+        ("run", "run", None),
+        ("verification", "const", "test/skip.py"),
+    ]